@@ -1,7 +1,8 @@
 import os
-import subprocess
 import sys
 
+from src.runtime.batch import run_batch
+
 # Files that are expected to have errors as part of their test
 EXPECTED_ERROR_FILES = [
     "22_constant_reassignment_test.sop",
@@ -10,30 +11,20 @@ EXPECTED_ERROR_FILES = [
 ]
 
 
-def run_example(filepath, filename):
-    """Run a Soplang example file and return success/failure with error message"""
-    try:
-        result = subprocess.run(
-            ["python", "main.py", filepath],
-            capture_output=True,
-            text=True,
-            timeout=5,  # 5 second timeout
-        )
-
-        # For files that are supposed to demonstrate errors, a returncode of 0
-        # and the presence of specific error messages is a success
-        if filename in EXPECTED_ERROR_FILES:
-            # These files are expected to fail with specific errors
-            if result.returncode != 0 or "Khalad" in result.stdout:
-                return True, None
-
-        # For normal files
-        if result.returncode == 0 and "Khalad" not in result.stdout:
+def check_result(result, filename):
+    """Return success/failure of a run_batch() result with its error message"""
+    # For files that are supposed to demonstrate errors, a non-zero status or
+    # the presence of specific error messages is a success
+    if filename in EXPECTED_ERROR_FILES:
+        # These files are expected to fail with specific errors
+        if result["status"] != 0 or "Khalad" in result["stdout"]:
             return True, None
-        else:
-            return False, result.stdout or result.stderr
-    except Exception as e:
-        return False, str(e)
+
+    # For normal files
+    if result["status"] == 0 and "Khalad" not in result["stdout"]:
+        return True, None
+    else:
+        return False, result["stdout"]
 
 
 def main():
@@ -47,10 +38,13 @@ def main():
     successful = []
     failed = []
 
-    for filename in files:
-        filepath = os.path.join(examples_dir, filename)
+    # Run every example in-process on a pool of workers (see src/runtime/batch.py)
+    paths = [os.path.join(examples_dir, filename) for filename in files]
+    results = run_batch(paths, timeout=5)  # 5 second timeout
+
+    for filename, result in zip(files, results):
         print(f"Testing {filename}...", end=" ")
-        success, error = run_example(filepath, filename)
+        success, error = check_result(result, filename)
 
         if success:
             print("✅ Success")
@@ -4,15 +4,20 @@
 # Main entry point for both shell and file execution
 # ======================================================
 
-import argparse
 import os
 import sys
 
-from src.core.lexer import Lexer
-from src.core.parser import Parser
 from src.core.version import VERSION
-from src.runtime.interpreter import Interpreter
-from src.runtime.shell import SoplangShell
+
+# Everything else is imported by the branch that needs it: running a file or
+# -c code only loads the lexer, parser and interpreter, never the interactive
+# shell's readline / prompt_toolkit / colorama
+
+
+def make_shell():
+    from src.runtime.shell import SoplangShell
+
+    return SoplangShell()
 
 
 def main():
@@ -29,9 +34,32 @@ def main():
         python main.py filename.sop      # Execute a Soplang file
         python main.py -e 1              # Run example number 1
         python main.py -c 'qor("Hello")' # Execute code snippet
+        python main.py --engine=vm file.sop  # Run a file on the bytecode VM
+        python main.py --no-cache file.sop   # Run a file without the AST cache
+        python main.py --compile DIR     # Precompile the .sop files under DIR
+        python main.py -O file.sop       # Run a file with the AST optimizer
+        python main.py --dump-ast -O file.sop  # Print the optimized AST of a file
+        python main.py --profile file.sop      # Time functions and lines of a file
+        python main.py --profile --profile-output out.prof file.sop  # + pstats data
+        python main.py --sample out.folded file.sop  # Sample call stacks of a file
+        python main.py --batch DIR --jobs 4  # Run every file under DIR in parallel
+        python main.py --serve           # Serve runs on a Unix socket
+        python main.py --daemon file.sop # Run a file on that server
+        python main.py --daemon --stdin file.sop < in.txt  # ... with input
         python main.py -v                # Display version information
     """
+    # Fast path for the most common invocation, ``main.py file.sop``, which
+    # needs none of the other options (nor argparse)
+    argv = sys.argv[1:]
+    if len(argv) == 1 and not argv[0].startswith("-"):
+        from src.runtime.main import run_soplang_file
+
+        run_soplang_file(argv[0])
+        return 0
+
     # Setup command line argument parser
+    import argparse
+
     parser = argparse.ArgumentParser(
         description=(
             "Soplang Programming Language (legacy Python interpreter; "
@@ -57,13 +85,156 @@ def main():
     parser.add_argument(
         "-c", "--command", metavar="CODE", help="Execute Soplang code snippet"
     )
+    parser.add_argument(
+        "--engine",
+        choices=["interpreter", "vm"],
+        default="interpreter",
+        help="Execution engine for files, -c code and examples (default: interpreter)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write cached ASTs in __sopcache__ directories",
+    )
+    parser.add_argument(
+        "--compile",
+        metavar="PATH",
+        nargs="+",
+        help="Precompile the Soplang files under PATH into the AST cache",
+    )
+    parser.add_argument(
+        "-O",
+        "--optimize",
+        action="store_true",
+        help="Fold constants, prune constant haddii branches and short-circuit "
+        "&& and ||",
+    )
+    parser.add_argument(
+        "--dump-ast",
+        action="store_true",
+        help="Print the AST of the file (after -O, if given) instead of running it",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time the Soplang functions and lines of the file and print a report",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        help=(
+            "With --profile, also write the profile to FILE: collapsed stacks for "
+            "flame graphs if FILE ends in .folded, pstats data otherwise"
+        ),
+    )
+    parser.add_argument(
+        "--sample",
+        metavar="FILE",
+        help="Sample the Soplang call stack while the file runs and write "
+        "collapsed stacks for flame graphs to FILE",
+    )
+    parser.add_argument(
+        "--sample-rate",
+        metavar="HZ",
+        type=int,
+        help="With --sample, samples taken per second (default: 1000)",
+    )
+    parser.add_argument(
+        "--flush",
+        choices=["line", "size", "exit"],
+        help="When qor output of a file or -c code is written: after every line, "
+        "once 64 KiB are buffered, or at exit (default: line on a terminal, size "
+        "otherwise)",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="PATH",
+        nargs="+",
+        help="Run the Soplang files under PATH in parallel and report each one",
+    )
+    parser.add_argument(
+        "--jobs",
+        metavar="N",
+        type=int,
+        help="With --batch, number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--timeout",
+        metavar="SECONDS",
+        type=float,
+        help="With --batch, stop files that run longer than SECONDS",
+    )
+    parser.add_argument(
+        "--results",
+        metavar="FILE",
+        help="With --batch, write the status and output of every file to FILE (JSON)",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a server that runs Soplang files and code sent to its socket",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run the file or -c code on a running --serve server",
+    )
+    parser.add_argument(
+        "--stdin",
+        action="store_true",
+        help="With --daemon, send this process's stdin to the program "
+        "(default: the program reads no input)",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Socket of --serve and --daemon "
+        "(default: $SOPLANG_SOCKET, or soplang-<uid>.sock in $XDG_RUNTIME_DIR or /tmp)",
+    )
+    parser.add_argument(
+        "--workers",
+        metavar="N",
+        type=int,
+        help="With --serve, number of worker processes (default: number of CPUs)",
+    )
     parser.add_argument("filename", nargs="?", help="Soplang file to execute")
 
     # Parse arguments
     args = parser.parse_args()
-
-    # Create shell instance
-    shell = SoplangShell()
+    if args.profile and args.engine != "interpreter":
+        parser.error("--profile only supports --engine=interpreter")
+    if args.profile_output and not args.profile:
+        parser.error("--profile-output requires --profile")
+    if args.sample and args.engine != "interpreter":
+        parser.error("--sample only supports --engine=interpreter")
+    if args.sample and args.profile:
+        parser.error("--sample and --profile cannot be combined")
+    if args.sample_rate is not None and not args.sample:
+        parser.error("--sample-rate requires --sample")
+    if args.sample_rate is not None and args.sample_rate <= 0:
+        parser.error("--sample-rate must be positive")
+    if (args.jobs is not None or args.timeout is not None or args.results) and (
+        not args.batch
+    ):
+        parser.error("--jobs, --timeout and --results require --batch")
+    if args.jobs is not None and args.jobs <= 0:
+        parser.error("--jobs must be positive")
+    if args.timeout is not None and args.timeout <= 0:
+        parser.error("--timeout must be positive")
+    if args.workers is not None and not args.serve:
+        parser.error("--workers requires --serve")
+    if args.workers is not None and args.workers <= 0:
+        parser.error("--workers must be positive")
+    if args.socket and not (args.serve or args.daemon):
+        parser.error("--socket requires --serve or --daemon")
+    if args.stdin and not args.daemon:
+        parser.error("--stdin requires --daemon")
+    if args.daemon and not (args.command or args.file or args.filename):
+        parser.error("--daemon requires a file or -c code")
+    if args.daemon and (
+        args.profile or args.sample or args.dump_ast or args.interactive
+    ):
+        parser.error("--daemon cannot be combined with -i, --dump-ast or profiling")
 
     # Display version information if requested
     if args.version:
@@ -77,15 +248,65 @@ def main():
         )
         return 0
 
+    # Precompile files if requested
+    if args.compile:
+        from src.runtime.cache import main as compile_main
+
+        return compile_main(args.compile)
+
+    # Run a batch of files if requested
+    if args.batch:
+        from src.runtime.batch import main as batch_main
+
+        return batch_main(
+            args.batch,
+            args.jobs,
+            args.timeout,
+            args.results,
+            args.engine,
+            not args.no_cache,
+            args.optimize,
+        )
+
+    # Serve runs, or run on the server, if requested
+    if args.serve:
+        from src.runtime.server import Server
+
+        return Server(args.socket, args.workers).serve()
+
+    if args.daemon:
+        from src.runtime.server import run_on_daemon
+
+        return run_on_daemon(
+            args.file or args.filename,
+            args.command,
+            args.socket,
+            args.engine,
+            not args.no_cache,
+            args.optimize,
+            sys.stdin.read() if args.stdin else "",
+        )
+
     # Execute code snippet if provided
     if args.command:
+        from src.runtime.main import run_soplang_file
+
         # No decorative header - just execute the code directly
-        shell.execute_code(args.command)
+        run_soplang_file(
+            "<command>",
+            args.engine,
+            not args.no_cache,
+            args.optimize,
+            source=args.command,
+            flush=args.flush,
+            strict=False,
+        )
         return 0
 
     # Run example if requested
     if args.example is not None:
         # Load example list
+        shell = make_shell()
         shell.list_examples("")
         if not shell.last_examples_list:
             return 1
@@ -103,7 +324,7 @@ def main():
             "examples",
             example_file,
         )
-        shell.run_file(example_path)
+        shell.run_file(example_path, args.engine, not args.no_cache, args.optimize)
 
         # Start interactive shell afterward if requested
         if args.interactive:
@@ -114,17 +335,46 @@ def main():
     # Handle file if provided (either through --file or positional argument)
     filename = args.file or args.filename
     if filename:
-        # Remove redundant "Running file" message as it's handled in run_file
-        shell.run_file(filename)
+        from src.runtime.main import dump_soplang_file, run_soplang_file
+
+        if args.dump_ast:
+            return dump_soplang_file(filename, not args.no_cache, args.optimize)
+
+        if args.profile:
+            from src.runtime.profiler import Profiler
+
+            profiler = Profiler()
+            run_soplang_file(
+                filename, args.engine, not args.no_cache, args.optimize, profiler
+            )
+            print(profiler.report(), file=sys.stderr)
+            if args.profile_output:
+                profiler.write(args.profile_output)
+            return 0
+
+        if args.sample:
+            from src.runtime.sampler import DEFAULT_RATE, Sampler
+
+            sampler = Sampler(args.sample_rate or DEFAULT_RATE)
+            run_soplang_file(
+                filename, args.engine, not args.no_cache, args.optimize, sampler
+            )
+            sampler.write(args.sample)
+            print(sampler.summary(), file=sys.stderr)
+            return 0
+
+        run_soplang_file(
+            filename, args.engine, not args.no_cache, args.optimize, flush=args.flush
+        )
 
         # Start interactive shell afterward if requested
         if args.interactive:
-            shell.run()
+            make_shell().run()
 
         return 0
 
     # No specific command given, start interactive shell
-    shell.run()
+    make_shell().run()
     return 0
 
 
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Generate large synthetic Soplang programs
+
+The programs mix the constructs real code is made of (typed declarations,
+functions, haddii / kuceli / dooro statements, lists, walax objects and
+strings) in a fixed proportion, so that lexer and parser times can be compared
+across program sizes. Every generated program is valid and runs to completion.
+
+Usage:
+    python scripts/benchmark/generate_program.py 5000 > big.sop
+"""
+
+import argparse
+import random
+import sys
+
+
+def generate_program(units, seed=0):
+    """Source of a program made of ``units`` blocks of about 9 lines each"""
+    rng = random.Random(seed)
+    out = ["// Synthetic Soplang program generated by generate_program.py"]
+    for n in range(units):
+        kind = n % 4
+        a, b = rng.randint(1, 99), rng.randint(1, 99)
+        if kind == 0:
+            out.append(
+                f"hawl f{n}(x, y) {{\n"
+                f"    abn total = x * {a} + y\n"
+                f"    haddii (total > {a * b}) {{\n"
+                f"        celi total - {b}\n"
+                f"    }} haddii_kale (total == {a}) {{\n"
+                f"        celi 0\n"
+                f"    }} ugudambeyn {{\n"
+                f"        total = total + {b}\n"
+                f"    }}\n"
+                f"    celi total\n"
+                f"}}\n"
+                f"door r{n} = f{n}({a}, {b})"
+            )
+        elif kind == 1:
+            out.append(
+                f"teed items{n} = [{a}, {b}, {a + b}, \"s{n}\"]\n"
+                f"abn sum{n} = 0\n"
+                f"kuceli (i 0 ilaa 3) {{\n"
+                f"    haddii (i % 2 == 0 && i < {a}) {{\n"
+                f"        sum{n} = sum{n} + i * {b}\n"
+                f"    }}\n"
+                f"}}"
+            )
+        elif kind == 2:
+            out.append(
+                f"walax obj{n} = {{\n"
+                f"    magac: \"name {n}\",\n"
+                f"    da: {a},\n"
+                f"    cinwaan: {{magaalo: \"city\", lambar: {b}}}\n"
+                f"}}\n"
+                f"obj{n}.da = obj{n}.da + {b}\n"
+                f"qoraal s{n} = \"value \" + obj{n}.magac"
+                f" + \" \" + obj{n}.cinwaan.lambar"
+            )
+        else:
+            out.append(
+                f"dooro ({a} % 3) {{\n"
+                f"    xaalad 0 {{\n"
+                f"        door c{n} = ({a} + {b}) * 2\n"
+                f"    }}\n"
+                f"    xaalad 1 {{\n"
+                f"        door c{n} = {a} - {b} / 2\n"
+                f"    }}\n"
+                f"    xaalad 2 {{\n"
+                f"        door c{n} = !(({a} > {b}) || been)\n"
+                f"    }}\n"
+                f"}}"
+            )
+    return "\n".join(out) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("units", type=int, help="Number of generated blocks")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+    sys.stdout.write(generate_program(args.units, args.seed))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Soplang benchmark harness
+
+Runs the programs in scripts/benchmark/programs/ in-process and times each
+phase of the pipeline separately:
+
+- lex:   Lexer(source).tokenize()
+- parse: Parser(tokens).parse(), from an already lexed token list
+- run:   Interpreter().interpret(ast) (or the VM), on a freshly parsed tree,
+         including resolving, compiling and any ka_keen imports
+
+Each phase is run ``--warmups`` times untimed, then ``--runs`` times timed.
+``--scaling`` also times the lexer and parser on synthetic programs of
+growing size (see generate_program.py).
+
+Results are written as JSON, so that two commits can be compared:
+
+    python scripts/benchmark/run_benchmarks.py -o before.json
+    git checkout other-branch
+    python scripts/benchmark/run_benchmarks.py -o after.json
+    python scripts/benchmark/run_benchmarks.py --compare before.json after.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from time import perf_counter
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROGRAMS_DIR = os.path.join(BENCHMARK_DIR, "programs")
+ROOT_DIR = os.path.dirname(os.path.dirname(BENCHMARK_DIR))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+from generate_program import generate_program  # noqa: E402
+
+from src.core.lexer import Lexer  # noqa: E402
+from src.core.parser import Parser  # noqa: E402
+from src.core.version import GRAMMAR_VERSION, VERSION  # noqa: E402
+from src.runtime.main import ENGINES, engine_class  # noqa: E402
+from src.runtime.modules import SEARCH_PATH_VARIABLE, registry  # noqa: E402
+from src.runtime.optimizer import Optimizer  # noqa: E402
+
+# Format of the JSON results, bumped when its layout changes
+RESULTS_VERSION = 1
+
+# Sizes (generated blocks of about 9 lines) of the --scaling programs
+SCALING_UNITS = (250, 500, 1000, 2000, 4000)
+
+
+def program_names():
+    return sorted(
+        name[:-4] for name in os.listdir(PROGRAMS_DIR) if name.endswith(".sop")
+    )
+
+
+def measure(function, warmups, runs):
+    """Time ``function()``, returning the timings of the ``runs`` timed calls"""
+    for _ in range(warmups):
+        function()
+    values = []
+    for _ in range(runs):
+        gc.collect()
+        start = perf_counter()
+        function()
+        values.append(perf_counter() - start)
+    return values
+
+
+def summarize(values):
+    return {
+        "values": values,
+        "min": min(values),
+        "median": statistics.median(values),
+        "mean": statistics.fmean(values),
+        "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+    }
+
+
+def time_front_end(source, warmups, runs):
+    """Time the lexer and the parser on ``source``"""
+    tokens = Lexer(source).tokenize()
+    return {
+        "lex": summarize(measure(lambda: Lexer(source).tokenize(), warmups, runs)),
+        "parse": summarize(measure(lambda: Parser(tokens).parse(), warmups, runs)),
+    }
+
+
+def time_program(name, engine, optimize, warmups, runs):
+    """Time each phase of the benchmark program ``name``"""
+    path = os.path.join(PROGRAMS_DIR, name + ".sop")
+    with open(path, encoding="utf-8") as file:
+        source = file.read()
+    results = time_front_end(source, warmups, runs)
+
+    def run():
+        # A fresh tree, interpreter and module registry every time, so that
+        # compiling and importing are part of each run
+        ast = Parser(Lexer(source).tokenize()).parse()
+        registry.modules.clear()
+        interpreter = engine_class(engine)()
+        interpreter.use_cache = False
+        if optimize:
+            interpreter.optimizer = Optimizer()
+        start = perf_counter()
+        with redirect_stdout(devnull):
+            interpreter.interpret(ast)
+        return perf_counter() - start
+
+    with open(os.devnull, "w") as devnull:
+        for _ in range(warmups):
+            run()
+        values = []
+        for _ in range(runs):
+            gc.collect()
+            values.append(run())
+    results["run"] = summarize(values)
+    return results
+
+
+def time_scaling(warmups, runs):
+    results = {}
+    for units in SCALING_UNITS:
+        source = generate_program(units)
+        entry = {"lines": source.count("\n"), "bytes": len(source.encode("utf-8"))}
+        entry.update(time_front_end(source, warmups, runs))
+        results[str(units)] = entry
+    return results
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "results_version": RESULTS_VERSION,
+        "soplang_version": VERSION,
+        "grammar_version": GRAMMAR_VERSION,
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "engine": args.engine,
+        "optimize": args.optimize,
+        "warmups": args.warmups,
+        "runs": args.runs,
+    }
+
+
+def format_time(seconds):
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    return f"{seconds * 1e3:.2f} ms"
+
+
+def print_results(results):
+    print(f"{'benchmark':<24} {'lex':>12} {'parse':>12} {'run':>12}")
+    for name, phases in results["benchmarks"].items():
+        cells = [
+            f"{format_time(phases[phase]['median']):>12}"
+            for phase in ("lex", "parse", "run")
+        ]
+        print(f"{name:<24} {' '.join(cells)}")
+    for units, phases in results.get("scaling", {}).items():
+        name = f"synthetic {phases['lines']} lines"
+        cells = [
+            f"{format_time(phases[phase]['median']):>12}" for phase in ("lex", "parse")
+        ]
+        print(f"{name:<24} {' '.join(cells)}")
+
+
+def compare(old_path, new_path):
+    """Print the change of every median timing between two result files"""
+    with open(old_path) as file:
+        old = json.load(file)
+    with open(new_path) as file:
+        new = json.load(file)
+
+    print(f"{'benchmark':<32} {'old':>12} {'new':>12} {'change':>9}")
+    for section in ("benchmarks", "scaling"):
+        for name, phases in new.get(section, {}).items():
+            old_phases = old.get(section, {}).get(name)
+            if old_phases is None:
+                continue
+            for phase, stats in phases.items():
+                if not isinstance(stats, dict) or phase not in old_phases:
+                    continue
+                before, after = old_phases[phase]["median"], stats["median"]
+                change = (after - before) / before * 100 if before else 0.0
+                label = f"{name} {phase}"
+                print(
+                    f"{label:<32} {format_time(before):>12} {format_time(after):>12} "
+                    f"{change:>+8.1f}%"
+                )
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Soplang benchmarks")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help=f"Benchmarks to run (default: all of {', '.join(program_names())})",
+    )
+    parser.add_argument(
+        "--engine", choices=sorted(ENGINES), default="interpreter", help="Engine"
+    )
+    parser.add_argument("-O", "--optimize", action="store_true", help="Run with -O")
+    parser.add_argument("--warmups", type=int, default=1, help="Untimed runs")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs")
+    parser.add_argument(
+        "--scaling",
+        action="store_true",
+        help="Also time the lexer and parser on synthetic programs of growing size",
+    )
+    parser.add_argument("-o", "--output", metavar="FILE", help="Write JSON results")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Compare two JSON result files instead of running benchmarks",
+    )
+    args = parser.parse_args(argv)
+    if args.compare:
+        return compare(*args.compare)
+    if args.runs < 1 or args.warmups < 0:
+        parser.error("--runs must be at least 1 and --warmups at least 0")
+
+    names = args.benchmarks or program_names()
+    unknown = set(names) - set(program_names())
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    # ka_keen names in the programs are relative to the programs directory
+    os.environ[SEARCH_PATH_VARIABLE] = PROGRAMS_DIR
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+
+    start = time.monotonic()
+    results = {"metadata": metadata(args), "benchmarks": {}}
+    for name in names:
+        results["benchmarks"][name] = time_program(
+            name, args.engine, args.optimize, args.warmups, args.runs
+        )
+    if args.scaling:
+        results["scaling"] = time_scaling(args.warmups, args.runs)
+    results["metadata"]["duration"] = time.monotonic() - start
+
+    print_results(results)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
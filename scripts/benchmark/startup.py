@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Soplang start-up benchmark
+
+Measures what it costs to start Soplang for a short script, the way a job
+scheduler running thousands of them does:
+
+- the modules imported by ``main.py FILE`` and ``main.py -c CODE``, from
+  ``python -X importtime``, checked against a list of modules that only the
+  interactive shell may import
+- the wall-clock time of whole runs, checked against a budget relative to
+  that of ``python -c pass`` on the same machine, so the check does not
+  depend on how fast the machine is
+
+Usage:
+    python scripts/benchmark/startup.py [--runs N] [--budget TIMES] [-o FILE]
+
+The exit status is 1 when a check fails, so this can run in CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from time import perf_counter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MAIN = os.path.join(ROOT_DIR, "main.py")
+
+# Times the wall-clock time of ``python -c pass`` that a run may take
+DEFAULT_BUDGET = 6.0
+
+# Modules (and packages) of the interactive shell, which running code must
+# not import
+SHELL_MODULES = (
+    "src.runtime.shell",
+    "prompt_toolkit",
+    "readline",
+    "colorama",
+    "asyncio",
+)
+
+SCRIPT = 'qor("salaan")\n'
+
+
+def import_times(args):
+    """{module: (self us, cumulative us)} of the modules ``python args`` imports"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        cwd=ROOT_DIR,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+
+def wall_times(args, runs):
+    values = []
+    for _ in range(runs):
+        start = perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, cwd=ROOT_DIR)
+        values.append(perf_counter() - start)
+    return values
+
+
+def is_shell_module(module):
+    return any(
+        module == name or module.startswith(name + ".") for name in SHELL_MODULES
+    )
+
+
+def check(name, args, baseline, python_s, budget, runs):
+    """Measure one command line, returning (results, list of failed checks)
+
+    ``baseline`` holds the modules of ``python -c pass`` and ``python_s`` its
+    wall-clock time, of which the run may take ``budget`` times.
+    """
+    modules = import_times(args)
+    added = set(modules) - set(baseline)
+    import_ms = sum(modules[module][0] for module in added) / 1000
+    shell_modules = sorted(module for module in added if is_shell_module(module))
+    wall_s = statistics.median(wall_times(args, runs))
+    results = {
+        "import_ms": import_ms,
+        "modules": len(added),
+        "shell_modules": shell_modules,
+        "wall_s": wall_s,
+        "ratio": wall_s / python_s,
+    }
+    failures = []
+    if wall_s > budget * python_s:
+        failures.append(
+            f"{name}: takes {wall_s * 1e3:.1f} ms, {results['ratio']:.1f} times "
+            f"python -c pass (budget: {budget} times)"
+        )
+    if shell_modules:
+        failures.append(f"{name}: imports shell modules {', '.join(shell_modules)}")
+    return results, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Soplang start-up time")
+    parser.add_argument("--runs", type=int, default=10, help="Timed runs of each")
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        metavar="TIMES",
+        help="Wall-clock budget of a run, in times that of python -c pass "
+        f"(default: {DEFAULT_BUDGET})",
+    )
+    parser.add_argument("-o", "--output", metavar="FILE", help="Write JSON results")
+    args = parser.parse_args(argv)
+
+    baseline = import_times(["-c", "pass"])
+    python_s = statistics.median(wall_times(["-c", "pass"], args.runs))
+    results = {"python": {"wall_s": python_s, "ratio": 1.0}}
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "script.sop")
+        with open(script, "w") as file:
+            file.write(SCRIPT)
+        commands = {
+            "file": [MAIN, script],
+            "file --no-cache": [MAIN, "--no-cache", script],
+            "-c": [MAIN, "-c", SCRIPT],
+        }
+        for name, command in commands.items():
+            results[name], failed = check(
+                name, command, baseline, python_s, args.budget, args.runs
+            )
+            failures.extend(failed)
+
+    print(
+        f"{'command':<18} {'wall ms':>9} {'x python':>9} {'imports ms':>11} "
+        f"{'modules':>8}"
+    )
+    for name, entry in results.items():
+        print(
+            f"{name:<18} {entry['wall_s'] * 1e3:>9.1f} {entry['ratio']:>9.1f} "
+            f"{entry.get('import_ms', 0.0):>11.1f} {entry.get('modules', 0):>8}"
+        )
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,23 +20,53 @@ Soplang bridges linguistic accessibility with computing concepts, making
 programming more inclusive while maintaining a strong technical foundation.
 """
 
-# Core language components
-from src.core.lexer import Lexer, Token
-from src.core.parser import Parser
-from src.core.tokens import TokenType
-from src.core.ast import ASTNode, NodeType
-
-# Runtime components
-from src.runtime.interpreter import Interpreter
-from src.runtime.shell import SoplangShell
-
-# Utilities and error handling
-from src.utils.errors import (
-    SoplangError, LexerError, ParserError, RuntimeError,
-    TypeError, ImportError, BreakSignal, ContinueSignal, ReturnSignal
-)
-
-# Standard library
-from src.stdlib.builtins import get_builtin_functions, get_list_methods, get_object_methods
-
-# Make src a proper Python package
+# Public names and the modules defining them. They are imported on first use
+# (PEP 562), so that importing one module of the package, as running a file
+# does, does not also import the interactive shell and its dependencies.
+_EXPORTS = {
+    # Core language components
+    "Lexer": "src.core.lexer",
+    "Token": "src.core.lexer",
+    "Parser": "src.core.parser",
+    "TokenType": "src.core.tokens",
+    "ASTNode": "src.core.ast",
+    "NodeType": "src.core.ast",
+    # Runtime components
+    "Interpreter": "src.runtime.interpreter",
+    "SoplangShell": "src.runtime.shell",
+    # Embedding API
+    "compile": "src.runtime.program",
+    "Program": "src.runtime.program",
+    "Result": "src.runtime.program",
+    # Utilities and error handling
+    "SoplangError": "src.utils.errors",
+    "LexerError": "src.utils.errors",
+    "ParserError": "src.utils.errors",
+    "RuntimeError": "src.utils.errors",
+    "TypeError": "src.utils.errors",
+    "ImportError": "src.utils.errors",
+    "BreakSignal": "src.utils.errors",
+    "ContinueSignal": "src.utils.errors",
+    "ReturnSignal": "src.utils.errors",
+    # Standard library
+    "get_builtin_functions": "src.stdlib.builtins",
+    "get_list_methods": "src.stdlib.builtins",
+    "get_object_methods": "src.stdlib.builtins",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(module), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
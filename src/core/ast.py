@@ -30,30 +30,37 @@ class NodeType(Enum):
     INDEX_ACCESS = "INDEX_ACCESS"  # For list[index]
     # For explicit assignment (separate from declaration)
     ASSIGNMENT = "ASSIGNMENT"
+    # && and || that skip their right operand, created by the Optimizer
+    LOGICAL_OPERATION = "LOGICAL_OPERATION"
 
 
 class ASTNode:
-    def __init__(self, type_, value=None, children=None, line=None, position=None):
-        self.type = type_
+    """Base class of the AST nodes
+
+    Every NodeType has its own node class below, whose ``type`` is a class
+    attribute. Nodes only carry the attributes their type uses, in
+    ``__slots__``, and the children of a node are also reachable through the
+    named properties of its class (``left``/``right``, ``target``, ...).
+    """
+
+    __slots__ = ("value", "children", "line", "position", "code")
+
+    type = None
+
+    def __init__(self, value=None, children=None, line=None, position=None):
         self.value = value
         self.children = children if children else []
-        self.var_type = None  # For static typing
-        self.is_constant = False  # For constant variables (madoor)
         self.line = line  # Store line number
         self.position = position  # Store position/column number
+        self.code = None  # Compiled closure, filled in lazily by the Compiler
 
     def __repr__(self):
         type_info = ""
-        if (
-            self.type == NodeType.VARIABLE_DECLARATION and
-            hasattr(self, "var_type") and
-            self.var_type is not None
-        ):
-            type_info = f", var_type={self.var_type}"
+        if self.type == NodeType.VARIABLE_DECLARATION:
+            if self.var_type is not None:
+                type_info = f", var_type={self.var_type}"
             if self.is_constant:
                 type_info += ", constant=True"
-        elif self.type == NodeType.VARIABLE_DECLARATION and self.is_constant:
-            type_info = ", constant=True"
 
         line_pos = ""
         if self.line is not None:
@@ -61,3 +68,333 @@ class ASTNode:
             if self.position is not None:
                 line_pos += f", pos={self.position}"
         return f"ASTNode({self.type}, value={self.value}{type_info}{line_pos}, children={self.children})"
+
+
+class ResolvedNode(ASTNode):
+    """A node naming a variable, annotated by the Resolver with the scope
+    distance and local slot of that variable (slot None for globals)"""
+
+    __slots__ = ("depth", "slot")
+
+    def __init__(self, value=None, children=None, line=None, position=None):
+        super().__init__(value, children, line, position)
+        self.depth = None
+        self.slot = None
+
+
+class Program(ASTNode):
+    __slots__ = ()
+    type = NodeType.PROGRAM
+
+
+class VariableDeclaration(ResolvedNode):
+    __slots__ = ("var_type", "is_constant")
+    type = NodeType.VARIABLE_DECLARATION
+
+    def __init__(self, value=None, children=None, line=None, position=None):
+        super().__init__(value, children, line, position)
+        self.var_type = None  # For static typing
+        self.is_constant = False  # For constant variables (madoor)
+
+    @property
+    def name(self):
+        return self.value
+
+    @property
+    def initializer(self):
+        return self.children[0]
+
+
+class FunctionDefinition(ASTNode):
+    __slots__ = ("locals",)
+    type = NodeType.FUNCTION_DEFINITION
+
+    def __init__(self, value=None, children=None, line=None, position=None):
+        super().__init__(value, children, line, position)
+        self.locals = None  # Local slots of the function, set by the Resolver
+
+    @property
+    def name(self):
+        return self.value
+
+
+class FunctionCall(ASTNode):
+    __slots__ = ()
+    type = NodeType.FUNCTION_CALL
+
+    @property
+    def name(self):
+        return self.value
+
+    @property
+    def args(self):
+        return self.children
+
+
+class IfStatement(ASTNode):
+    __slots__ = ()
+    type = NodeType.IF_STATEMENT
+
+    @property
+    def condition(self):
+        return self.children[0]
+
+
+class SwitchStatement(ASTNode):
+    __slots__ = ()
+    type = NodeType.SWITCH_STATEMENT
+
+    @property
+    def subject(self):
+        return self.children[0]
+
+
+class LoopStatement(ResolvedNode):
+    __slots__ = ()
+    type = NodeType.LOOP_STATEMENT
+
+    @property
+    def variable(self):
+        return self.value
+
+
+class WhileStatement(ASTNode):
+    __slots__ = ()
+    type = NodeType.WHILE_STATEMENT
+
+    @property
+    def condition(self):
+        return self.children[0]
+
+    @property
+    def body(self):
+        return self.children[1:]
+
+
+class Block(ASTNode):
+    __slots__ = ()
+    type = NodeType.BLOCK
+
+
+class BinaryOperation(ASTNode):
+    __slots__ = ()
+    type = NodeType.BINARY_OPERATION
+
+    @property
+    def operator(self):
+        return self.value
+
+    @property
+    def left(self):
+        return self.children[0]
+
+    @property
+    def right(self):
+        return self.children[1]
+
+
+class LogicalOperation(ASTNode):
+    __slots__ = ()
+    type = NodeType.LOGICAL_OPERATION
+
+    @property
+    def operator(self):
+        return self.value
+
+    @property
+    def left(self):
+        return self.children[0]
+
+    @property
+    def right(self):
+        return self.children[1]
+
+
+class UnaryOperation(ASTNode):
+    __slots__ = ()
+    type = NodeType.UNARY_OPERATION
+
+    @property
+    def operator(self):
+        return self.value
+
+    @property
+    def operand(self):
+        return self.children[0]
+
+
+class Literal(ASTNode):
+    __slots__ = ()
+    type = NodeType.LITERAL
+
+
+class Identifier(ResolvedNode):
+    __slots__ = ()
+    type = NodeType.IDENTIFIER
+
+    @property
+    def name(self):
+        return self.value
+
+
+class ClassDefinition(ASTNode):
+    __slots__ = ()
+    type = NodeType.CLASS_DEFINITION
+
+
+class ImportStatement(ASTNode):
+    __slots__ = ()
+    type = NodeType.IMPORT_STATEMENT
+
+    @property
+    def filename(self):
+        return self.value
+
+
+class TryCatch(ResolvedNode):
+    __slots__ = ()
+    type = NodeType.TRY_CATCH
+
+    @property
+    def error_name(self):
+        return self.value
+
+    @property
+    def try_block(self):
+        return self.children[0]
+
+    @property
+    def catch_block(self):
+        return self.children[1]
+
+
+class BreakStatement(ASTNode):
+    __slots__ = ()
+    type = NodeType.BREAK_STATEMENT
+
+
+class ContinueStatement(ASTNode):
+    __slots__ = ()
+    type = NodeType.CONTINUE_STATEMENT
+
+
+class ReturnStatement(ASTNode):
+    __slots__ = ()
+    type = NodeType.RETURN_STATEMENT
+
+    @property
+    def expression(self):
+        return self.children[0] if self.children else None
+
+
+class ListLiteral(ASTNode):
+    __slots__ = ()
+    type = NodeType.LIST_LITERAL
+
+    @property
+    def elements(self):
+        return self.children
+
+
+class ObjectLiteral(ASTNode):
+    __slots__ = ()
+    type = NodeType.OBJECT_LITERAL
+
+    @property
+    def properties(self):
+        return self.children
+
+
+class PropertyAccess(ASTNode):
+    __slots__ = ()
+    type = NodeType.PROPERTY_ACCESS
+
+    @property
+    def name(self):
+        return self.value
+
+    @property
+    def object(self):
+        return self.children[0]
+
+
+class MethodCall(ASTNode):
+    __slots__ = ()
+    type = NodeType.METHOD_CALL
+
+    @property
+    def name(self):
+        return self.value
+
+    @property
+    def object(self):
+        return self.children[0]
+
+    @property
+    def args(self):
+        return self.children[1:]
+
+
+class IndexAccess(ASTNode):
+    __slots__ = ()
+    type = NodeType.INDEX_ACCESS
+
+    @property
+    def object(self):
+        return self.children[0]
+
+    @property
+    def index(self):
+        return self.children[1]
+
+
+class Assignment(ResolvedNode):
+    __slots__ = ()
+    type = NodeType.ASSIGNMENT
+
+    @property
+    def target(self):
+        return self.children[0]
+
+    @property
+    def expression(self):
+        return self.children[1]
+
+
+# Node class of each NodeType
+NODE_CLASSES = {cls.type: cls for cls in (
+    Program, VariableDeclaration, FunctionDefinition, FunctionCall,
+    IfStatement, SwitchStatement, LoopStatement, WhileStatement, Block,
+    BinaryOperation, UnaryOperation, Literal, Identifier, ClassDefinition,
+    ImportStatement, TryCatch, BreakStatement, ContinueStatement,
+    ReturnStatement, ListLiteral, ObjectLiteral, PropertyAccess, MethodCall,
+    IndexAccess, Assignment, LogicalOperation,
+)}
+
+
+def make_node(type_, value=None, children=None, line=None, position=None):
+    """Create a node of the class registered for ``type_``"""
+    return NODE_CLASSES[type_](value, children, line, position)
+
+
+def dump(node):
+    """Outline of the tree below ``node``, one indented line per node"""
+    lines = []
+
+    def visit(node, depth):
+        line = "  " * depth + node.type.name
+        if node.type == NodeType.LITERAL or node.value is not None:
+            line += f" {node.value!r}"
+        if node.type == NodeType.VARIABLE_DECLARATION:
+            if node.var_type is not None:
+                line += f" var_type={node.var_type.name}"
+            if node.is_constant:
+                line += " constant"
+        if node.line is not None:
+            line += f" (line {node.line})"
+        lines.append(line)
+        for child in node.children:
+            visit(child, depth + 1)
+
+    visit(node, 0)
+    return "\n".join(lines)
@@ -1,8 +1,63 @@
+import re
+
 from src.core.tokens import TokenType
 from src.utils.errors import LexerError
 
+# Master pattern of the fast scanner in Lexer.iter_tokens(), one group per kind of
+# lexeme. Anything it does not match (names or numbers starting with a
+# non-ASCII character, unterminated strings and comments, stray characters)
+# is handed to the character scanner, which also reports the errors.
+TOKEN_PATTERN = re.compile(
+    r"""
+    [ \t]*                              # Blanks before the lexeme
+    (?:
+        (                               # 1: name or operator
+            [A-Za-z]\w*
+            |>=|<=|!=|&&|\|\|
+            |/(?![/*])
+            |[-+*%=(){}<>!,:;\[\].]
+        )
+        |(\s+)                          # 2: whitespace
+        |(//[^\n]*\n?|/\*.*?\*/)        # 3: comment
+        |([0-9][0-9.]*)                 # 4: number
+        |"([^"]*)"                      # 5: double quoted string
+        |'([^']*)'                      # 6: single quoted string
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+OPERATORS = {
+    "+": TokenType.PLUS,
+    "-": TokenType.MINUS,
+    "*": TokenType.STAR,
+    "/": TokenType.SLASH,
+    "%": TokenType.MODULO,
+    "=": TokenType.EQUAL,
+    "(": TokenType.LEFT_PAREN,
+    ")": TokenType.RIGHT_PAREN,
+    "{": TokenType.LEFT_BRACE,
+    "}": TokenType.RIGHT_BRACE,
+    ">": TokenType.GREATER,
+    ">=": TokenType.GREATER_EQUAL,
+    "<": TokenType.LESS,
+    "<=": TokenType.LESS_EQUAL,
+    "!": TokenType.NOT,
+    "!=": TokenType.NOT_EQUAL,
+    "&&": TokenType.AND,
+    "||": TokenType.OR,
+    ",": TokenType.COMMA,
+    ":": TokenType.COLON,
+    ";": TokenType.SEMICOLON,
+    "[": TokenType.LEFT_BRACKET,
+    "]": TokenType.RIGHT_BRACKET,
+    ".": TokenType.DOT,
+}
+
 
 class Token:
+    __slots__ = ("type", "value", "line", "position")
+
     def __init__(self, type_, value, line=None, position=None):
         self.type = type_
         self.value = value
@@ -378,6 +433,93 @@ class Lexer:
         return Token(TokenType.EOF, None, line=self.line, position=self.column)
 
     def tokenize(self):
+        """Return the list of tokens of the source"""
+        return list(self.iter_tokens())
+
+    def iter_tokens(self):
+        """Yield the tokens of the source, scanning it with TOKEN_PATTERN
+
+        Tokens are produced as the parser asks for them, so the whole token
+        stream is never held in memory. Produces exactly the tokens of
+        tokenize_chars(), which is used for anything the pattern does not
+        handle.
+        """
+        source = self.source
+        end = len(source)
+        kinds = {**self.KEYWORDS, **OPERATORS}
+        identifier = TokenType.IDENTIFIER
+        number = TokenType.NUMBER
+        string = TokenType.STRING
+
+        pos = 0
+        line = 1
+        line_start = 0  # Index of the first character of the current line
+        skipped = False  # Whether the last lexeme was whitespace or a comment
+        scanner = TOKEN_PATTERN.scanner(source)
+        while pos < end:
+            m = scanner.match()
+            group = m.lastindex if m is not None else None
+
+            if group == 1:
+                start, pos = m.span(1)
+                text = m.group(1)
+                yield Token(
+                    kinds.get(text, identifier), text, line, start - line_start + 1
+                )
+                skipped = False
+                continue
+
+            if group == 2 or group == 3:
+                start, pos = m.span(group)
+                skipped = True
+            elif group == 4 and not (
+                # The character scanner also accepts non-ASCII digits
+                m.end() < end and source[m.end()] > "\x7f" and source[m.end()].isdigit()
+            ):
+                start, pos = m.span(4)
+                text = m.group(4)
+                value = float(text) if "." in text else int(text)
+                yield Token(number, value, line, start - line_start + 1)
+                skipped = False
+                continue
+            elif group == 5 or group == 6:
+                start, pos = m.span()
+                yield Token(string, m.group(group), line, m.start(group) - line_start)
+                skipped = False
+            else:
+                # Scan this lexeme one character at a time, from the first
+                # character that is not a blank
+                if m is not None:
+                    pos = m.start(group)
+                self.position = pos
+                self.line = line
+                self.column = pos - line_start + 1
+                self.current_char = source[pos]
+                yield self.next_token()
+                pos = self.position
+                line = self.line
+                line_start = pos - self.column + 1
+                skipped = False
+                scanner = TOKEN_PATTERN.scanner(source, pos)
+                continue
+
+            # Whitespace, comments and strings can span several lines
+            newlines = source.count("\n", start, pos)
+            if newlines:
+                line += newlines
+                line_start = source.rindex("\n", start, pos) + 1
+
+        # Like tokenize_chars(), only trailing whitespace or comments lead to EOF
+        if skipped:
+            yield Token(TokenType.EOF, None, line, pos - line_start + 1)
+
+        self.position = pos
+        self.line = line
+        self.column = pos - line_start + 1
+        self.current_char = None
+
+    def tokenize_chars(self):
+        """Return the tokens of the source, scanning one character at a time"""
         tokens = []
         while self.position < len(self.source):
             token = self.next_token()
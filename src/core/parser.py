@@ -1,13 +1,50 @@
-from src.core.ast import ASTNode, NodeType
+from collections import deque
+
+from src.core.ast import (
+    Assignment,
+    BinaryOperation,
+    Block,
+    BreakStatement,
+    ClassDefinition,
+    ContinueStatement,
+    FunctionCall,
+    FunctionDefinition,
+    Identifier,
+    IfStatement,
+    ImportStatement,
+    IndexAccess,
+    ListLiteral,
+    Literal,
+    LoopStatement,
+    MethodCall,
+    NodeType,
+    ObjectLiteral,
+    Program,
+    PropertyAccess,
+    ReturnStatement,
+    SwitchStatement,
+    TryCatch,
+    UnaryOperation,
+    VariableDeclaration,
+    WhileStatement,
+    make_node,
+)
+from src.core.lexer import Token
 from src.core.tokens import TokenType
 from src.utils.errors import ParserError
 
 
 class Parser:
     def __init__(self, tokens):
-        self.tokens = tokens
+        """Parse a token list, or any iterable of tokens such as Lexer.iter_tokens()
+
+        Tokens are pulled from the iterable one at a time, keeping only those
+        looked ahead at in a small buffer.
+        """
+        self.tokens = iter(tokens)
+        self.lookahead = deque()
         self.current_token_index = 0
-        self.current_token = self.tokens[self.current_token_index]
+        self.current_token = self.next_token(None)
 
     def get_friendly_token_name(self, token_type):
         """Convert token types to user-friendly descriptions."""
@@ -64,10 +101,32 @@ class Parser:
 
         return token_descriptions.get(token_type, str(token_type))
 
+    def next_token(self, previous):
+        """Take the next token from the stream, or EOF once it is exhausted"""
+        if self.lookahead:
+            return self.lookahead.popleft()
+        token = next(self.tokens, None)
+        if token is not None:
+            return token
+        if previous is None:
+            return Token(TokenType.EOF, None, 1, 1)
+        if previous.type == TokenType.EOF:
+            return previous
+        return Token(TokenType.EOF, None, previous.line, previous.position)
+
+    def peek(self, distance=1):
+        """Return the token ``distance`` tokens after the current one"""
+        while len(self.lookahead) < distance:
+            token = next(self.tokens, None)
+            if token is None:
+                last = self.lookahead[-1] if self.lookahead else self.current_token
+                token = Token(TokenType.EOF, None, last.line, last.position)
+            self.lookahead.append(token)
+        return self.lookahead[distance - 1]
+
     def advance(self):
         self.current_token_index += 1
-        if self.current_token_index < len(self.tokens):
-            self.current_token = self.tokens[self.current_token_index]
+        self.current_token = self.next_token(self.current_token)
 
     def expect(self, token_type):
         if self.current_token.type == token_type:
@@ -93,7 +152,7 @@ class Parser:
         statements = []
         while self.current_token.type != TokenType.EOF:
             statements.append(self.parse_statement())
-        return ASTNode(NodeType.PROGRAM, children=statements)
+        return Program(children=statements)
 
     def parse_statement(self):
         """
@@ -168,8 +227,7 @@ class Parser:
             expression = self.parse_logical_expression()
 
             # Create variable declaration node
-            var_node = ASTNode(
-                NodeType.VARIABLE_DECLARATION,
+            var_node = VariableDeclaration(
                 value=var_name,
                 children=[expression],
                 line=line,
@@ -195,8 +253,7 @@ class Parser:
         elif token_type == TokenType.qor:
             self.advance()  # Consume qor
             # Parse function call expression
-            return ASTNode(
-                NodeType.FUNCTION_CALL,
+            return FunctionCall(
                 value="qor",
                 children=[self.parse_expression()],
                 line=line,
@@ -245,7 +302,7 @@ class Parser:
                 statements.append(self.parse_statement())
 
             self.expect(TokenType.RIGHT_BRACE)
-            return ASTNode(NodeType.BLOCK, children=statements)
+            return Block(children=statements, line=line, position=position)
 
         # Handle identifier
         elif token_type == TokenType.IDENTIFIER:
@@ -255,7 +312,7 @@ class Parser:
 
             # Handle property chains (obj.prop1.prop2) or arrays (obj[idx]) for assignment
             if self.current_token.type in (TokenType.DOT, TokenType.LEFT_BRACKET):
-                left = ASTNode(NodeType.IDENTIFIER, value=identifier_value)
+                left = Identifier(value=identifier_value, line=line, position=position)
 
                 # Parse any chain of property accesses or array indexing
                 while self.current_token.type in (
@@ -276,7 +333,8 @@ class Parser:
                                 position=getattr(self.current_token, "position", None),
                             )
 
-                        prop_name = self.current_token.value
+                        prop_token = self.current_token
+                        prop_name = prop_token.value
                         self.advance()  # Consume the property name
 
                         if self.current_token.type == TokenType.LEFT_PAREN:
@@ -291,31 +349,40 @@ class Parser:
                                     args.append(self.parse_logical_expression())
 
                             self.expect(TokenType.RIGHT_PAREN)
-                            left = ASTNode(
-                                NodeType.METHOD_CALL,
+                            left = MethodCall(
                                 value=prop_name,
                                 children=[left] + args,
+                                line=prop_token.line,
+                                position=prop_token.position,
                             )
                         else:
                             # Regular property access (obj.prop)
-                            left = ASTNode(
-                                NodeType.PROPERTY_ACCESS,
+                            left = PropertyAccess(
                                 value=prop_name,
                                 children=[left],
+                                line=prop_token.line,
+                                position=prop_token.position,
                             )
 
                     elif self.current_token.type == TokenType.LEFT_BRACKET:
                         # Handle array indexing (arr[idx])
+                        bracket = self.current_token
                         self.advance()  # Consume left bracket
                         index = self.parse_logical_expression()
                         self.expect(TokenType.RIGHT_BRACKET)
-                        left = ASTNode(NodeType.INDEX_ACCESS, children=[left, index])
+                        left = IndexAccess(
+                            children=[left, index],
+                            line=bracket.line,
+                            position=bracket.position,
+                        )
 
                 # Now check if this is an assignment (obj.prop = value or arr[idx] = value)
                 if self.current_token.type == TokenType.EQUAL:
                     self.advance()  # Consume equals
                     value = self.parse_logical_expression()
-                    return ASTNode(NodeType.ASSIGNMENT, children=[left, value], line=line, position=position)
+                    return Assignment(
+                        children=[left, value], line=line, position=position
+                    )
 
                 # If not an assignment, just return the property access or method call
                 return left
@@ -332,18 +399,19 @@ class Parser:
                         args.append(self.parse_logical_expression())
 
                 self.expect(TokenType.RIGHT_PAREN)
-                return ASTNode(
-                    NodeType.FUNCTION_CALL, value=identifier_value, children=args
+                return FunctionCall(
+                    value=identifier_value, children=args, line=line, position=position
                 )
 
             # Handle simple variable assignment (var = value)
             elif self.current_token.type == TokenType.EQUAL:
                 self.advance()  # Consume equals
                 value = self.parse_logical_expression()
-                return ASTNode(
-                    NodeType.ASSIGNMENT,
+                return Assignment(
                     children=[
-                        ASTNode(NodeType.IDENTIFIER, value=identifier_value),
+                        Identifier(
+                            value=identifier_value, line=line, position=position
+                        ),
                         value,
                     ],
                     line=line,
@@ -351,7 +419,7 @@ class Parser:
                 )
 
             # Just a variable reference
-            return ASTNode(NodeType.IDENTIFIER, value=identifier_value)
+            return Identifier(value=identifier_value, line=line, position=position)
 
         # Top-level 'haddii_kale', 'ugudambeyn' are invalid
         if token_type in (TokenType.HADDII_KALE, TokenType.UGUDAMBEYN):
@@ -405,8 +473,7 @@ class Parser:
         expression = self.parse_logical_expression()
 
         # Create variable declaration node
-        var_node = ASTNode(
-            NodeType.VARIABLE_DECLARATION,
+        var_node = VariableDeclaration(
             value=var_name,
             children=[expression],
             line=token_line,
@@ -421,6 +488,7 @@ class Parser:
     #  hawl foo(a, b) { ... }
     # -----------------------------
     def parse_function_definition(self):
+        start = self.current_token
         self.expect(TokenType.HAWL)
         func_name = self.current_token.value
         self.expect(TokenType.IDENTIFIER)
@@ -428,7 +496,10 @@ class Parser:
 
         params = []
         while self.current_token.type != TokenType.RIGHT_PAREN:
-            params.append(self.current_token.value)
+            param = self.current_token
+            params.append(
+                Identifier(value=param.value, line=param.line, position=param.position)
+            )
             self.expect(TokenType.IDENTIFIER)
             if self.current_token.type == TokenType.COMMA:
                 self.advance()
@@ -441,10 +512,11 @@ class Parser:
             body.append(self.parse_statement())
 
         self.expect(TokenType.RIGHT_BRACE)
-        return ASTNode(
-            NodeType.FUNCTION_DEFINITION,
+        return FunctionDefinition(
             value=func_name,
-            children=[ASTNode(NodeType.IDENTIFIER, value=p) for p in params] + body,
+            children=params + body,
+            line=start.line,
+            position=start.position,
         )
 
     # -----------------------------
@@ -480,8 +552,9 @@ class Parser:
         if self.current_token.type != TokenType.IDENTIFIER:
             func_name = self.current_token.type.value
 
+        start = self.current_token
         self.advance()
-        func_call = self.parse_function_call_helper(func_name)
+        func_call = self.parse_function_call_helper(func_name, start)
 
         # If this is a function call as a statement (not part of an expression),
         # consume the semicolon if present, but don't require it
@@ -494,6 +567,7 @@ class Parser:
     #  Import statement: ka_keen "file.sp"
     # -----------------------------
     def parse_import_statement(self):
+        start = self.current_token
         self.expect(TokenType.KA_KEEN)
         if self.current_token.type != TokenType.STRING:
             raise ParserError(
@@ -506,7 +580,7 @@ class Parser:
             )
         filename = self.current_token.value
         self.advance()  # consume the STRING
-        return ASTNode(NodeType.IMPORT_STATEMENT, value=filename)
+        return ImportStatement(value=filename, line=start.line, position=start.position)
 
     # -----------------------------
     #  If statement:
@@ -515,6 +589,7 @@ class Parser:
     #  [ugudambeyn { ... }]
     # -----------------------------
     def parse_if_statement(self):
+        start = self.current_token
         self.expect(TokenType.HADDII)
         self.expect(TokenType.LEFT_PAREN)
         condition = self.parse_logical_expression()
@@ -530,6 +605,7 @@ class Parser:
 
         # Parse zero or more 'haddii_kale'
         while self.current_token.type == TokenType.HADDII_KALE:
+            elif_token = self.current_token
             self.advance()
             self.expect(TokenType.LEFT_PAREN)
             elif_condition = self.parse_logical_expression()
@@ -539,13 +615,16 @@ class Parser:
             while self.current_token.type != TokenType.RIGHT_BRACE:
                 elif_body.append(self.parse_statement())
             self.expect(TokenType.RIGHT_BRACE)
-            elif_node = ASTNode(
-                NodeType.IF_STATEMENT, children=[elif_condition] + elif_body
+            elif_node = IfStatement(
+                children=[elif_condition] + elif_body,
+                line=elif_token.line,
+                position=elif_token.position,
             )
             children.append(elif_node)
 
         # Optionally parse 'ugudambeyn'
         if self.current_token.type == TokenType.UGUDAMBEYN:
+            else_token = self.current_token
             self.advance()
             self.expect(TokenType.LEFT_BRACE)
             else_body = []
@@ -553,16 +632,19 @@ class Parser:
                 else_body.append(self.parse_statement())
             self.expect(TokenType.RIGHT_BRACE)
             # We'll treat else_body as a BLOCK node
-            else_block = ASTNode(NodeType.BLOCK, children=else_body)
+            else_block = Block(
+                children=else_body, line=else_token.line, position=else_token.position
+            )
             children.append(else_block)
 
-        return ASTNode(NodeType.IF_STATEMENT, children=children)
+        return IfStatement(children=children, line=start.line, position=start.position)
 
     # -----------------------------
     #  Loops: kuceli (i 1 ilaa 5) { ... }
     #  or with step: kuceli (i 1 ilaa 5 by 2) { ... }
     # -----------------------------
     def parse_loop_statement(self):
+        start = self.current_token
         self.expect(TokenType.kuceli)
 
         # Expect an opening parenthesis
@@ -614,12 +696,15 @@ class Parser:
             children.append(step_expr)
         children.extend(body)
 
-        return ASTNode(NodeType.LOOP_STATEMENT, value=loop_var, children=children)
+        return LoopStatement(
+            value=loop_var, children=children, line=start.line, position=start.position
+        )
 
     # -----------------------------
     #  While loop: intay (condition) { ... }
     # -----------------------------
     def parse_while_statement(self):
+        start = self.current_token
         self.expect(TokenType.INTAY)
         self.expect(TokenType.LEFT_PAREN)
         condition = self.parse_logical_expression()
@@ -632,26 +717,31 @@ class Parser:
         self.expect(TokenType.RIGHT_BRACE)
 
         children = [condition] + body
-        return ASTNode(NodeType.WHILE_STATEMENT, children=children)
+        return WhileStatement(
+            children=children, line=start.line, position=start.position
+        )
 
     # -----------------------------
     #  Break statement: jooji
     # -----------------------------
     def parse_break_statement(self):
+        start = self.current_token
         self.expect(TokenType.JOOJI)
-        return ASTNode(NodeType.BREAK_STATEMENT)
+        return BreakStatement(line=start.line, position=start.position)
 
     # -----------------------------
     #  Continue statement: soco
     # -----------------------------
     def parse_continue_statement(self):
+        start = self.current_token
         self.expect(TokenType.soco)
-        return ASTNode(NodeType.CONTINUE_STATEMENT)
+        return ContinueStatement(line=start.line, position=start.position)
 
     # -----------------------------
     #  try/catch: isku_day { ... } qabo (err) { ... }
     # -----------------------------
     def parse_try_catch(self):
+        start = self.current_token
         self.expect(TokenType.ISKU_DAY)
         self.expect(TokenType.LEFT_BRACE)
 
@@ -661,6 +751,7 @@ class Parser:
         self.expect(TokenType.RIGHT_BRACE)
 
         # parse 'qabo (errName)'
+        catch_token = self.current_token
         self.expect(TokenType.QABO)
         self.expect(TokenType.LEFT_PAREN)
         error_var = self.current_token.value
@@ -673,19 +764,25 @@ class Parser:
             catch_body.append(self.parse_statement())
         self.expect(TokenType.RIGHT_BRACE)
 
-        return ASTNode(
-            NodeType.TRY_CATCH,
+        return TryCatch(
             value=error_var,
             children=[
-                ASTNode(NodeType.BLOCK, children=try_body),
-                ASTNode(NodeType.BLOCK, children=catch_body),
+                Block(children=try_body, line=start.line, position=start.position),
+                Block(
+                    children=catch_body,
+                    line=catch_token.line,
+                    position=catch_token.position,
+                ),
             ],
+            line=start.line,
+            position=start.position,
         )
 
     # -----------------------------
     #  Class Definition: fasalka Ey ka_dhaxal Xayawaan { ... }
     # -----------------------------
     def parse_class_definition(self):
+        start = self.current_token
         self.expect(TokenType.FASALKA)
         class_name = self.current_token.value
         self.expect(TokenType.IDENTIFIER)
@@ -704,7 +801,12 @@ class Parser:
             class_body.append(self.parse_statement())
         self.expect(TokenType.RIGHT_BRACE)
 
-        node = ASTNode(NodeType.CLASS_DEFINITION, value=class_name, children=class_body)
+        node = ClassDefinition(
+            value=class_name,
+            children=class_body,
+            line=start.line,
+            position=start.position,
+        )
         # if parent, store it in node.value or create a separate property
         if parent_name:
             node.value = (class_name, parent_name)
@@ -714,6 +816,7 @@ class Parser:
     #  List Literal: [1, 2, 3]
     # -----------------------------
     def parse_list_literal(self):
+        start = self.current_token
         self.expect(TokenType.LEFT_BRACKET)
 
         elements = []
@@ -725,12 +828,13 @@ class Parser:
                 break
 
         self.expect(TokenType.RIGHT_BRACKET)
-        return ASTNode(NodeType.LIST_LITERAL, children=elements)
+        return ListLiteral(children=elements, line=start.line, position=start.position)
 
     # -----------------------------
     #  Object Literal: {name: "value", age: 30}
     # -----------------------------
     def parse_object_literal(self):
+        start = self.current_token
         self.expect(TokenType.LEFT_BRACE)
 
         properties = []
@@ -740,7 +844,8 @@ class Parser:
                 self.current_token.type == TokenType.IDENTIFIER or
                 self.current_token.type == TokenType.STRING
             ):
-                key = self.current_token.value
+                key_token = self.current_token
+                key = key_token.value
                 self.advance()
             else:
                 raise ParserError(
@@ -759,7 +864,12 @@ class Parser:
             value = self.parse_logical_expression()
 
             # Create a property node with key as value and expression as child
-            property_node = ASTNode(NodeType.LITERAL, value=key, children=[value])
+            property_node = Literal(
+                value=key,
+                children=[value],
+                line=key_token.line,
+                position=key_token.position,
+            )
             properties.append(property_node)
 
             if self.current_token.type == TokenType.COMMA:
@@ -768,7 +878,9 @@ class Parser:
                 break
 
         self.expect(TokenType.RIGHT_BRACE)
-        return ASTNode(NodeType.OBJECT_LITERAL, children=properties)
+        return ObjectLiteral(
+            children=properties, line=start.line, position=start.position
+        )
 
     # -----------------------------
     #  Expression Parsing
@@ -781,8 +893,11 @@ class Parser:
             op = self.current_token
             self.advance()
             right = self.parse_term()
-            left = ASTNode(
-                NodeType.BINARY_OPERATION, value=op.value, children=[left, right]
+            left = BinaryOperation(
+                value=op.value,
+                children=[left, right],
+                line=op.line,
+                position=op.position,
             )
 
         return left
@@ -798,8 +913,11 @@ class Parser:
             op = self.current_token
             self.advance()
             right = self.parse_factor()
-            left = ASTNode(
-                NodeType.BINARY_OPERATION, value=op.value, children=[left, right]
+            left = BinaryOperation(
+                value=op.value,
+                children=[left, right],
+                line=op.line,
+                position=op.position,
             )
 
         return left
@@ -824,17 +942,24 @@ class Parser:
                 if factor.type == NodeType.LITERAL and isinstance(
                     factor.value, (int, float)
                 ):
-                    return ASTNode(NodeType.LITERAL, value=-factor.value)
+                    return Literal(
+                        value=-factor.value, line=op.line, position=op.position
+                    )
 
                 # Otherwise create a binary operation
-                minus_one = ASTNode(NodeType.LITERAL, value=-1)
-                return ASTNode(
-                    NodeType.BINARY_OPERATION, value="*", children=[minus_one, factor]
+                minus_one = Literal(value=-1, line=op.line, position=op.position)
+                return BinaryOperation(
+                    value="*",
+                    children=[minus_one, factor],
+                    line=op.line,
+                    position=op.position,
                 )
 
             # For NOT operator
             if op.type == TokenType.NOT:
-                return ASTNode(NodeType.UNARY_OPERATION, value="!", children=[factor])
+                return UnaryOperation(
+                    value="!", children=[factor], line=op.line, position=op.position
+                )
 
         # Handle postfix expressions
         return self.parse_postfix()
@@ -862,7 +987,8 @@ class Parser:
                         position=getattr(self.current_token, "position", None),
                     )
 
-                property_name = self.current_token.value
+                property_token = self.current_token
+                property_name = property_token.value
                 self.advance()  # Consume the property name
 
                 if self.current_token.type == TokenType.LEFT_PAREN:
@@ -877,23 +1003,32 @@ class Parser:
                             args.append(self.parse_logical_expression())
 
                     self.expect(TokenType.RIGHT_PAREN)
-                    expr = ASTNode(
-                        NodeType.METHOD_CALL,
+                    expr = MethodCall(
                         value=property_name,
                         children=[expr] + args,
+                        line=property_token.line,
+                        position=property_token.position,
                     )
                 else:
                     # Regular property access (obj.prop)
-                    expr = ASTNode(
-                        NodeType.PROPERTY_ACCESS, value=property_name, children=[expr]
+                    expr = PropertyAccess(
+                        value=property_name,
+                        children=[expr],
+                        line=property_token.line,
+                        position=property_token.position,
                     )
 
             elif self.current_token.type == TokenType.LEFT_BRACKET:
                 # Array indexing (array[index])
+                bracket = self.current_token
                 self.advance()  # Consume the left bracket
                 index = self.parse_logical_expression()
                 self.expect(TokenType.RIGHT_BRACKET)
-                expr = ASTNode(NodeType.INDEX_ACCESS, children=[expr, index])
+                expr = IndexAccess(
+                    children=[expr, index],
+                    line=bracket.line,
+                    position=bracket.position,
+                )
 
         return expr
 
@@ -901,21 +1036,23 @@ class Parser:
         """Parse a primary expression: literal, identifier, or parenthesized expression"""
         token = self.current_token
 
+        line, position = token.line, token.position
+
         if token.type == TokenType.NUMBER:
             self.advance()
-            return ASTNode(NodeType.LITERAL, value=token.value)
+            return Literal(value=token.value, line=line, position=position)
         elif token.type == TokenType.STRING:
             self.advance()
-            return ASTNode(NodeType.LITERAL, value=token.value)
+            return Literal(value=token.value, line=line, position=position)
         elif token.type == TokenType.TRUE:
             self.advance()
-            return ASTNode(NodeType.LITERAL, value=True)
+            return Literal(value=True, line=line, position=position)
         elif token.type == TokenType.FALSE:
             self.advance()
-            return ASTNode(NodeType.LITERAL, value=False)
+            return Literal(value=False, line=line, position=position)
         elif token.type == TokenType.NULL:
             self.advance()
-            return ASTNode(NodeType.LITERAL, value=None)
+            return Literal(value=None, line=line, position=position)
         elif token.type == TokenType.IDENTIFIER or token.type in (
             TokenType.QORAAL,
             TokenType.abn,
@@ -934,10 +1071,10 @@ class Parser:
 
             # Check if this is a function call (followed by left parenthesis)
             if self.current_token.type == TokenType.LEFT_PAREN:
-                return self.parse_function_call_helper(token_value)
+                return self.parse_function_call_helper(token_value, token)
 
             # Just an identifier
-            return ASTNode(NodeType.IDENTIFIER, value=token_value)
+            return Identifier(value=token_value, line=line, position=position)
         elif token.type == TokenType.LEFT_PAREN:
             self.advance()
             expr = self.parse_logical_expression()
@@ -955,8 +1092,9 @@ class Parser:
                 position=getattr(token, "position", None),
             )
 
-    def parse_function_call_helper(self, func_name):
-        """Helper method to parse a function call once we've identified the function name"""
+    def parse_function_call_helper(self, func_name, name_token):
+        """Helper method to parse a function call once we've identified the function
+        name (read from ``name_token``)"""
         self.expect(TokenType.LEFT_PAREN)
         args = []
 
@@ -970,7 +1108,12 @@ class Parser:
         self.expect(TokenType.RIGHT_PAREN)
 
         # Create function call node
-        function_call = ASTNode(NodeType.FUNCTION_CALL, value=func_name, children=args)
+        function_call = FunctionCall(
+            value=func_name,
+            children=args,
+            line=name_token.line,
+            position=name_token.position,
+        )
 
         # If this is a function call as a statement (not part of an expression),
         # consume the semicolon if present, but don't require it
@@ -987,8 +1130,11 @@ class Parser:
             op_token = self.current_token
             self.advance()
             right = self.parse_comparison_expression()
-            left = ASTNode(
-                NodeType.BINARY_OPERATION, value=op_token.value, children=[left, right]
+            left = BinaryOperation(
+                value=op_token.value,
+                children=[left, right],
+                line=op_token.line,
+                position=op_token.position,
             )
 
         return left
@@ -1017,26 +1163,32 @@ class Parser:
                 operator_value = op_token.value
 
             right = self.parse_expression()
-            left = ASTNode(
-                NodeType.BINARY_OPERATION, value=operator_value, children=[left, right]
+            left = BinaryOperation(
+                value=operator_value,
+                children=[left, right],
+                line=op_token.line,
+                position=op_token.position,
             )
 
         return left
 
     def parse_return_statement(self):
+        start = self.current_token
         self.expect(TokenType.CELI)
         # If there is an expression after celi, parse it
         if self.current_token.type != TokenType.SEMICOLON:
             expr = self.parse_logical_expression()
-            return ASTNode(NodeType.RETURN_STATEMENT, children=[expr])
+            return ReturnStatement(
+                children=[expr], line=start.line, position=start.position
+            )
         # Otherwise, it's a return with no value
-        return ASTNode(NodeType.RETURN_STATEMENT)
+        return ReturnStatement(line=start.line, position=start.position)
 
     def create_node(self, node_type, value=None, children=None):
         """Create an AST node with current token's line and position information"""
         line = getattr(self.current_token, "line", None)
         position = getattr(self.current_token, "position", None)
-        return ASTNode(
+        return make_node(
             node_type, value=value, children=children, line=line, position=position
         )
 
@@ -1049,6 +1201,7 @@ class Parser:
     #  }
     # -----------------------------
     def parse_switch_statement(self):
+        start = self.current_token
         self.expect(TokenType.DOORO)
         self.expect(TokenType.LEFT_PAREN)
         switch_expr = self.parse_logical_expression()
@@ -1060,7 +1213,8 @@ class Parser:
 
         # Parse each case
         while self.current_token.type != TokenType.RIGHT_BRACE:
-            if self.current_token.type == TokenType.XAALAD:
+            case_token = self.current_token
+            if case_token.type == TokenType.XAALAD:
                 self.advance()  # Consume 'xaalad'
                 case_value = self.parse_logical_expression()
                 self.expect(TokenType.LEFT_BRACE)
@@ -1071,7 +1225,11 @@ class Parser:
                 self.expect(TokenType.RIGHT_BRACE)
 
                 # Create a block node for this case
-                case_node = ASTNode(NodeType.BLOCK, children=[case_value] + case_body)
+                case_node = Block(
+                    children=[case_value] + case_body,
+                    line=case_token.line,
+                    position=case_token.position,
+                )
                 children.append(case_node)
             elif self.current_token.type == TokenType.UGUDAMBEYN:
                 self.advance()  # Consume 'ugudambeyn'
@@ -1083,7 +1241,11 @@ class Parser:
                 self.expect(TokenType.RIGHT_BRACE)
 
                 # Create a block node for the default case (without a case value)
-                default_node = ASTNode(NodeType.BLOCK, children=default_body)
+                default_node = Block(
+                    children=default_body,
+                    line=case_token.line,
+                    position=case_token.position,
+                )
                 children.append(default_node)
             else:
                 raise ParserError(
@@ -1096,7 +1258,9 @@ class Parser:
                 )
 
         self.expect(TokenType.RIGHT_BRACE)
-        return ASTNode(NodeType.SWITCH_STATEMENT, children=children)
+        return SwitchStatement(
+            children=children, line=start.line, position=start.position
+        )
 
     def execute_assignment(self, node):
         """Execute an assignment node (identifier = expression)"""
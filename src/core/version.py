@@ -7,3 +7,7 @@ This module contains the version number used throughout the codebase.
 VERSION = "2.0.0-beta"
 VERSION_TUPLE = (2, 0, 0, "beta")  # For programmatic access
 VERSION_WINDOWS = "2.0.0.0-beta"  # Windows-specific format
+
+# Version of the token and AST format produced by the Lexer and Parser.
+# Increase it whenever their output changes, so cached ASTs are rebuilt.
+GRAMMAR_VERSION = 3
@@ -0,0 +1,201 @@
+"""
+Soplang Batch Runner
+====================
+
+Runs many Soplang files in parallel, without starting Python for each one::
+
+    python main.py --batch tests/ more.sop [--jobs N] [--timeout S]
+                   [--results results.json]
+
+The runtime is imported once by the parent, which then forks ``--jobs``
+worker processes (one per CPU by default). Workers receive file names over a
+pipe and run each file in-process with run_request() of server.py, so every
+file gets a new interpreter, an empty stdin and its own captured stdout.
+
+A file that runs longer than ``--timeout`` seconds has its worker killed and
+replaced; so does a worker that dies. Either way the file is reported as
+failed and the rest of the batch carries on.
+
+Each file gets a result::
+
+    {"path": "tests/a.sop", "status": 0, "stdout": "...", "time": 0.0123,
+     "timed_out": false}
+
+``--results FILE`` writes them all as JSON, in the order the files were given
+(directories are expanded to the Soplang files under them, sorted).
+"""
+
+import json
+import os
+import sys
+from collections import deque
+from multiprocessing.connection import wait
+from time import perf_counter
+
+from src.runtime.cache import source_files
+from src.runtime.server import run_request
+
+
+def work(connection):
+    """Run the requests received on ``connection`` (in a worker process)"""
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        connection.send(run_request(request))
+
+
+class Worker:
+    """A forked worker process and the file it is running"""
+
+    def __init__(self, context):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=work, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.index = None  # Index of the running file, None when idle
+        self.started = None
+
+    def start(self, index, request):
+        self.index = index
+        self.started = perf_counter()
+        self.connection.send(request)
+
+    def stop(self):
+        self.connection.close()
+        self.process.kill()
+        self.process.join()
+
+
+def run_batch(
+    filenames,
+    jobs=None,
+    timeout=None,
+    engine="interpreter",
+    use_cache=True,
+    optimize=False,
+):
+    """
+    Run Soplang files on a pool of forked worker processes
+
+    Args:
+        filenames (list): Soplang files to run
+        jobs (int): Number of workers (default: number of CPUs)
+        timeout (float): Seconds a file may run before it is stopped
+        engine, use_cache, optimize: As for run_soplang_file()
+
+    Returns:
+        list: The result dict of each file, in the order of ``filenames``
+    """
+    import multiprocessing
+
+    # Import everything a file may need before forking, so workers start warm
+    import src.runtime.interpreter  # noqa: F401
+    import src.runtime.optimizer  # noqa: F401
+    import src.runtime.vm  # noqa: F401
+
+    context = multiprocessing.get_context("fork")
+    jobs = min(jobs or os.cpu_count() or 1, len(filenames))
+    pending = deque(range(len(filenames)))
+    results = [None] * len(filenames)
+    workers = [Worker(context) for _ in range(jobs)]
+
+    def finish(worker, response, timed_out=False):
+        path = filenames[worker.index]
+        results[worker.index] = {
+            "path": path,
+            "status": response["status"],
+            "stdout": response["stdout"],
+            "time": perf_counter() - worker.started,
+            "timed_out": timed_out,
+        }
+        worker.index = None
+
+    def replace(worker):
+        worker.stop()
+        workers[workers.index(worker)] = Worker(context)
+
+    try:
+        while True:
+            for worker in workers:
+                if worker.index is None and pending:
+                    index = pending.popleft()
+                    worker.start(
+                        index,
+                        {
+                            "path": os.path.abspath(filenames[index]),
+                            "engine": engine,
+                            "use_cache": use_cache,
+                            "optimize": optimize,
+                        },
+                    )
+            busy = [worker for worker in workers if worker.index is not None]
+            if not busy:
+                break
+
+            wait_time = None
+            if timeout is not None:
+                deadline = min(worker.started for worker in busy) + timeout
+                wait_time = max(deadline - perf_counter(), 0)
+            ready = wait([worker.connection for worker in busy], wait_time)
+
+            now = perf_counter()
+            for worker in busy:
+                if worker.connection in ready:
+                    try:
+                        finish(worker, worker.connection.recv())
+                    except EOFError:
+                        finish(worker, {"status": 1, "stdout": "✗ worker died\n"})
+                        replace(worker)
+                elif timeout is not None and now - worker.started >= timeout:
+                    message = f"✗ timed out after {timeout} s\n"
+                    finish(worker, {"status": 1, "stdout": message}, timed_out=True)
+                    replace(worker)
+    finally:
+        for worker in workers:
+            worker.stop()
+    return results
+
+
+def main(
+    paths,
+    jobs=None,
+    timeout=None,
+    output=None,
+    engine="interpreter",
+    use_cache=True,
+    optimize=False,
+):
+    """Run the Soplang files under ``paths`` and report them (--batch)
+
+    Returns 1 when a file failed or timed out, 0 otherwise.
+    """
+    filenames = [filename for path in paths for filename in source_files(path)]
+    start = perf_counter()
+    results = run_batch(filenames, jobs, timeout, engine, use_cache, optimize)
+    duration = perf_counter() - start
+
+    failed = [result for result in results if result["status"] != 0]
+    for result in results:
+        mark = "✓" if result["status"] == 0 else "✗"
+        print(f"{mark} {result['path']} ({result['time'] * 1e3:.1f} ms)")
+    for result in failed:
+        print(f"\n{result['path']}:")
+        lines = result["stdout"].rstrip("\n").split("\n")
+        for line in lines[-5:]:
+            print(f"  {line}")
+    print(
+        f"\n{len(results) - len(failed)} passed, {len(failed)} failed "
+        f"in {duration:.2f} s"
+    )
+
+    if output:
+        with open(output, "w") as file:
+            json.dump({"duration": duration, "results": results}, file, indent=2)
+            file.write("\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
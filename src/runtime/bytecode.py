@@ -0,0 +1,846 @@
+"""
+Soplang Bytecode Compiler
+=========================
+
+Compiles AST nodes into compact bytecode for the stack based VirtualMachine
+(see vm.py). Every instruction is one 32-bit word stored little-endian in a
+``bytes`` object: the low byte is the opcode and the upper 24 bits are its
+argument (a constant index, name index, local slot or jump target).
+
+Inside a function, parameters and every name the function declares (``door``,
+loop and catch variables) are given a local slot, so reading them is a list
+index instead of a walk through the scope chain. All other names, and every
+name at module level, are resolved by name at run time.
+
+Like the closure Compiler, anything that can only fail once executed (unknown
+nodes or operators, ``jooji`` outside a loop, ...) is compiled into a RAISE
+instruction instead of failing the whole compilation.
+"""
+
+import sys
+from array import array
+
+from src.core.ast import NodeType
+from src.core.tokens import TokenType
+from src.runtime.method_cache import MethodCache
+from src.runtime.operators import BINARY_OPERATORS, specialized_operator
+from src.runtime.static_types import StaticTypes
+from src.utils.errors import RuntimeError
+
+# -----------------------------
+#  Opcodes
+# -----------------------------
+# Stack and variables
+POP_TOP = 0
+DUP_TOP = 1
+LOAD_CONST = 2
+LOAD_FAST = 3  # Local slot (falls back to the enclosing scopes until declared)
+STORE_FAST = 4  # Assign a local slot, with constant and type checks
+SET_FAST = 5  # Store into a local slot without any check (loop/catch variables)
+DECLARE_FAST = 6  # Declare an untyped, non-constant local
+LOAD_NAME = 7
+STORE_NAME = 8
+SET_NAME = 9
+DECLARE = 10  # Declare a variable in the current scope (typed and constants too)
+LOAD_FUNCTION_REF = 11  # Function name passed to shaandhee, or a variable
+# Operators
+BINARY_OP = 12  # Constant argument is the operator implementation
+BINARY_OP_CONST = 13  # Constant argument is (operator, right operand)
+UNARY_NOT = 14
+# Lists and objects
+BUILD_LIST = 15
+BUILD_OBJECT = 16
+LOAD_PROPERTY = 17
+STORE_PROPERTY = 18
+LOAD_INDEX = 19
+STORE_INDEX = 20
+# Functions
+CALL_FUNCTION = 21
+CALL_DOTTED = 22
+CALL_METHOD = 23
+RETURN_VALUE = 24
+DEFINE_FUNCTION = 25
+# Control flow
+JUMP = 26
+POP_JUMP_IF_FALSE = 27
+FOR_PREP = 28
+FOR_ITER = 29
+FOR_STEP = 30
+FOR_END = 31
+SETUP_TRY = 32
+POP_TRY = 33
+# Statements run by the interpreter helpers
+CLASS_DEFINITION = 34
+IMPORT = 35
+RAISE = 36
+# Short-circuit && and ||
+TO_BOOL = 37
+JUMP_IF_FALSE_OR_POP = 38  # Jump keeping the value if false, else pop it
+JUMP_IF_TRUE_OR_POP = 39  # Jump keeping the value if true, else pop it
+
+OPCODES = (
+    "POP_TOP",
+    "DUP_TOP",
+    "LOAD_CONST",
+    "LOAD_FAST",
+    "STORE_FAST",
+    "SET_FAST",
+    "DECLARE_FAST",
+    "LOAD_NAME",
+    "STORE_NAME",
+    "SET_NAME",
+    "DECLARE",
+    "LOAD_FUNCTION_REF",
+    "BINARY_OP",
+    "BINARY_OP_CONST",
+    "UNARY_NOT",
+    "BUILD_LIST",
+    "BUILD_OBJECT",
+    "LOAD_PROPERTY",
+    "STORE_PROPERTY",
+    "LOAD_INDEX",
+    "STORE_INDEX",
+    "CALL_FUNCTION",
+    "CALL_DOTTED",
+    "CALL_METHOD",
+    "RETURN_VALUE",
+    "DEFINE_FUNCTION",
+    "JUMP",
+    "POP_JUMP_IF_FALSE",
+    "FOR_PREP",
+    "FOR_ITER",
+    "FOR_STEP",
+    "FOR_END",
+    "SETUP_TRY",
+    "POP_TRY",
+    "CLASS_DEFINITION",
+    "IMPORT",
+    "RAISE",
+    "TO_BOOL",
+    "JUMP_IF_FALSE_OR_POP",
+    "JUMP_IF_TRUE_OR_POP",
+)
+
+# Opcodes whose argument is a jump target
+JUMP_OPCODES = frozenset(
+    (
+        JUMP,
+        POP_JUMP_IF_FALSE,
+        FOR_ITER,
+        SETUP_TRY,
+        JUMP_IF_FALSE_OR_POP,
+        JUMP_IF_TRUE_OR_POP,
+    )
+)
+
+ARG_LIMIT = 1 << 24  # Arguments are stored in the upper 24 bits of a word
+
+# Names that may hold a function body's local slots
+DECLARING_NODES = (
+    NodeType.VARIABLE_DECLARATION,
+    NodeType.LOOP_STATEMENT,
+    NodeType.TRY_CATCH,
+)
+
+# Statements whose value is the implicit return value of a function
+VALUE_STATEMENTS = (
+    NodeType.FUNCTION_CALL,
+    NodeType.ASSIGNMENT,
+    NodeType.CLASS_DEFINITION,
+)
+
+# Expression nodes that may also appear as statements (their value is discarded)
+EXPRESSION_STATEMENTS = (
+    NodeType.BINARY_OPERATION,
+    NodeType.LOGICAL_OPERATION,
+    NodeType.UNARY_OPERATION,
+    NodeType.PROPERTY_ACCESS,
+    NodeType.METHOD_CALL,
+    NodeType.INDEX_ACCESS,
+    NodeType.IDENTIFIER,
+    NodeType.LITERAL,
+)
+
+
+class CodeObject:
+    """A compiled function body or module"""
+
+    __slots__ = (
+        "name",
+        "code",
+        "words",
+        "constants",
+        "names",
+        "varnames",
+        "slots",
+        "nlocals",
+        "param_slots",
+        "positions",
+    )
+
+    def __init__(self, name, code, constants, names, varnames, param_slots, positions):
+        self.name = name
+        self.code = code  # Instructions as little-endian 32-bit words
+        self.constants = constants  # Constant table
+        self.names = names  # Name table for the *_NAME instructions
+        self.varnames = varnames  # Names of the local slots
+        self.slots = {name: slot for slot, name in enumerate(varnames)}
+        self.nlocals = len(varnames)
+        self.param_slots = param_slots  # Local slot of each parameter
+        self.positions = positions  # (line, position) of each instruction
+
+        # Decode the words once so the VM can index them directly
+        words = array("I")
+        words.frombytes(code)
+        if sys.byteorder == "big":
+            words.byteswap()
+        self.words = words
+
+    def __repr__(self):
+        return f"<CodeObject {self.name}, {len(self.words)} instructions>"
+
+
+class CodeBuilder:
+    """Collects the instructions and tables of one code object"""
+
+    def __init__(self, name, varnames=None):
+        self.name = name
+        self.function = varnames is not None  # Function bodies can use celi
+        self.code = array("B")
+        self.positions = []
+        self.constants = []
+        self.constant_indices = {}
+        self.names = []
+        self.name_indices = {}
+        self.varnames = list(varnames or ())
+        self.slots = {name: slot for slot, name in enumerate(self.varnames)}
+        self.loops = []  # Enclosing loops: (break jumps, continue jumps, try depth)
+        self.try_depth = 0
+
+    def emit(self, opcode, arg=0, node=None):
+        """Append an instruction and return its index"""
+        if not 0 <= arg < ARG_LIMIT:
+            raise OverflowError(f"bytecode argument out of range: {arg}")
+        index = len(self.positions)
+        self.code.extend((opcode, arg & 0xFF, (arg >> 8) & 0xFF, arg >> 16))
+        self.positions.append(
+            (getattr(node, "line", None), getattr(node, "position", None))
+        )
+        return index
+
+    def emit_jump(self, opcode, target=0):
+        """Emit a jump, returning its index so the target can be patched later"""
+        return self.emit(opcode, target)
+
+    def patch(self, index, target=None):
+        """Point the jump at ``index`` to ``target`` (default: the next instruction)"""
+        if target is None:
+            target = len(self.positions)
+        offset = index * 4
+        self.code[offset + 1] = target & 0xFF
+        self.code[offset + 2] = (target >> 8) & 0xFF
+        self.code[offset + 3] = target >> 16
+
+    def position(self):
+        """Index of the next instruction"""
+        return len(self.positions)
+
+    def constant(self, value):
+        """Return the index of ``value`` in the constant table"""
+        try:
+            key = constant_key(value)
+            index = self.constant_indices.get(key)
+        except TypeError:
+            key = index = None
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            if key is not None:
+                self.constant_indices[key] = index
+        return index
+
+    def name_index(self, name):
+        """Return the index of ``name`` in the name table"""
+        index = self.name_indices.get(name)
+        if index is None:
+            index = self.name_indices[name] = len(self.names)
+            self.names.append(name)
+        return index
+
+    def build(self, param_slots=()):
+        return CodeObject(
+            self.name,
+            self.code.tobytes(),
+            tuple(self.constants),
+            tuple(self.names),
+            tuple(self.varnames),
+            tuple(param_slots),
+            tuple(self.positions),
+        )
+
+
+class BytecodeCompiler:
+    def __init__(self):
+        self.static_types = StaticTypes()  # Declared types of the variables
+        self.statement_compilers = {
+            NodeType.PROGRAM: self.compile_block,
+            NodeType.VARIABLE_DECLARATION: self.compile_var_declaration,
+            NodeType.FUNCTION_DEFINITION: self.compile_function_definition,
+            NodeType.FUNCTION_CALL: self.compile_function_call,
+            NodeType.IF_STATEMENT: self.compile_if_statement,
+            NodeType.SWITCH_STATEMENT: self.compile_switch_statement,
+            NodeType.LOOP_STATEMENT: self.compile_loop_statement,
+            NodeType.WHILE_STATEMENT: self.compile_while_statement,
+            NodeType.BREAK_STATEMENT: self.compile_break_statement,
+            NodeType.CONTINUE_STATEMENT: self.compile_continue_statement,
+            NodeType.RETURN_STATEMENT: self.compile_return_statement,
+            NodeType.BLOCK: self.compile_block,
+            NodeType.IMPORT_STATEMENT: self.compile_import_statement,
+            NodeType.TRY_CATCH: self.compile_try_catch,
+            NodeType.CLASS_DEFINITION: self.compile_class_definition,
+            NodeType.ASSIGNMENT: self.compile_assignment,
+        }
+        for node_type in EXPRESSION_STATEMENTS:
+            self.statement_compilers[node_type] = self.compile_expression_statement
+
+        self.expression_compilers = {
+            NodeType.LITERAL: self.compile_literal,
+            NodeType.IDENTIFIER: self.compile_identifier,
+            NodeType.BINARY_OPERATION: self.compile_binary_operation,
+            NodeType.LOGICAL_OPERATION: self.compile_logical_operation,
+            NodeType.UNARY_OPERATION: self.compile_unary_operation,
+            NodeType.LIST_LITERAL: self.compile_list_literal,
+            NodeType.OBJECT_LITERAL: self.compile_object_literal,
+            NodeType.PROPERTY_ACCESS: self.compile_property_access,
+            NodeType.METHOD_CALL: self.compile_method_call,
+            NodeType.INDEX_ACCESS: self.compile_index_access,
+            NodeType.FUNCTION_CALL: self.compile_function_call,
+        }
+
+    # -----------------------------
+    #  Entry points
+    # -----------------------------
+    def compile_module(self, nodes, name="<module>"):
+        """Compile top-level statements, where every variable is resolved by name"""
+        builder = CodeBuilder(name)
+        self.compile_body(builder, nodes)
+        return builder.build()
+
+    def compile_expression_code(self, node):
+        """Compile a single expression into a code object returning its value"""
+        builder = CodeBuilder("<expression>")
+        self.compile_expression(builder, node)
+        builder.emit(RETURN_VALUE)
+        return builder.build()
+
+    def compile_function(self, name, params, body):
+        """Compile a function body, giving its parameters and locals a slot"""
+        varnames = list(dict.fromkeys(params))
+        for param in varnames:
+            self.static_types.declare(param, None)
+        for node in body:
+            collect_locals(node, varnames)
+        builder = CodeBuilder(name, varnames)
+        self.compile_body(builder, body)
+        return builder.build([builder.slots[param] for param in params])
+
+    def compile_body(self, builder, nodes):
+        """Compile a body returning the value of its last statement"""
+        if not nodes:
+            builder.emit(LOAD_CONST, builder.constant(None))
+        for i, node in enumerate(nodes):
+            self.compile_statement(builder, node, keep_value=i == len(nodes) - 1)
+        builder.emit(RETURN_VALUE)
+
+    # -----------------------------
+    #  Statements
+    # -----------------------------
+    def compile_statement(self, builder, node, keep_value=False):
+        """Compile a statement, leaving its value on the stack if ``keep_value``
+
+        Only function calls, assignments and class definitions have a value,
+        any other statement leaves None.
+        """
+        if node.type == NodeType.ASSIGNMENT:
+            # Only keep a copy of the assigned value when it is needed
+            self.compile_assignment(builder, node, keep_value)
+            return
+
+        compile_node = self.statement_compilers.get(node.type)
+        if compile_node is None:
+            self.emit_raise(
+                builder, RuntimeError, "unknown_node_type", node_type=node.type
+            )
+        else:
+            compile_node(builder, node)
+
+        if node.type in VALUE_STATEMENTS:
+            if not keep_value:
+                builder.emit(POP_TOP)
+        elif keep_value:
+            builder.emit(LOAD_CONST, builder.constant(None))
+
+    def compile_statements(self, builder, nodes):
+        for node in nodes:
+            self.compile_statement(builder, node)
+
+    def compile_block(self, builder, node):
+        self.compile_statements(builder, node.children)
+
+    def compile_var_declaration(self, builder, node):
+        var_name = node.value
+        var_type = getattr(node, "var_type", None)
+        is_constant = getattr(node, "is_constant", False)
+        self.static_types.declare(var_name, var_type)
+        self.compile_expression(builder, node.initializer)
+
+        slot = builder.slots.get(var_name)
+        if slot is not None and var_type is None and not is_constant:
+            builder.emit(DECLARE_FAST, slot)
+        else:
+            declaration = (var_name, var_type, is_constant, node)
+            builder.emit(DECLARE, builder.constant(declaration))
+
+    def compile_function_definition(self, builder, node):
+        params = []
+        body = []
+        for child in node.children:
+            if child.type == NodeType.IDENTIFIER:
+                params.append(child.value)
+            else:
+                body.append(child)
+
+        code = self.compile_function(node.value, params, body)
+        function = (node.value, tuple(params), tuple(body), code)
+        builder.emit(DEFINE_FUNCTION, builder.constant(function))
+
+    def compile_if_statement(self, builder, node):
+        # The if-body runs until the first IF_STATEMENT or BLOCK child, the
+        # IF_STATEMENT children are the elif blocks and the first BLOCK child is
+        # the else block
+        end_jumps = []
+        self.compile_expression(builder, node.children[0])
+        next_branch = builder.emit_jump(POP_JUMP_IF_FALSE)
+        self.compile_statements(builder, if_body(node))
+
+        for child in node.children[1:]:
+            if child.type == NodeType.IF_STATEMENT:
+                end_jumps.append(builder.emit_jump(JUMP))
+                builder.patch(next_branch)
+                self.compile_expression(builder, child.children[0])
+                next_branch = builder.emit_jump(POP_JUMP_IF_FALSE)
+                self.compile_statements(builder, if_body(child))
+            elif child.type == NodeType.BLOCK:
+                # The else block is executed unconditionally
+                end_jumps.append(builder.emit_jump(JUMP))
+                builder.patch(next_branch)
+                next_branch = None
+                self.compile_statements(builder, child.children)
+                break
+
+        if next_branch is not None:
+            builder.patch(next_branch)
+        for jump in end_jumps:
+            builder.patch(jump)
+
+    def compile_switch_statement(self, builder, node):
+        # The switch value stays on the stack while the cases are compared
+        self.compile_expression(builder, node.children[0])
+
+        end_jumps = []
+        default_case = None
+        for case_node in node.children[1:]:
+            # Skip empty cases
+            if not case_node.children:
+                continue
+
+            # A case without a value to compare starts directly with a BLOCK,
+            # only the last one is used when no case matches
+            if case_node.children[0].type == NodeType.BLOCK:
+                default_case = case_node.children
+                continue
+
+            builder.emit(DUP_TOP)
+            self.compile_expression(builder, case_node.children[0])
+            builder.emit(BINARY_OP, builder.constant(BINARY_OPERATORS["=="]))
+            next_case = builder.emit_jump(POP_JUMP_IF_FALSE)
+            builder.emit(POP_TOP)
+            self.compile_statements(builder, case_node.children[1:])
+            end_jumps.append(builder.emit_jump(JUMP))
+            builder.patch(next_case)
+
+        builder.emit(POP_TOP)
+        if default_case is not None:
+            self.compile_statements(builder, default_case)
+        for jump in end_jumps:
+            builder.patch(jump)
+
+    def compile_loop_statement(self, builder, node):
+        # node.value = loop_var name
+        # node.children[0] = start
+        # node.children[1] = end
+        # node.children[2] = step (optional)
+        # node.children[2...] or node.children[3...] = body
+        #
+        # The counter, end and step live on the stack during the loop
+        self.static_types.declare(node.value, TokenType.abn)
+        self.compile_expression(builder, node.children[0])
+        self.compile_expression(builder, node.children[1])
+
+        body_start_index = 2
+        if len(node.children) > 2 and node.children[2].type in (
+            NodeType.LITERAL,
+            NodeType.IDENTIFIER,
+            NodeType.BINARY_OPERATION,
+            NodeType.LOGICAL_OPERATION,
+        ):
+            self.compile_expression(builder, node.children[2])
+            body_start_index = 3
+        else:
+            builder.emit(LOAD_CONST, builder.constant(1))
+
+        builder.emit(FOR_PREP)
+        top = builder.position()
+        exit_jump = builder.emit_jump(FOR_ITER)
+        self.emit_set(builder, node.value)
+
+        loop = self.enter_loop(builder)
+        self.compile_statements(builder, node.children[body_start_index:])
+        self.exit_loop(builder, loop, continue_target=builder.position())
+
+        builder.emit(FOR_STEP)
+        builder.emit_jump(JUMP, top)
+        for jump in loop[0] + [exit_jump]:
+            builder.patch(jump)
+        builder.emit(FOR_END)
+
+    def compile_while_statement(self, builder, node):
+        top = builder.position()
+        self.compile_expression(builder, node.condition)
+        exit_jump = builder.emit_jump(POP_JUMP_IF_FALSE)
+
+        loop = self.enter_loop(builder)
+        self.compile_statements(builder, node.body)
+        self.exit_loop(builder, loop, continue_target=top)
+
+        builder.emit_jump(JUMP, top)
+        for jump in loop[0] + [exit_jump]:
+            builder.patch(jump)
+
+    def enter_loop(self, builder):
+        loop = ([], [], builder.try_depth)
+        builder.loops.append(loop)
+        return loop
+
+    def exit_loop(self, builder, loop, continue_target):
+        builder.loops.pop()
+        for jump in loop[1]:
+            builder.patch(jump, continue_target)
+
+    def compile_break_statement(self, builder, node):
+        self.emit_loop_exit(builder, 0, "break_outside_loop")
+
+    def compile_continue_statement(self, builder, node):
+        self.emit_loop_exit(builder, 1, "continue_outside_loop")
+
+    def emit_loop_exit(self, builder, kind, error_code):
+        if not builder.loops:
+            self.emit_raise(builder, RuntimeError, error_code)
+            return
+
+        loop = builder.loops[-1]
+        # Leave the try blocks opened inside the loop
+        for _ in range(builder.try_depth - loop[2]):
+            builder.emit(POP_TRY)
+        loop[kind].append(builder.emit_jump(JUMP))
+
+    def compile_return_statement(self, builder, node):
+        if not builder.function:
+            self.emit_raise(builder, RuntimeError, "return_outside_function")
+            return
+
+        if node.children:
+            self.compile_expression(builder, node.children[0])
+        else:
+            builder.emit(LOAD_CONST, builder.constant(None))
+        builder.emit(RETURN_VALUE)
+
+    def compile_import_statement(self, builder, node):
+        builder.emit(IMPORT, builder.constant(node))
+
+    def compile_try_catch(self, builder, node):
+        handler = builder.emit_jump(SETUP_TRY)
+        builder.try_depth += 1
+        self.compile_statements(builder, node.try_block.children)
+        builder.try_depth -= 1
+        builder.emit(POP_TRY)
+        end = builder.emit_jump(JUMP)
+
+        # The VM pushes the error message before jumping to the handler
+        builder.patch(handler)
+        self.emit_set(builder, node.error_name)
+        self.compile_statements(builder, node.catch_block.children)
+        builder.patch(end)
+
+    def compile_class_definition(self, builder, node):
+        builder.emit(CLASS_DEFINITION, builder.constant(node))
+
+    def compile_assignment(self, builder, node, keep_value=False):
+        target = node.target  # Target of assignment
+        self.compile_expression(builder, node.expression)
+        if keep_value:
+            builder.emit(DUP_TOP)
+
+        # Simple variable assignment
+        if target.type == NodeType.IDENTIFIER:
+            slot = builder.slots.get(target.value)
+            if slot is not None:
+                builder.emit(STORE_FAST, slot, node)
+            else:
+                builder.emit(STORE_NAME, builder.name_index(target.value), node)
+
+        # Property assignment (obj.prop = value)
+        elif target.type == NodeType.PROPERTY_ACCESS:
+            self.compile_expression(builder, target.object)
+            builder.emit(STORE_PROPERTY, builder.name_index(target.value), node)
+
+        # Index assignment (arr[idx] = value)
+        elif target.type == NodeType.INDEX_ACCESS:
+            self.compile_expression(builder, target.object)
+            self.compile_expression(builder, target.index)
+            builder.emit(STORE_INDEX, 0, node)
+
+        else:
+            self.emit_raise(
+                builder,
+                RuntimeError,
+                "invalid_syntax",
+                detail=f"Invalid assignment target: {target.type}",
+                line=getattr(node, "line", None),
+                position=getattr(node, "position", None),
+            )
+
+    def compile_expression_statement(self, builder, node):
+        # Just evaluate the expression and discard the result
+        self.compile_expression(builder, node)
+        builder.emit(POP_TOP)
+
+    def emit_set(self, builder, name):
+        """Store the top of the stack in a variable of the current scope"""
+        slot = builder.slots.get(name)
+        if slot is not None:
+            builder.emit(SET_FAST, slot)
+        else:
+            builder.emit(SET_NAME, builder.name_index(name))
+
+    def emit_raise(self, builder, error_class, error_code, **kwargs):
+        builder.emit(RAISE, builder.constant((error_class, error_code, kwargs)))
+
+    # -----------------------------
+    #  Expressions
+    # -----------------------------
+    def compile_expression(self, builder, node):
+        compile_node = self.expression_compilers.get(node.type)
+        if compile_node is None:
+            self.emit_raise(
+                builder,
+                RuntimeError,
+                "unknown_node_type",
+                node_type=node.type,
+                line=getattr(node, "line", None),
+                position=getattr(node, "position", None),
+            )
+            # Keep the stack balanced for the code that follows
+            builder.emit(LOAD_CONST, builder.constant(None))
+        else:
+            compile_node(builder, node)
+
+    def compile_literal(self, builder, node):
+        builder.emit(LOAD_CONST, builder.constant(node.value))
+
+    def compile_identifier(self, builder, node):
+        slot = builder.slots.get(node.value)
+        if slot is not None:
+            builder.emit(LOAD_FAST, slot, node)
+        else:
+            builder.emit(LOAD_NAME, builder.name_index(node.value), node)
+
+    def compile_binary_operation(self, builder, node):
+        left_node, right_node = node.left, node.right
+        apply = BINARY_OPERATORS.get(node.value)
+        self.compile_expression(builder, left_node)
+
+        if apply is None:
+            self.compile_expression(builder, right_node)
+            self.emit_raise(
+                builder, RuntimeError, "unknown_operator", operator=node.value
+            )
+            return
+
+        # Operands of known static types get a specialised operator
+        right_value = right_node.value if right_node.type == NodeType.LITERAL else None
+        apply = specialized_operator(
+            node.value,
+            self.static_types.of(left_node),
+            self.static_types.of(right_node),
+            right_value,
+        )
+        if right_node.type == NodeType.LITERAL:
+            # Bind a constant right operand directly to the operator
+            operation = (apply, right_value)
+            builder.emit(BINARY_OP_CONST, builder.constant(operation))
+        else:
+            self.compile_expression(builder, right_node)
+            builder.emit(BINARY_OP, builder.constant(apply))
+
+    def compile_logical_operation(self, builder, node):
+        # The left operand decides the result on its own when it is false
+        # for && (true for ||), and the right operand is skipped
+        jump = JUMP_IF_FALSE_OR_POP if node.value == "&&" else JUMP_IF_TRUE_OR_POP
+        self.compile_expression(builder, node.left)
+        builder.emit(TO_BOOL)
+        end = builder.emit_jump(jump)
+        self.compile_expression(builder, node.right)
+        builder.emit(TO_BOOL)
+        builder.patch(end)
+
+    def compile_unary_operation(self, builder, node):
+        self.compile_expression(builder, node.operand)
+
+        if node.value == "!":
+            builder.emit(UNARY_NOT)
+        else:
+            self.emit_raise(
+                builder,
+                RuntimeError,
+                "unknown_operator",
+                operator=node.value,
+                line=getattr(node, "line", None),
+                position=getattr(node, "position", None),
+            )
+
+    def compile_list_literal(self, builder, node):
+        for element in node.elements:
+            self.compile_expression(builder, element)
+        builder.emit(BUILD_LIST, len(node.elements))
+
+    def compile_object_literal(self, builder, node):
+        for prop in node.properties:
+            self.compile_expression(builder, prop.children[0])
+        keys = tuple(prop.value for prop in node.properties)
+        builder.emit(BUILD_OBJECT, builder.constant(keys))
+
+    def compile_property_access(self, builder, node):
+        self.compile_expression(builder, node.object)
+        builder.emit(LOAD_PROPERTY, builder.name_index(node.value), node)
+
+    def compile_index_access(self, builder, node):
+        self.compile_expression(builder, node.object)
+        self.compile_expression(builder, node.index)
+        builder.emit(LOAD_INDEX, 0, node)
+
+    def compile_method_call(self, builder, node):
+        args = node.args
+        self.compile_expression(builder, node.object)
+        for arg in args:
+            # shaandhee receives the name of a user function passed as an
+            # identifier, which execute_list_method resolves into a callable
+            if node.value == "shaandhee" and arg.type == NodeType.IDENTIFIER:
+                builder.emit(LOAD_FUNCTION_REF, builder.name_index(arg.value), arg)
+            else:
+                self.compile_expression(builder, arg)
+
+        # Each call site gets its own inline cache of built-in methods
+        method = (MethodCache(node.value), len(args))
+        builder.emit(CALL_METHOD, builder.constant(method))
+
+    def compile_function_call(self, builder, node):
+        func_name = node.value
+        for arg in node.args:
+            self.compile_expression(builder, arg)
+
+        if "." in func_name:
+            obj_name, method_name = func_name.split(".", 1)
+            call = (func_name, len(node.args), obj_name, method_name)
+            builder.emit(CALL_DOTTED, builder.constant(call))
+        else:
+            call = (func_name, len(node.args))
+            builder.emit(CALL_FUNCTION, builder.constant(call))
+
+
+def constant_key(value):
+    """Key of a constant in the table, keeping 1, 1.0 and True (or 0.0, -0.0) apart"""
+    if isinstance(value, tuple):
+        return (tuple, tuple(constant_key(item) for item in value))
+    if isinstance(value, float):
+        return (float, repr(value))
+    return (value.__class__, value)
+
+
+def if_body(node):
+    """Statements of an if or elif body, up to the first IF_STATEMENT or BLOCK"""
+    body = []
+    for child in node.children[1:]:
+        if child.type in (NodeType.IF_STATEMENT, NodeType.BLOCK):
+            break
+        body.append(child)
+    return body
+
+
+def collect_locals(node, varnames):
+    """Append the names declared by ``node`` outside of nested definitions"""
+    if node.type in (NodeType.FUNCTION_DEFINITION, NodeType.CLASS_DEFINITION):
+        return
+    if node.type in DECLARING_NODES and node.value not in varnames:
+        varnames.append(node.value)
+    for child in node.children:
+        collect_locals(child, varnames)
+
+
+def disassemble(code):
+    """Return a readable listing of a code object's instructions"""
+    lines = []
+    for index, word in enumerate(code.words):
+        opcode, arg = word & 0xFF, word >> 8
+        name = OPCODES[opcode]
+        if opcode in (LOAD_FAST, STORE_FAST, SET_FAST, DECLARE_FAST):
+            detail = f"{arg} ({code.varnames[arg]})"
+        elif opcode in (
+            LOAD_NAME,
+            STORE_NAME,
+            SET_NAME,
+            LOAD_FUNCTION_REF,
+            LOAD_PROPERTY,
+            STORE_PROPERTY,
+        ):
+            detail = f"{arg} ({code.names[arg]})"
+        elif opcode in JUMP_OPCODES or opcode == BUILD_LIST:
+            detail = str(arg)
+        elif opcode in (
+            LOAD_CONST,
+            BINARY_OP,
+            BINARY_OP_CONST,
+            BUILD_OBJECT,
+            CALL_FUNCTION,
+            CALL_DOTTED,
+            CALL_METHOD,
+            DECLARE,
+            DEFINE_FUNCTION,
+            RAISE,
+        ):
+            constant = code.constants[arg]
+            if callable(constant):
+                constant = constant.__name__
+            elif opcode == BINARY_OP_CONST:
+                constant = (constant[0].__name__, constant[1])
+            elif opcode == CALL_METHOD:
+                constant = (constant[0].method_name, constant[1])
+            elif opcode == DEFINE_FUNCTION:
+                constant = constant[0]
+            elif opcode == DECLARE:
+                constant = constant[0]
+            detail = f"{arg} ({constant!r})"
+        else:
+            detail = ""
+        lines.append(f"{index:>5} {name:<18} {detail}".rstrip())
+    return "\n".join(lines)
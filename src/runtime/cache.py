@@ -0,0 +1,173 @@
+"""
+Soplang AST Cache
+=================
+
+Keeps the parsed AST of ``.sop`` files on disk, like Python's ``__pycache__``,
+so running an unchanged script skips the lexer and parser.
+
+The AST of ``dir/name.sop`` is stored in ``dir/__sopcache__/`` as a pickle
+behind a one line header holding the interpreter version, the grammar version
+(``src/core/version.py``) and a SHA-256 hash of the source. A cache file is
+only used when its header matches, and it is loaded with a single read.
+
+Caching is best effort: a cache directory that cannot be written, or a cache
+file that cannot be read, only means the file is parsed again.
+
+Precompile a directory tree with ``python main.py --compile DIR`` (or
+``python -m src.runtime.cache DIR``).
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.core.version import GRAMMAR_VERSION, VERSION
+
+CACHE_DIR = "__sopcache__"
+CACHE_SUFFIX = f".soplang-{VERSION}.pickle"
+SOURCE_SUFFIXES = (".sop", ".so")
+
+
+def parse_source(source):
+    """Tokenize and parse Soplang source code into a PROGRAM node"""
+    # Ensure code ends with a newline to avoid parsing issues
+    if not source.endswith("\n"):
+        source += "\n"
+    return Parser(Lexer(source).iter_tokens()).parse()
+
+
+def cache_path(filename):
+    """Path of the cache file for the source file ``filename``"""
+    directory, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, CACHE_DIR, name + CACHE_SUFFIX)
+
+
+def cache_header(source):
+    """Header that a cache file for ``source`` starts with"""
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    return f"SOPC {VERSION} {GRAMMAR_VERSION} {digest}\n".encode("ascii")
+
+
+def load_cached(filename, source):
+    """Return the cached AST of ``filename``, or None if it is missing or stale"""
+    try:
+        with open(cache_path(filename), "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+
+    header = cache_header(source)
+    if not data.startswith(header):
+        return None
+    try:
+        return pickle.loads(data[len(header):])
+    except Exception:
+        return None
+
+
+def write_cached(filename, source, ast):
+    """Store the AST of ``filename``, returning whether it was written"""
+    try:
+        payload = pickle.dumps(ast, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, RecursionError, TypeError):
+        return False
+
+    path = cache_path(filename)
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial file
+        # (tempfile is only imported here, as most runs just read the cache)
+        import tempfile
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(cache_header(source))
+                file.write(payload)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        return False
+    return True
+
+
+def load_program(filename, use_cache=True):
+    """Read and parse a Soplang file, going through the AST cache
+
+    Raises FileNotFoundError for a missing file, and the lexer or parser
+    errors for invalid source (which is never cached).
+    """
+    with open(filename, "r") as file:
+        source = file.read()
+
+    if not use_cache:
+        return parse_source(source)
+
+    ast = load_cached(filename, source)
+    if ast is None:
+        ast = parse_source(source)
+        write_cached(filename, source, ast)
+    return ast
+
+
+def source_files(path):
+    """``path`` itself if it is a file, else the Soplang files under it, sorted"""
+    if os.path.isfile(path):
+        return [path]
+    filenames = []
+    for directory, subdirs, files in os.walk(path):
+        subdirs[:] = sorted(d for d in subdirs if d != CACHE_DIR)
+        filenames.extend(
+            os.path.join(directory, name)
+            for name in sorted(files)
+            if name.endswith(SOURCE_SUFFIXES)
+        )
+    return filenames
+
+
+def compile_tree(path):
+    """Parse and cache every Soplang file under ``path``
+
+    Returns the list of compiled files and a list of (file, error) pairs for
+    the files that could not be parsed or cached.
+    """
+    compiled, failed = [], []
+    for filename in source_files(path):
+        try:
+            with open(filename, "r") as file:
+                source = file.read()
+            if not write_cached(filename, source, parse_source(source)):
+                raise OSError(f"cannot write {cache_path(filename)}")
+        except Exception as e:
+            failed.append((filename, e))
+        else:
+            compiled.append(filename)
+    return compiled, failed
+
+
+def main(argv=None):
+    """Precompile the Soplang files of the given paths"""
+    paths = sys.argv[1:] if argv is None else argv
+    if not paths:
+        print("Usage: python -m src.runtime.cache PATH [PATH ...]")
+        return 1
+
+    exit_code = 0
+    for path in paths:
+        compiled, failed = compile_tree(path)
+        for filename, error in failed:
+            print(f"✗ {filename}: {error}")
+        print(f"Compiled {len(compiled)} file(s) in {path}")
+        if failed:
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
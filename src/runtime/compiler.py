@@ -0,0 +1,1021 @@
+"""
+Soplang Closure Compiler
+========================
+
+Turns AST nodes into specialised Python closures. Every node is compiled once,
+so running a program no longer walks a long chain of ``node.type``
+comparisons at each visit: a statement or expression simply calls the
+closures compiled for its children.
+
+Variables annotated by the Resolver are compiled to direct accesses: a local
+of a function call is an index into the call's slot list, found ``depth``
+scopes up the chain. Unannotated variables (globals, or code that was not
+resolved) are looked up by name through the scope chain.
+
+Compiled closures take the running Interpreter as their only argument, which
+keeps them independent of any particular interpreter instance. Statement
+closures are cached on their node (``node.code``) so that function bodies and
+re-executed definitions are only compiled the first time they are seen.
+
+A statement closure returns its completion status. ``jooji``, ``soco`` and
+``celi`` return the BREAK, CONTINUE and RETURN markers (the value of ``celi``
+is left in ``interp.return_value``), which the enclosing loops and function
+calls check directly instead of catching an exception. Any other result means
+the statement completed normally; function calls and assignments return their
+value, which is the implicit return value of a function ending with them.
+"""
+
+from src.core.ast import NodeType
+from src.core.tokens import TokenType
+from src.runtime.environment import UNSET
+from src.runtime.method_cache import UNRESOLVED, MethodCache
+from src.runtime.operators import (
+    BINARY_OPERATORS,
+    STATIC_TYPE_CLASSES,
+    add,
+    specialized_operator,
+)
+from src.runtime.static_types import StaticTypes
+from src.stdlib.builtins import SoplangBuiltins
+from src.stdlib.containers import NumericList, StringBuilder
+from src.utils.errors import RuntimeError, TypeError
+
+
+class Completion:
+    """Marks a statement that ended with jooji, soco or celi"""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"<Completion {self.name}>"
+
+
+BREAK = Completion("break")
+CONTINUE = Completion("continue")
+RETURN = Completion("return")
+
+# Expression nodes that may also appear as statements (their value is discarded)
+EXPRESSION_STATEMENTS = (
+    NodeType.BINARY_OPERATION,
+    NodeType.LOGICAL_OPERATION,
+    NodeType.UNARY_OPERATION,
+    NodeType.PROPERTY_ACCESS,
+    NodeType.METHOD_CALL,
+    NodeType.INDEX_ACCESS,
+    NodeType.IDENTIFIER,
+    NodeType.LITERAL,
+)
+
+
+class Compiler:
+    def __init__(self):
+        self.static_types = StaticTypes()  # Declared types of the variables
+        self.statement_compilers = {
+            NodeType.PROGRAM: self.compile_program,
+            NodeType.VARIABLE_DECLARATION: self.compile_var_declaration,
+            NodeType.FUNCTION_DEFINITION: self.compile_function_definition,
+            NodeType.FUNCTION_CALL: self.compile_function_call,
+            NodeType.IF_STATEMENT: self.compile_if_statement,
+            NodeType.SWITCH_STATEMENT: self.compile_switch_statement,
+            NodeType.LOOP_STATEMENT: self.compile_loop_statement,
+            NodeType.WHILE_STATEMENT: self.compile_while_statement,
+            NodeType.BREAK_STATEMENT: self.compile_break_statement,
+            NodeType.CONTINUE_STATEMENT: self.compile_continue_statement,
+            NodeType.RETURN_STATEMENT: self.compile_return_statement,
+            NodeType.BLOCK: self.compile_block,
+            NodeType.IMPORT_STATEMENT: self.compile_import_statement,
+            NodeType.TRY_CATCH: self.compile_try_catch,
+            NodeType.CLASS_DEFINITION: self.compile_class_definition,
+            NodeType.ASSIGNMENT: self.compile_assignment,
+        }
+        for node_type in EXPRESSION_STATEMENTS:
+            self.statement_compilers[node_type] = self.compile_expression_statement
+
+        self.expression_compilers = {
+            NodeType.LITERAL: self.compile_literal,
+            NodeType.IDENTIFIER: self.compile_identifier,
+            NodeType.BINARY_OPERATION: self.compile_binary_operation,
+            NodeType.LOGICAL_OPERATION: self.compile_logical_operation,
+            NodeType.UNARY_OPERATION: self.compile_unary_operation,
+            NodeType.LIST_LITERAL: self.compile_list_literal,
+            NodeType.OBJECT_LITERAL: self.compile_object_literal,
+            NodeType.PROPERTY_ACCESS: self.compile_property_access,
+            NodeType.METHOD_CALL: self.compile_method_call,
+            NodeType.INDEX_ACCESS: self.compile_index_access,
+            NodeType.FUNCTION_CALL: self.compile_function_call,
+        }
+
+    # -----------------------------
+    #  Entry points
+    # -----------------------------
+    def compile_statement(self, node):
+        """Compile a statement node, reusing the closure cached on the node"""
+        code = node.code
+        if code is None:
+            code = node.code = self.build_statement(node)
+        return code
+
+    def build_statement(self, node):
+        """Compile a statement node into a new closure"""
+        compile_node = self.statement_compilers.get(node.type)
+        if compile_node is None:
+            return self.compile_unknown_statement(node)
+        return compile_node(node)
+
+    def compile_statements(self, nodes):
+        """Compile a sequence of statements into a tuple of closures"""
+        return tuple(self.compile_statement(node) for node in nodes)
+
+    def compile_expression(self, node):
+        """Compile an expression node into a closure returning its value"""
+        compile_node = self.expression_compilers.get(node.type)
+        if compile_node is None:
+            return self.compile_unknown_expression(node)
+        return compile_node(node)
+
+    # -----------------------------
+    #  Statements
+    # -----------------------------
+    def compile_program(self, node):
+        body = self.compile_statements(node.children)
+
+        def program(interp):
+            for statement in body:
+                status = statement(interp)
+                if status.__class__ is Completion:
+                    return status
+
+        return program
+
+    def compile_var_declaration(self, node):
+        var_name = node.value
+        value_code = self.compile_expression(node.initializer)
+        var_type = getattr(node, "var_type", None)
+        is_constant = getattr(node, "is_constant", False)
+        slot = node.slot
+        self.static_types.declare(var_name, var_type)
+
+        if slot is not None and var_type is None and not is_constant:
+
+            def declare_local(interp):
+                env = interp.environment
+                if env.types or env.constants:
+                    env.define(var_name, value_code(interp))
+                else:
+                    env.slots[slot] = value_code(interp)
+
+            return declare_local
+
+        if var_type is None:
+
+            def declare(interp):
+                interp.environment.define(
+                    var_name, value_code(interp), is_constant=is_constant
+                )
+
+        else:
+            classes = STATIC_TYPE_CLASSES.get(var_type, ())
+
+            def declare(interp):
+                var_value = value_code(interp)
+                # Validate the value against the declared static type
+                if var_value.__class__ not in classes:
+                    interp.validate_type(var_name, var_value, var_type, node)
+                interp.environment.define(
+                    var_name, var_value, var_type=var_type, is_constant=is_constant
+                )
+
+        return declare
+
+    def compile_function_definition(self, node):
+        def define(interp):
+            interp.define_function(node)
+
+        return define
+
+    def compile_if_statement(self, node):
+        # children[0]: condition
+        # rest: if-body, elif-blocks, else-block
+        condition = self.compile_expression(node.children[0])
+
+        # The if-body runs until the first IF_STATEMENT or BLOCK child
+        body_nodes = []
+        for child in node.children[1:]:
+            if child.type in (NodeType.IF_STATEMENT, NodeType.BLOCK):
+                break
+            body_nodes.append(child)
+        body = self.compile_statements(body_nodes)
+
+        # When the condition is false, the IF_STATEMENT children are the elif
+        # blocks and the first BLOCK child is the else block
+        branches = []
+        for child in node.children[1:]:
+            if child.type == NodeType.IF_STATEMENT:
+                elif_body = []
+                for stmt in child.children[1:]:
+                    if stmt.type in (NodeType.IF_STATEMENT, NodeType.BLOCK):
+                        break
+                    elif_body.append(stmt)
+                branches.append(
+                    (
+                        self.compile_expression(child.children[0]),
+                        self.compile_statements(elif_body),
+                    )
+                )
+            elif child.type == NodeType.BLOCK:
+                # The else block is executed unconditionally
+                branches.append((None, self.compile_statements(child.children)))
+                break
+        branches = tuple(branches)
+
+        def if_statement(interp):
+            if condition(interp):
+                for statement in body:
+                    status = statement(interp)
+                    if status.__class__ is Completion:
+                        return status
+                return None
+
+            for branch_condition, branch_body in branches:
+                if branch_condition is None or branch_condition(interp):
+                    for statement in branch_body:
+                        status = statement(interp)
+                        if status.__class__ is Completion:
+                            return status
+                    return None
+
+        return if_statement
+
+    def compile_switch_statement(self, node):
+        # First child is the switch expression, the rest are the cases
+        switch_expression = self.compile_expression(node.children[0])
+
+        cases = []
+        for case_node in node.children[1:]:
+            # Skip empty cases
+            if not case_node.children:
+                continue
+
+            # A case without a value to compare starts directly with a BLOCK
+            if case_node.children[0].type == NodeType.BLOCK:
+                cases.append((None, self.compile_statements(case_node.children)))
+            else:
+                cases.append(
+                    (
+                        self.compile_expression(case_node.children[0]),
+                        self.compile_statements(case_node.children[1:]),
+                    )
+                )
+        cases = tuple(cases)
+
+        def switch_statement(interp):
+            switch_value = switch_expression(interp)
+            default_case = None
+
+            for case_value, case_body in cases:
+                if case_value is None:
+                    default_case = case_body
+                elif switch_value == case_value(interp):
+                    for statement in case_body:
+                        status = statement(interp)
+                        if status.__class__ is Completion:
+                            return status
+                    return None
+
+            # If no matching case found and we have a default case, execute it
+            if default_case is not None:
+                for statement in default_case:
+                    status = statement(interp)
+                    if status.__class__ is Completion:
+                        return status
+
+        return switch_statement
+
+    def compile_loop_statement(self, node):
+        # node.value = loop_var name
+        # node.children[0] = start
+        # node.children[1] = end
+        # node.children[2] = step (optional)
+        # node.children[2...] or node.children[3...] = body
+        loop_var = node.value
+        slot = node.slot
+        # The counter is always a number
+        self.static_types.declare(loop_var, TokenType.abn)
+        start = self.compile_expression(node.children[0])
+        end = self.compile_expression(node.children[1])
+
+        step = None
+        body_start_index = 2
+        if len(node.children) > 2 and node.children[2].type in (
+            NodeType.LITERAL,
+            NodeType.IDENTIFIER,
+            NodeType.BINARY_OPERATION,
+            NodeType.LOGICAL_OPERATION,
+        ):
+            step = self.compile_expression(node.children[2])
+            body_start_index = 3
+        body = self.compile_statements(node.children[body_start_index:])
+
+        def loop_statement(interp):
+            start_value = start(interp)
+            end_value = end(interp)
+            step_value = 1 if step is None else step(interp)
+
+            # Ensure all values are numbers
+            if (
+                not isinstance(start_value, (int, float)) or
+                not isinstance(end_value, (int, float)) or
+                not isinstance(step_value, (int, float))
+            ):
+                raise TypeError("invalid_for_loop")
+
+            env = interp.environment
+            if slot is None:
+                values, key = env.values, loop_var
+            else:
+                values, key = env.slots, slot
+            i = start_value
+            while i <= end_value if step_value > 0 else i >= end_value:
+                # Set the loop variable in scope
+                values[key] = i
+
+                for statement in body:
+                    status = statement(interp)
+                    if status.__class__ is Completion:
+                        if status is BREAK:
+                            return None
+                        if status is RETURN:
+                            return status
+                        break  # CONTINUE
+
+                i += step_value
+
+        return loop_statement
+
+    def compile_while_statement(self, node):
+        condition = self.compile_expression(node.condition)
+        body = self.compile_statements(node.body)
+
+        def while_statement(interp):
+            while condition(interp):
+                for statement in body:
+                    status = statement(interp)
+                    if status.__class__ is Completion:
+                        if status is BREAK:
+                            return None
+                        if status is RETURN:
+                            return status
+                        break  # CONTINUE
+
+        return while_statement
+
+    def compile_break_statement(self, node):
+        def break_statement(interp):
+            return BREAK
+
+        return break_statement
+
+    def compile_continue_statement(self, node):
+        def continue_statement(interp):
+            return CONTINUE
+
+        return continue_statement
+
+    def compile_return_statement(self, node):
+        if not node.children:
+
+            def return_statement(interp):
+                interp.return_value = None
+                return RETURN
+
+            return return_statement
+
+        value = self.compile_expression(node.expression)
+
+        def return_value_statement(interp):
+            interp.return_value = value(interp)
+            return RETURN
+
+        return return_value_statement
+
+    def compile_block(self, node):
+        body = self.compile_statements(node.children)
+
+        def block(interp):
+            for statement in body:
+                status = statement(interp)
+                if status.__class__ is Completion:
+                    return status
+
+        return block
+
+    def compile_import_statement(self, node):
+        def import_statement(interp):
+            return interp.execute_import_statement(node)
+
+        return import_statement
+
+    def compile_try_catch(self, node):
+        error_var = node.error_name
+        slot = node.slot
+        try_block = self.compile_statements(node.try_block.children)
+        catch_block = self.compile_statements(node.catch_block.children)
+
+        def try_catch(interp):
+            try:
+                for statement in try_block:
+                    status = statement(interp)
+                    if status.__class__ is Completion:
+                        return status
+            except Exception as e:
+                # Store the error in the variable and execute the catch block
+                if slot is None:
+                    interp.environment.values[error_var] = str(e)
+                else:
+                    interp.environment.slots[slot] = str(e)
+                for statement in catch_block:
+                    status = statement(interp)
+                    if status.__class__ is Completion:
+                        return status
+
+        return try_catch
+
+    def compile_class_definition(self, node):
+        def class_definition(interp):
+            return interp.execute_class_definition(node)
+
+        return class_definition
+
+    def compile_assignment(self, node):
+        target = node.target  # Target of assignment
+        value = self.compile_expression(node.expression)
+        line = getattr(node, "line", None)
+        position = getattr(node, "position", None)
+
+        # Simple variable assignment
+        if target.type == NodeType.IDENTIFIER:
+            var_name = target.value
+            if node.depth is not None:
+                # The Resolver proved that the target is not a constant
+                return self.compile_resolved_assignment(node, var_name, value)
+
+            def assign_variable(interp):
+                return interp.assign_variable(var_name, value(interp), line, position)
+
+            return assign_variable
+
+        # Property assignment (obj.prop = value)
+        if target.type == NodeType.PROPERTY_ACCESS:
+            obj_code = self.compile_expression(target.object)
+            prop_name = target.value
+
+            def assign_property(interp):
+                new_value = value(interp)
+                obj = obj_code(interp)
+                if not isinstance(obj, dict):
+                    raise TypeError(
+                        "property_access", prop=prop_name, line=line, position=position
+                    )
+                obj[prop_name] = new_value
+                return new_value
+
+            return assign_property
+
+        # Index assignment (arr[idx] = value)
+        if target.type == NodeType.INDEX_ACCESS:
+            arr_code = self.compile_expression(target.object)
+            idx_code = self.compile_expression(target.index)
+
+            def assign_index(interp):
+                new_value = value(interp)
+                arr = arr_code(interp)
+                if not isinstance(arr, list) and arr.__class__ is not NumericList:
+                    raise TypeError("index_access", line=line, position=position)
+
+                idx = check_index(idx_code(interp), arr, line, position)
+                arr[idx] = new_value
+                return new_value
+
+            return assign_index
+
+        def invalid_assignment(interp):
+            value(interp)
+            raise RuntimeError(
+                "invalid_syntax",
+                detail=f"Invalid assignment target: {target.type}",
+                line=line,
+                position=position,
+            )
+
+        return invalid_assignment
+
+    def compile_resolved_assignment(self, node, var_name, value):
+        depth, slot = node.depth, node.slot
+        line = getattr(node, "line", None)
+        position = getattr(node, "position", None)
+
+        if slot is None:
+
+            def assign_global(interp):
+                return interp.store_variable(var_name, value(interp), line, position)
+
+            return assign_global
+
+        def assign_local(interp):
+            new_value = value(interp)
+            env = interp.environment
+            for _ in range(depth):
+                env = env.parent
+            if env.slots[slot] is UNSET:
+                # Not declared in its scope yet, so it assigns an outer variable
+                return interp.assign_variable(var_name, new_value, line, position)
+            if env.types and var_name in env.types:
+                var_type = env.types[var_name]
+                if new_value.__class__ not in STATIC_TYPE_CLASSES.get(var_type, ()):
+                    interp.validate_type(var_name, new_value, var_type, node)
+            env.slots[slot] = new_value
+            return new_value
+
+        return assign_local
+
+    def compile_expression_statement(self, node):
+        expression = self.compile_expression(node)
+
+        def expression_statement(interp):
+            # Just evaluate the expression and discard the result
+            expression(interp)
+
+        return expression_statement
+
+    def compile_unknown_statement(self, node):
+        node_type = node.type
+
+        def unknown_statement(interp):
+            raise RuntimeError("unknown_node_type", node_type=node_type)
+
+        return unknown_statement
+
+    # -----------------------------
+    #  Expressions
+    # -----------------------------
+    def compile_literal(self, node):
+        value = node.value
+
+        def literal(interp):
+            return value
+
+        return literal
+
+    def compile_identifier(self, node):
+        name = node.value
+        line = getattr(node, "line", None)
+        position = getattr(node, "position", None)
+
+        if node.slot is not None:
+            return self.compile_local(node)
+
+        def identifier(interp):
+            env = interp.environment
+            while env is not None:
+                values = env.values
+                if name in values:
+                    return values[name]
+                env = env.parent
+            raise RuntimeError(
+                "undefined_variable", name=name, line=line, position=position
+            )
+
+        return identifier
+
+    def compile_local(self, node):
+        name = node.value
+        depth, slot = node.depth, node.slot
+        line = getattr(node, "line", None)
+        position = getattr(node, "position", None)
+
+        def outer(env):
+            # Not declared in its scope yet, so read an outer variable
+            try:
+                return env.parent.lookup(name)
+            except KeyError:
+                raise RuntimeError(
+                    "undefined_variable", name=name, line=line, position=position
+                )
+
+        if depth == 0:
+
+            def local(interp):
+                env = interp.environment
+                value = env.slots[slot]
+                if value is UNSET:
+                    return outer(env)
+                return value
+
+            return local
+
+        def enclosing_local(interp):
+            env = interp.environment
+            for _ in range(depth):
+                env = env.parent
+            value = env.slots[slot]
+            if value is UNSET:
+                return outer(env)
+            return value
+
+        return enclosing_local
+
+    def compile_binary_operation(self, node):
+        left_node, right_node = node.left, node.right
+        left = self.compile_expression(left_node)
+        right = self.compile_expression(right_node)
+        apply = BINARY_OPERATORS.get(node.value)
+
+        if apply is None:
+            operator = node.value
+
+            def unknown_operator(interp):
+                left(interp)
+                right(interp)
+                raise RuntimeError("unknown_operator", operator=operator)
+
+            return unknown_operator
+
+        left_type = self.static_types.of(left_node)
+        right_type = self.static_types.of(right_node)
+        right_value = right_node.value if right_node.type == NodeType.LITERAL else None
+        apply = specialized_operator(node.value, left_type, right_type, right_value)
+        if node.value == "+" and apply is not add:
+            # Inline the guarded addition or concatenation
+            classes = STATIC_TYPE_CLASSES[left_type]
+            return self.compile_guarded_add(left_node, right_node, left, right, classes)
+
+        # Bind constant operands directly instead of calling a literal closure
+        if right_node.type == NodeType.LITERAL:
+            right_value = right_node.value
+            if left_node.type == NodeType.LITERAL:
+                left_value = left_node.value
+
+                def binary_constants(interp):
+                    return apply(left_value, right_value)
+
+                return binary_constants
+
+            def binary_constant_right(interp):
+                return apply(left(interp), right_value)
+
+            return binary_constant_right
+
+        if left_node.type == NodeType.LITERAL:
+            left_value = left_node.value
+
+            def binary_constant_left(interp):
+                return apply(left_value, right(interp))
+
+            return binary_constant_left
+
+        def binary_operation(interp):
+            return apply(left(interp), right(interp))
+
+        return binary_operation
+
+    def compile_guarded_add(self, left_node, right_node, left, right, classes):
+        """``+`` of two operands expected to be of ``classes``, with the
+        generic add() for the values that are not"""
+        if right_node.type == NodeType.LITERAL:
+            right_value = right_node.value
+
+            def add_constant_right(interp):
+                left_value = left(interp)
+                if left_value.__class__ in classes:
+                    return left_value + right_value
+                return add(left_value, right_value)
+
+            return add_constant_right
+
+        if left_node.type == NodeType.LITERAL:
+            left_value = left_node.value
+
+            def add_constant_left(interp):
+                right_value = right(interp)
+                if right_value.__class__ in classes:
+                    return left_value + right_value
+                return add(left_value, right_value)
+
+            return add_constant_left
+
+        def guarded_add(interp):
+            left_value = left(interp)
+            right_value = right(interp)
+            if left_value.__class__ in classes and right_value.__class__ in classes:
+                return left_value + right_value
+            return add(left_value, right_value)
+
+        return guarded_add
+
+    def compile_logical_operation(self, node):
+        left = self.compile_expression(node.left)
+        right = self.compile_expression(node.right)
+
+        # Python's and/or skip the right operand like Soplang's && and ||
+        if node.value == "&&":
+
+            def logical_and(interp):
+                return bool(left(interp)) and bool(right(interp))
+
+            return logical_and
+
+        def logical_or(interp):
+            return bool(left(interp)) or bool(right(interp))
+
+        return logical_or
+
+    def compile_unary_operation(self, node):
+        operand = self.compile_expression(node.operand)
+
+        if node.value == "!":
+
+            def logical_not(interp):
+                return not bool(operand(interp))
+
+            return logical_not
+
+        operator = node.value
+        line = getattr(node, "line", None)
+        position = getattr(node, "position", None)
+
+        def unknown_operator(interp):
+            operand(interp)
+            raise RuntimeError(
+                "unknown_operator", operator=operator, line=line, position=position
+            )
+
+        return unknown_operator
+
+    def compile_list_literal(self, node):
+        elements = tuple(self.compile_expression(child) for child in node.elements)
+
+        def list_literal(interp):
+            return [element(interp) for element in elements]
+
+        return list_literal
+
+    def compile_object_literal(self, node):
+        properties = tuple(
+            (prop.value, self.compile_expression(prop.children[0]))
+            for prop in node.properties
+        )
+
+        def object_literal(interp):
+            obj = {}
+            for key, value in properties:
+                obj[key] = value(interp)
+            return obj
+
+        return object_literal
+
+    def compile_property_access(self, node):
+        obj_code = self.compile_expression(node.object)
+        prop_name = node.value
+        line = getattr(node, "line", None)
+        position = getattr(node, "position", None)
+
+        def property_access(interp):
+            obj = obj_code(interp)
+            if not isinstance(obj, dict):
+                raise TypeError(
+                    "property_access", prop=prop_name, line=line, position=position
+                )
+            if prop_name not in obj:
+                raise RuntimeError(
+                    "property_not_found",
+                    prop_name=prop_name,
+                    line=line,
+                    position=position,
+                )
+            return obj[prop_name]
+
+        return property_access
+
+    def compile_index_access(self, node):
+        arr_code = self.compile_expression(node.object)
+        idx_code = self.compile_expression(node.index)
+        line = getattr(node, "line", None)
+        position = getattr(node, "position", None)
+
+        def index_access(interp):
+            arr = arr_code(interp)
+            if not isinstance(arr, list) and arr.__class__ is not NumericList:
+                raise TypeError("index_access", line=line, position=position)
+            return arr[check_index(idx_code(interp), arr, line, position)]
+
+        return index_access
+
+    def compile_method_call(self, node):
+        obj_code = self.compile_expression(node.object)
+        method_name = node.value
+        args = tuple(self.compile_expression(arg) for arg in node.args)
+
+        # shaandhee receives the name of a user function passed as an identifier,
+        # which execute_list_method resolves into a callable
+        list_args = args
+        if method_name == "shaandhee":
+            list_args = tuple(
+                function_reference(arg.value, code)
+                if arg.type == NodeType.IDENTIFIER
+                else code
+                for arg, code in zip(node.args, args)
+            )
+
+        def generic_method_call(interp, obj):
+            # For built-in list methods
+            if isinstance(obj, list) and method_name in interp.list_methods:
+                return interp.execute_list_method(
+                    method_name, obj, [arg(interp) for arg in list_args]
+                )
+
+            # For numeric list methods, and the list methods that copy it
+            elif isinstance(obj, NumericList):
+                if method_name in interp.numeric_list_methods:
+                    return interp.numeric_list_methods[method_name](
+                        obj, *[arg(interp) for arg in args]
+                    )
+                if method_name in interp.list_methods:
+                    return interp.execute_list_method(
+                        method_name, obj.tolist(), [arg(interp) for arg in list_args]
+                    )
+
+            # For built-in object methods
+            elif isinstance(obj, dict) and method_name in interp.object_methods:
+                return interp.execute_object_method(
+                    method_name, obj, [arg(interp) for arg in args]
+                )
+
+            # For built-in string methods
+            elif isinstance(obj, str) and method_name in interp.string_methods:
+                return interp.execute_string_method(
+                    method_name, obj, [arg(interp) for arg in args]
+                )
+
+            # For string builder methods
+            elif (
+                isinstance(obj, StringBuilder) and method_name in interp.builder_methods
+            ):
+                return interp.builder_methods[method_name](
+                    obj, *[arg(interp) for arg in args]
+                )
+
+            # For user-defined object methods
+            elif isinstance(obj, dict) and method_name in obj:
+                if callable(obj[method_name]):
+                    return obj[method_name](*[arg(interp) for arg in args])
+
+            raise RuntimeError(
+                "method_not_found",
+                method_name=method_name,
+                type_name=SoplangBuiltins.nooc(obj),
+            )
+
+        # Built-in methods are looked up by the receiver's class in the
+        # inline cache of this call site
+        cache = MethodCache(method_name)
+        entries = cache.entries
+
+        def cached_method_call(interp):
+            obj = obj_code(interp)
+            method = entries.get(obj.__class__, UNRESOLVED)
+            if method is UNRESOLVED:
+                method = cache.resolve(interp, obj)
+            if method is None:
+                return generic_method_call(interp, obj)
+            return method(obj, *[arg(interp) for arg in args])
+
+        return cached_method_call
+
+    def compile_function_call(self, node):
+        func_name = node.value
+        line = node.line
+        args = tuple(self.compile_expression(arg) for arg in node.args)
+
+        if "." in func_name:
+            return self.compile_dotted_function_call(func_name, args, line)
+
+        if len(args) == 1:
+            arg = args[0]
+
+            def function_call_1(interp):
+                value = arg(interp)
+                func = interp.functions.get(func_name)
+                if func is None:
+                    raise RuntimeError("undefined_function", name=func_name)
+                if callable(func):
+                    # Built-in function (Python function)
+                    return func(value)
+                # User-defined function (Soplang function)
+                return interp.call_user_function(func, [value], line)
+
+            return function_call_1
+
+        def function_call(interp):
+            values = [arg(interp) for arg in args]
+            func = interp.functions.get(func_name)
+            if func is None:
+                raise RuntimeError("undefined_function", name=func_name)
+            if callable(func):
+                # Built-in function (Python function)
+                return func(*values)
+            # User-defined function (Soplang function)
+            return interp.call_user_function(func, values, line)
+
+        return function_call
+
+    def compile_dotted_function_call(self, func_name, args, line):
+        obj_name, method_name = func_name.split(".", 1)
+
+        def dotted_function_call(interp):
+            values = [arg(interp) for arg in args]
+            func = interp.functions.get(func_name)
+            if func is not None:
+                if callable(func):
+                    return func(*values)
+                return interp.call_user_function(func, values, line)
+
+            # Method call on an object or list stored in a variable
+            try:
+                obj = interp.environment.lookup(obj_name)
+            except KeyError:
+                obj = None
+            if obj is None:
+                raise RuntimeError("undefined_variable", name=obj_name)
+
+            if isinstance(obj, list) and method_name in interp.list_methods:
+                return interp.list_methods[method_name](obj, *values)
+            elif isinstance(obj, NumericList):
+                if method_name in interp.numeric_list_methods:
+                    return interp.numeric_list_methods[method_name](obj, *values)
+                if method_name in interp.list_methods:
+                    return interp.list_methods[method_name](obj.tolist(), *values)
+            elif isinstance(obj, dict) and method_name in interp.object_methods:
+                return interp.object_methods[method_name](obj, *values)
+            elif isinstance(obj, str) and method_name in interp.string_methods:
+                return interp.string_methods[method_name](obj, *values)
+            elif (
+                isinstance(obj, StringBuilder) and method_name in interp.builder_methods
+            ):
+                return interp.builder_methods[method_name](obj, *values)
+            raise RuntimeError(
+                "method_not_found",
+                method_name=method_name,
+                type_name=SoplangBuiltins.nooc(obj),
+            )
+
+        return dotted_function_call
+
+    def compile_unknown_expression(self, node):
+        node_type = node.type
+        line = getattr(node, "line", None)
+        position = getattr(node, "position", None)
+
+        def unknown_expression(interp):
+            raise RuntimeError(
+                "unknown_node_type", node_type=node_type, line=line, position=position
+            )
+
+        return unknown_expression
+
+
+def function_reference(func_name, code):
+    """Pass a function name through as-is if it names a function, else evaluate it"""
+
+    def reference(interp):
+        if func_name in interp.functions:
+            return func_name
+        return code(interp)
+
+    return reference
+
+
+def check_index(idx, arr, line=None, position=None):
+    """Validate a list index and normalise negative indices"""
+    if not isinstance(idx, (int, float)) or int(idx) != idx:
+        raise TypeError(
+            "invalid_operand",
+            operator="[]",
+            type_name="abn",
+            line=line,
+            position=position,
+        )
+
+    idx = int(idx)
+    # Support negative indexing (e.g., -1 for last element)
+    if idx < 0:
+        idx = len(arr) + idx
+
+    if idx < 0 or idx >= len(arr):
+        raise RuntimeError(
+            "index_out_of_range", index=idx, line=line, position=position
+        )
+
+    return idx
@@ -0,0 +1,85 @@
+UNSET = object()  # Value of a local slot that has not been declared yet
+
+
+class Environment:
+    """A single lexical scope in a Soplang program.
+
+    Each scope only stores the names declared in it (parameters, locals,
+    loop variables, ...) along with their static types and constant flags.
+    Lookups that miss the current scope continue through ``parent`` until the
+    global scope is reached, so entering a function only costs a new, small
+    frame instead of a copy of every global variable.
+
+    The scope of a function call is created with the local slots the Resolver
+    assigned to the function (``names``, name -> slot). Those variables live
+    in the flat ``slots`` list, which resolved code indexes directly; any
+    other name (and every global) is kept in ``values``.
+    """
+
+    __slots__ = ("values", "types", "constants", "parent", "names", "slots")
+
+    def __init__(self, parent=None, names=None):
+        self.values = {}  # Variable name -> value
+        self.types = {}  # Variable name -> declared static type
+        self.constants = set()  # Names declared with madoor
+        self.parent = parent  # Enclosing scope (None for globals)
+        self.names = names  # Local name -> slot, None for the global scope
+        self.slots = [UNSET] * len(names) if names else None  # Local values
+
+    def define(self, name, value, var_type=None, is_constant=False):
+        """Declare a variable in this scope, shadowing any outer variable"""
+        self.set(name, value)
+
+        if var_type is not None:
+            self.types[name] = var_type
+        else:
+            self.types.pop(name, None)
+
+        if is_constant:
+            self.constants.add(name)
+        else:
+            self.constants.discard(name)
+
+        return value
+
+    def set(self, name, value):
+        """Store a variable of this scope without any check"""
+        names = self.names
+        if names and name in names:
+            self.slots[names[name]] = value
+        else:
+            self.values[name] = value
+
+    def declares(self, name):
+        """Whether ``name`` is currently declared in this scope"""
+        names = self.names
+        if names and name in names and self.slots[names[name]] is not UNSET:
+            return True
+        return name in self.values
+
+    def find(self, name):
+        """Return the nearest scope that declares ``name``, or None"""
+        env = self
+        while env is not None:
+            if env.declares(name):
+                return env
+            env = env.parent
+        return None
+
+    def lookup(self, name):
+        """Return the value of ``name``, raising KeyError if it is undefined"""
+        env = self
+        while env is not None:
+            names = env.names
+            if names and name in names:
+                value = env.slots[names[name]]
+                if value is not UNSET:
+                    return value
+            values = env.values
+            if name in values:
+                return values[name]
+            env = env.parent
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        return self.find(name) is not None
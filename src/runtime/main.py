@@ -11,48 +11,90 @@ This module contains the core functions for running Soplang code:
 import os
 import sys
 
-from src.core.lexer import Lexer
-from src.core.parser import Parser
-from src.runtime.interpreter import Interpreter
+from src.core.ast import dump
+from src.runtime.cache import load_program, parse_source
 from src.utils.errors import SoplangError
 
+# Execution engines selectable with --engine: module and class of each, which
+# are only imported when the engine is used
+ENGINES = {
+    "interpreter": ("src.runtime.interpreter", "Interpreter"),
+    "vm": ("src.runtime.vm", "VirtualMachine"),
+}
 
-def run_soplang_file(filename):
+
+def engine_class(engine):
+    """The interpreter class of an --engine name"""
+    from importlib import import_module
+
+    module, name = ENGINES[engine]
+    return getattr(import_module(module), name)
+
+
+def run_soplang_file(
+    filename,
+    engine="interpreter",
+    use_cache=True,
+    optimize=False,
+    profiler=None,
+    source=None,
+    flush=None,
+    strict=True,
+):
     """
     Run a Soplang file through the lexer, parser, and interpreter
 
     This function handles the complete execution pipeline:
     1. Read the source file
-    2. Tokenize the source code
-    3. Parse tokens into an abstract syntax tree
-    4. Interpret and execute the program
+    2. Tokenize and parse it into an abstract syntax tree, or load the
+       cached tree from __sopcache__/ when the source is unchanged
+    3. Interpret and execute the program
 
     Args:
         filename (str): Path to the Soplang file to execute
+        engine (str): Execution engine, "interpreter" or "vm" (bytecode VM)
+        use_cache (bool): Read and write the AST cache (see cache.py)
+        optimize (bool): Run the Optimizer before executing (see optimizer.py)
+        profiler (Profiler): Profile the run with this profiler (see
+            profiler.py), or sample it with a Sampler (see sampler.py); both
+            always use the interpreter engine
+        source (str): Run this code instead of the contents of the file, which
+            is then only used to name the program (see server.py)
+        flush (str): Flush policy of the program's output, "line", "size" or
+            "exit" (see output.py); by default "line" when stdout is a
+            terminal and "size" otherwise
+        strict (bool): Report undefined names before running; when False
+            they are looked up at run time (see resolver.py)
 
     Returns:
         int: Exit code (0 for success, 1 for error)
     """
     try:
-        with open(filename, "r") as file:
-            code = file.read()
-
-        # Ensure code ends with a newline to avoid parsing issues
-        if not code.endswith("\n"):
-            code += "\n"
-
-        # 1) Tokenize the source code
-        lexer = Lexer(code)
-        tokens = lexer.tokenize()
-
-        # 2) Parse tokens into an AST
-        parser = Parser(tokens)
-        ast = parser.parse()
+        # 1) + 2) Read, tokenize and parse the source code
+        if source is None:
+            ast = load_program(filename, use_cache)
+        else:
+            ast = parse_source(source)
 
         # 3) Interpret and execute the AST
-        inter = Interpreter()
+        if profiler is None:
+            inter = engine_class(engine)()
+        else:
+            inter = profiler.interpreter(filename)
+        inter.use_cache = use_cache
+        inter.resolver.strict = strict
+        if flush is None:
+            flush = "line" if sys.stdout.isatty() else "size"
+        inter.output.set_policy(flush)
+        if optimize:
+            from src.runtime.optimizer import Optimizer
+
+            inter.optimizer = Optimizer()
         # Clean output without any headers or decorations
-        inter.interpret(ast)
+        if profiler is None:
+            inter.interpret(ast)
+        else:
+            profiler.run(inter, ast)
 
         # No status indication - clean execution completes silently
         return 0  # Success
@@ -66,30 +108,64 @@ def run_soplang_file(filename):
         print(f"✗ {e}")
         return 1  # Error
     except Exception as e:
-        # Convert Python exceptions to Somali error messages
-        from src.utils.errors import RuntimeError
-
-        # Format different types of Python errors as Somali errors
-        if "missing 1 required positional argument" in str(e):
-            # Function missing argument
-            func_name = str(e).split(".")[0]
-            error = RuntimeError(
-                "missing_argument", func_name=func_name, expected="1", provided="0"
-            )
-        elif "division by zero" in str(e):
-            # Division by zero
-            error = RuntimeError("division_by_zero")
-        elif "list index out of range" in str(e):
-            # List index out of range
-            error = RuntimeError("index_out_of_range", index="?")
-        else:
-            # Generic error
-            error = RuntimeError(f"Khalad: {str(e)}")
-
-        print(f"✗ {error}")
+        print(f"✗ {convert_python_error(e)}")
         return 1  # Error
 
 
+def convert_python_error(e):
+    """Convert a Python exception raised by Soplang code into a RuntimeError"""
+    from src.utils.errors import RuntimeError
+
+    # Format different types of Python errors as Somali errors
+    if "missing 1 required positional argument" in str(e):
+        # Function missing argument
+        func_name = str(e).split(".")[0]
+        return RuntimeError(
+            "missing_argument", func_name=func_name, expected="1", provided="0"
+        )
+    elif "division by zero" in str(e):
+        # Division by zero
+        return RuntimeError("division_by_zero")
+    elif "list index out of range" in str(e):
+        # List index out of range
+        return RuntimeError("index_out_of_range", index="?")
+    # Generic error
+    return RuntimeError(f"Khalad: {str(e)}")
+
+
+def dump_soplang_file(filename, use_cache=True, optimize=False):
+    """
+    Print the AST of a Soplang file without running it
+
+    Args:
+        filename (str): Path to the Soplang file
+        use_cache (bool): Read and write the AST cache (see cache.py)
+        optimize (bool): Print the tree as rewritten by the Optimizer, followed
+            by a summary of what it changed
+
+    Returns:
+        int: Exit code (0 for success, 1 for error)
+    """
+    try:
+        ast = load_program(filename, use_cache)
+    except FileNotFoundError:
+        print(f"✗ Khalad: Faylka '{os.path.basename(filename)}' ma helin.")
+        return 1
+    except SoplangError as e:
+        print(f"✗ {e}")
+        return 1
+
+    if optimize:
+        from src.runtime.optimizer import Optimizer
+
+        optimizer = Optimizer()
+        optimizer.optimize(ast)
+    print(dump(ast))
+    if optimize:
+        print(f"# Optimizer: {optimizer.summary()}")
+    return 0
+
+
 def print_usage():
     """
     Display usage information and available example files
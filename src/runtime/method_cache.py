@@ -0,0 +1,66 @@
+"""
+Soplang Method Caches
+=====================
+
+Inline caches for METHOD_CALL sites. Each call site (a compiled closure, or a
+CALL_METHOD instruction) owns a MethodCache that maps the Python class of the
+receivers it has seen to the built-in ``teed``, numeric list, ``walax``,
+``qoraal`` or ``qoraal_dhis`` method
+that the name resolves to. A repeated call such as ``items.dherer()`` in a
+loop then looks up the class of ``items`` and calls the method directly,
+instead of trying each receiver type in turn.
+
+A cache holds up to MAX_ENTRIES classes. Receivers that have no cacheable
+method (user methods stored in a ``walax``, unknown methods, other values)
+are remembered as misses and take the engine's generic path, as does every
+class once the cache is full.
+"""
+
+from src.stdlib.containers import NumericList, StringBuilder
+
+# Classes a call site remembers before every other class takes the generic path
+MAX_ENTRIES = 4
+
+# List methods that resolve function names in their arguments, and always take
+# the generic path (Interpreter.execute_list_method)
+UNCACHED_METHODS = frozenset(("shaandhee", "aaddin"))
+
+# Marks a receiver class the cache has not seen yet
+UNRESOLVED = object()
+
+
+class MethodCache:
+    __slots__ = ("method_name", "entries")
+
+    def __init__(self, method_name):
+        self.method_name = method_name
+        self.entries = {}  # Receiver class -> built-in method, or None for a miss
+
+    def __repr__(self):
+        return f"<MethodCache {self.method_name}>"
+
+    def resolve(self, interp, obj):
+        """Return the built-in method ``obj`` has, or None for the generic path
+
+        The result is cached for the class of ``obj`` while there is room.
+        """
+        cls = obj.__class__
+        if self.method_name in UNCACHED_METHODS:
+            methods = {}
+        elif issubclass(cls, list):
+            methods = interp.list_methods
+        elif issubclass(cls, dict):
+            methods = interp.object_methods
+        elif issubclass(cls, str):
+            methods = interp.string_methods
+        elif cls is NumericList:
+            methods = interp.numeric_list_methods
+        elif cls is StringBuilder:
+            methods = interp.builder_methods
+        else:
+            methods = {}
+
+        method = methods.get(self.method_name)
+        if len(self.entries) < MAX_ENTRIES:
+            self.entries[cls] = method
+        return method
@@ -0,0 +1,81 @@
+"""
+Soplang Module Registry
+=======================
+
+Finds and parses the files imported with ``ka_keen``. A module is known by its
+resolved absolute path and modification time, and its AST is parsed only once
+per process (through the on-disk cache of cache.py) until the file changes.
+
+Relative module names are looked up in the current working directory first,
+then in every directory of the ``SOPLANG_PATH`` environment variable
+(separated by ``os.pathsep``, like ``PYTHONPATH``).
+
+The registry is shared by all interpreters of a process. Which modules have
+already run is tracked by each Interpreter, since importing executes the
+module in that interpreter's scope.
+
+The optimizer rewrites a tree in place, and the compiler caches closures on
+its nodes, so a module imported with ``-O`` gets its own tree, parsed and
+optimized apart from the one used without it. A tree held by the registry is
+never changed afterwards.
+"""
+
+import os
+from stat import S_ISREG
+
+SEARCH_PATH_VARIABLE = "SOPLANG_PATH"
+
+
+def search_path():
+    """Directories listed in SOPLANG_PATH"""
+    value = os.environ.get(SEARCH_PATH_VARIABLE, "")
+    return [directory for directory in value.split(os.pathsep) if directory]
+
+
+class ModuleRegistry:
+    def __init__(self):
+        # (absolute path, optimized) -> (mtime, PROGRAM node)
+        self.modules = {}
+
+    def find(self, filename):
+        """Return the (absolute path, mtime) of a module name
+
+        Raises FileNotFoundError when no search directory contains it.
+        """
+        candidates = [filename]
+        if not os.path.isabs(filename):
+            candidates.extend(
+                os.path.join(directory, filename) for directory in search_path()
+            )
+
+        for candidate in candidates:
+            try:
+                info = os.stat(candidate)
+            except OSError:
+                continue
+            if S_ISREG(info.st_mode):
+                return os.path.realpath(candidate), info.st_mtime_ns
+        raise FileNotFoundError(filename)
+
+    def load(self, path, mtime, use_cache=True, optimizer=None):
+        """Return the AST of the module at ``path``, parsing it at most once
+
+        With an ``optimizer``, the AST is a separate copy optimized by it.
+        """
+        key = (path, optimizer is not None)
+        entry = self.modules.get(key)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        # Import the loader only when a module is first needed
+        from src.runtime.cache import load_program
+
+        ast = load_program(path, use_cache)
+        if optimizer is not None:
+            optimizer.optimize(ast)
+        self.modules[key] = (mtime, ast)
+        return ast
+
+
+# Registry shared by every interpreter of the process
+registry = ModuleRegistry()
@@ -0,0 +1,128 @@
+"""
+Implementations of the Soplang binary operators.
+
+Each operator is a plain function taking the already evaluated left and right
+operands, so it can be bound once when an expression is compiled instead of
+being looked up by name every time the expression is evaluated.
+
+When the static types of both operands are known (from ``abn``, ``qoraal``
+and ``bool`` declarations, or from literals), specialized_operator() picks an
+implementation without the type dispatch of the generic one. The static
+types are hints: every specialized operator checks the classes of its
+operands and falls back to the generic operator when they do not match.
+"""
+
+import operator
+
+from src.core.tokens import TokenType
+from src.stdlib.builtins import SoplangBuiltins
+from src.utils.errors import RuntimeError
+
+qoraal = SoplangBuiltins.qoraal
+
+# Classes of the values that each static type accepts (bool is an int in
+# Python, so abn accepts booleans too)
+NUMBER_CLASSES = frozenset((int, float, bool))
+STRING_CLASSES = frozenset((str,))
+BOOL_CLASSES = frozenset((bool,))
+STATIC_TYPE_CLASSES = {
+    TokenType.abn: NUMBER_CLASSES,
+    TokenType.QORAAL: STRING_CLASSES,
+    TokenType.BOOL: BOOL_CLASSES,
+}
+
+
+def add(left, right):
+    """Add two numbers, or concatenate when either operand is a string"""
+    if isinstance(left, str) or isinstance(right, str):
+        # Use qoraal for proper string conversion (including booleans to been/run)
+        return qoraal(left) + qoraal(right)
+    return left + right
+
+
+def divide(left, right):
+    if right == 0:
+        raise RuntimeError("division_by_zero")
+    return left / right
+
+
+def modulo(left, right):
+    if right == 0:
+        raise RuntimeError("modulo_by_zero")
+    return left % right
+
+
+def logical_and(left, right):
+    return bool(left) and bool(right)
+
+
+def logical_or(left, right):
+    return bool(left) or bool(right)
+
+
+BINARY_OPERATORS = {
+    "+": add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": divide,
+    "%": modulo,
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "&&": logical_and,
+    "||": logical_or,
+}
+
+
+def add_numbers(left, right):
+    """``+`` for operands whose static type is abn"""
+    if left.__class__ in NUMBER_CLASSES and right.__class__ in NUMBER_CLASSES:
+        return left + right
+    return add(left, right)
+
+
+def concatenate(left, right):
+    """``+`` for operands whose static type is qoraal"""
+    if left.__class__ is str and right.__class__ is str:
+        return left + right
+    return add(left, right)
+
+
+def static_type_of(value):
+    """Static type of a literal value (abn, qoraal or bool), or None"""
+    if value.__class__ is bool:
+        return TokenType.BOOL
+    if value.__class__ in NUMBER_CLASSES:
+        return TokenType.abn
+    if value.__class__ is str:
+        return TokenType.QORAAL
+    return None
+
+
+def specialized_operator(op, left_type, right_type, right_value=None):
+    """Implementation of ``op`` for operands of the given static types
+
+    ``right_value`` is the value of a literal right operand. Returns the
+    generic operator when there is no better one.
+    """
+    apply = BINARY_OPERATORS[op]
+    if op == "+" and left_type == right_type:
+        if left_type == TokenType.abn:
+            return add_numbers
+        if left_type == TokenType.QORAAL:
+            return concatenate
+    elif op in ("/", "%") and right_type == TokenType.abn and right_value:
+        # A constant divisor that is not zero needs no check
+        return operator.truediv if op == "/" else operator.mod
+    return apply
+
+
+def get_binary_operator(op):
+    """Return the implementation of a binary operator"""
+    try:
+        return BINARY_OPERATORS[op]
+    except KeyError:
+        raise RuntimeError("unknown_operator", operator=op)
@@ -0,0 +1,204 @@
+"""
+Soplang Optimizer
+=================
+
+An optional pass over the AST (``python main.py -O``) that runs after the
+Resolver and before the program is compiled. It rewrites the tree in place:
+
+- Constant folding: arithmetic, comparisons, string concatenation and ``!``
+  on literals are computed once, with the same operator implementations the
+  engines use. An operation that would fail (such as a division by zero) is
+  left alone so it still fails when it runs.
+- Dead branches: ``haddii`` / ``haddii_kale`` branches whose condition is a
+  constant are dropped, and a branch that is always taken replaces the
+  whole statement.
+- Short-circuit operators: ``&&`` and ``||`` become LOGICAL_OPERATION nodes,
+  which only evaluate their right operand when the left one does not decide
+  the result. Without the optimizer both operands are always evaluated.
+
+``python main.py -O --dump-ast FILE`` prints the optimized tree.
+"""
+
+from src.core.ast import Block, IfStatement, Literal, LogicalOperation, NodeType
+from src.runtime.operators import BINARY_OPERATORS
+
+# Operators folded when both operands are literals
+FOLDABLE_OPERATORS = {
+    op: apply for op, apply in BINARY_OPERATORS.items() if op not in ("&&", "||")
+}
+
+# Strings longer than this are built at run time instead of stored in the tree
+MAX_FOLDED_LENGTH = 4096
+
+# Nodes whose children (after any leading expressions) are plain statements,
+# where a pruned haddii can be replaced by a BLOCK
+STATEMENT_LISTS = (
+    NodeType.PROGRAM,
+    NodeType.BLOCK,
+    NodeType.FUNCTION_DEFINITION,
+    NodeType.LOOP_STATEMENT,
+    NodeType.WHILE_STATEMENT,
+    NodeType.CLASS_DEFINITION,
+)
+
+
+def is_constant(node):
+    """Whether ``node`` is a literal value (object properties are LITERAL
+    nodes with a child, and are not)"""
+    return node.type == NodeType.LITERAL and not node.children
+
+
+def if_branches(node):
+    """The (condition, body) branches of a haddii statement, in the order the
+    engines try them; the condition of the ugudambeyn branch is None"""
+
+    def body(if_node):
+        # An if or elif body runs until the first IF_STATEMENT or BLOCK child
+        statements = []
+        for child in if_node.children[1:]:
+            if child.type in (NodeType.IF_STATEMENT, NodeType.BLOCK):
+                break
+            statements.append(child)
+        return statements
+
+    branches = [(node.children[0], body(node))]
+    for child in node.children[1:]:
+        if child.type == NodeType.IF_STATEMENT:
+            branches.append((child.children[0], body(child)))
+        elif child.type == NodeType.BLOCK:
+            branches.append((None, child.children))
+            break
+    return branches
+
+
+class Optimizer:
+    def __init__(self):
+        self.folded = 0  # Operations replaced by their value
+        self.pruned = 0  # haddii branches removed
+        self.short_circuited = 0  # && and || made short-circuiting
+
+    def optimize(self, root):
+        """Optimize the tree below ``root`` in place, and return it"""
+        self.visit(root, prune=False)
+        return root
+
+    def summary(self):
+        return (
+            f"folded {self.folded} operation(s), pruned {self.pruned} branch(es), "
+            f"short-circuited {self.short_circuited} operator(s)"
+        )
+
+    # -----------------------------
+    #  Walking the tree
+    # -----------------------------
+    def visit(self, node, prune):
+        """Optimize ``node`` and return the node that replaces it
+
+        ``prune`` tells whether the node sits in a plain statement list, where
+        a haddii statement may be replaced by a BLOCK.
+        """
+        if node.type == NodeType.SWITCH_STATEMENT:
+            # The first child of a case is its value, or a BLOCK for the
+            # default case, so their statements are left in place
+            node.children[0] = self.visit(node.children[0], prune=False)
+            for case_node in node.children[1:]:
+                case_node.children[:] = [
+                    self.visit(child, prune=False) for child in case_node.children
+                ]
+            return node
+
+        prune_children = node.type in STATEMENT_LISTS
+        node.children[:] = [
+            self.visit(child, prune_children) for child in node.children
+        ]
+
+        if node.type == NodeType.BINARY_OPERATION:
+            if node.value in ("&&", "||"):
+                return self.logical_operation(node)
+            return self.binary_operation(node)
+        if node.type == NodeType.UNARY_OPERATION:
+            return self.unary_operation(node)
+        if node.type == NodeType.IF_STATEMENT and prune:
+            return self.if_statement(node)
+        return node
+
+    # -----------------------------
+    #  Expressions
+    # -----------------------------
+    def constant(self, value, node):
+        """A literal replacing the operation ``node``"""
+        self.folded += 1
+        return Literal(value, line=node.line, position=node.position)
+
+    def binary_operation(self, node):
+        left, right = node.children
+        apply = FOLDABLE_OPERATORS.get(node.value)
+        if apply is None or not (is_constant(left) and is_constant(right)):
+            return node
+        try:
+            value = apply(left.value, right.value)
+        except Exception:
+            # Keep the error for when the expression runs
+            return node
+        if isinstance(value, str) and len(value) > MAX_FOLDED_LENGTH:
+            return node
+        return self.constant(value, node)
+
+    def logical_operation(self, node):
+        left, right = node.children
+        if is_constant(left):
+            # The left operand alone decides the result
+            if node.value == "&&" and not left.value:
+                return self.constant(False, node)
+            if node.value == "||" and left.value:
+                return self.constant(True, node)
+            if is_constant(right):
+                return self.constant(bool(right.value), node)
+
+        self.short_circuited += 1
+        return LogicalOperation(
+            node.value, node.children, line=node.line, position=node.position
+        )
+
+    def unary_operation(self, node):
+        operand = node.children[0]
+        if node.value == "!" and is_constant(operand):
+            return self.constant(not operand.value, node)
+        return node
+
+    # -----------------------------
+    #  Statements
+    # -----------------------------
+    def if_statement(self, node):
+        branches = if_branches(node)
+        kept = []
+        for condition, body in branches:
+            if condition is not None and is_constant(condition):
+                if not condition.value:
+                    continue
+                # Always taken: the branches after it can never run
+                condition = None
+            kept.append((condition, body))
+            if condition is None:
+                break
+
+        if len(kept) == len(branches) and all(
+            kept_condition is condition
+            for (kept_condition, _), (condition, _) in zip(kept, branches)
+        ):
+            return node
+        self.pruned += len(branches) - len(kept)
+
+        if not kept or kept[0][0] is None:
+            body = kept[0][1] if kept else []
+            return Block(children=body, line=node.line, position=node.position)
+
+        # Rebuild the statement from the remaining branches
+        (condition, body), rest = kept[0], kept[1:]
+        children = [condition] + body
+        for branch_condition, branch_body in rest:
+            if branch_condition is None:
+                children.append(Block(children=branch_body))
+            else:
+                children.append(IfStatement(children=[branch_condition] + branch_body))
+        return IfStatement(children=children, line=node.line, position=node.position)
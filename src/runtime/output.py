@@ -0,0 +1,106 @@
+"""
+Soplang Output
+==============
+
+Every Interpreter owns an Output, which its ``qor`` and ``gelin`` built-ins
+write to. Lines are collected in a list and written to the stream in one call
+when the flush policy says so:
+
+- ``line``: after every line, like print() (the default)
+- ``size``: once ``buffer_size`` characters are waiting, for output to pipes
+  and files, where one write per line costs more than the line itself
+- ``exit``: only when the program ends
+
+``qor`` of a list or object writes it in chunks while serialize() walks it,
+flushing every ``buffer_size`` characters even under the line policy, so
+printing a huge list does not build it as one string.
+
+Whatever the policy, the interpreter flushes when a program finishes or
+fails (Interpreter.run_program), and ``gelin`` flushes before it reads, so
+its prompt and earlier output are shown first.
+
+``stream`` is where the output goes. None, the default, means the
+``sys.stdout`` of the moment of each flush, so redirecting sys.stdout (as
+tests and the server do) also redirects interpreters that already exist.
+Setting it to another stream, like an io.StringIO, gives one interpreter its
+own output (see program.py).
+"""
+
+import sys
+
+from src.stdlib.builtins import SoplangBuiltins
+from src.stdlib.containers import NumericList, serialize
+
+FLUSH_POLICIES = ("line", "size", "exit")
+
+# Characters buffered by the size policy before they are written
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class Output:
+    def __init__(self, stream=None, policy="line", buffer_size=DEFAULT_BUFFER_SIZE):
+        self.stream = stream  # None for the current sys.stdout
+        self.parts = []  # Text written since the last flush
+        self.size = 0  # Characters in parts
+        self.buffer_size = buffer_size
+        self.set_policy(policy)
+
+    def set_policy(self, policy):
+        """Change the flush policy, flushing what the old one kept"""
+        if policy not in FLUSH_POLICIES:
+            raise ValueError(f"unknown flush policy {policy!r}")
+        self.flush()
+        self.policy = policy
+        # Buffered characters that trigger a flush
+        if policy == "line":
+            self.limit = 0
+        elif policy == "size":
+            self.limit = self.buffer_size
+        else:
+            self.limit = float("inf")
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.limit:
+            self.flush()
+
+    def write_chunk(self, text):
+        """Write part of a line, flushing whole buffers whatever the policy"""
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= max(self.limit, self.buffer_size):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered text to the stream"""
+        if self.parts:
+            text = "".join(self.parts)
+            self.parts.clear()
+            self.size = 0
+            (sys.stdout if self.stream is None else self.stream).write(text)
+
+    # -----------------------------
+    #  Built-in functions
+    # -----------------------------
+    def qor(self, message=""):
+        """Print a message, followed by a newline (the qor built-in)
+
+        A list or object is written in chunks as it is serialized, and never
+        built as one string, so qor returns maran for it.
+        """
+        if isinstance(message, (list, dict, NumericList)):
+            serialize(message, self.write_chunk)
+            self.write("\n")
+            return None
+        text = SoplangBuiltins.qoraal(message)
+        self.parts.append(text + "\n")
+        self.size += len(text) + 1
+        if self.size >= self.limit:
+            self.flush()
+        return text
+
+    def gelin(self, prompt=""):
+        """Read a line of input after showing ``prompt`` (the gelin built-in)"""
+        self.flush()
+        return SoplangBuiltins.gelin(prompt)
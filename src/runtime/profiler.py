@@ -0,0 +1,298 @@
+"""
+Soplang Profiler
+================
+
+A deterministic profiler for Soplang programs (``python main.py --profile
+FILE``). cProfile only shows the frames of the engine (compiled closures,
+``call_user_function``), so this profiler attributes wall time to what the
+program calls them: ``hawl`` functions and source lines.
+
+Profiling only changes how a program is compiled. A ProfilingInterpreter
+compiles every statement with a ProfilingCompiler, which wraps the closure of
+each statement in a timer for its line, and times every call of a user
+function. Programs run without ``--profile`` use the plain Compiler and
+Interpreter and pay nothing for it. The profiler always runs on the closure
+engine.
+
+Line times are inclusive: the line of a loop, or of a statement calling a
+function, includes everything that runs for it. Function times are split into
+self time and total time (self time plus the functions it calls).
+
+Reports:
+
+- report(): text tables of the functions (by total time) and of the lines
+  (by time)
+- write_pstats(path): the file format of cProfile's ``dump_stats``, for
+  ``python -m pstats`` and other pstats viewers
+- write_collapsed(path): one ``<program>;f;g 1234`` line per call stack with
+  its self time in microseconds, for flamegraph.pl or speedscope
+"""
+
+import linecache
+import marshal
+import os
+from time import perf_counter
+
+from src.runtime.compiler import Compiler
+from src.runtime.interpreter import Interpreter
+
+# Name of the program's top level in reports and call stacks
+PROGRAM = "<program>"
+
+# Output files with these suffixes get collapsed stacks instead of pstats data
+COLLAPSED_SUFFIXES = (".folded", ".collapsed")
+
+
+class FunctionStats:
+    """Timings of one Soplang function"""
+
+    __slots__ = ("calls", "primitive_calls", "self_time", "total_time", "callers")
+
+    def __init__(self):
+        self.calls = 0
+        self.primitive_calls = 0  # Calls that were not recursive
+        self.self_time = 0.0
+        self.total_time = 0.0  # Time of the non-recursive calls
+        self.callers = {}  # Caller key -> [calls, primitive calls, self, total]
+
+
+class Profiler:
+    def __init__(self):
+        self.filename = None  # File of the profiled program
+        self.total_time = 0.0
+        self.lines = {}  # (filename, line) -> [hits, time, running]
+        self.functions = {}  # (filename, line, name) -> FunctionStats
+        self.stacks = {}  # "<program>;f;g" -> self time
+        self.frames = []  # Running calls: [key, stack, time in callees]
+        self.depth = {}  # Function key -> number of its calls running
+        self.called_time = 0.0  # Time of the calls made from the top level
+
+    # -----------------------------
+    #  Running
+    # -----------------------------
+    def interpreter(self, filename):
+        """A new interpreter profiling the program in ``filename``"""
+        self.filename = filename
+        return ProfilingInterpreter(self, filename)
+
+    def run(self, interpreter, ast):
+        """Run ``ast`` on a ProfilingInterpreter"""
+        start = perf_counter()
+        try:
+            interpreter.interpret(ast)
+        finally:
+            self.total_time += perf_counter() - start
+
+    def time_line(self, code, key):
+        """Wrap the statement closure ``code`` in a timer for the line ``key``"""
+        stats = self.lines.setdefault(key, [0, 0.0, False])
+
+        def timed_statement(interp):
+            stats[0] += 1
+            if stats[2]:
+                # A recursive run of the line is part of the outer run's time
+                return code(interp)
+            stats[2] = True
+            start = perf_counter()
+            try:
+                return code(interp)
+            finally:
+                stats[1] += perf_counter() - start
+                stats[2] = False
+
+        return timed_statement
+
+    def call(self, key, call_function, *args):
+        """Time ``call_function(*args)`` as a call of the function ``key``"""
+        frames = self.frames
+        if frames:
+            caller_key, caller_stack = frames[-1][0], frames[-1][1]
+        else:
+            caller_key, caller_stack = self.program_key(), PROGRAM
+        frame = [key, f"{caller_stack};{key[2]}", 0.0]
+        frames.append(frame)
+        depth = self.depth.get(key, 0)
+        self.depth[key] = depth + 1
+
+        start = perf_counter()
+        try:
+            return call_function(*args)
+        finally:
+            elapsed = perf_counter() - start
+            frames.pop()
+            self.depth[key] = depth
+            self_time = elapsed - frame[2]
+            if frames:
+                frames[-1][2] += elapsed
+            else:
+                self.called_time += elapsed
+
+            stats = self.functions.get(key)
+            if stats is None:
+                stats = self.functions[key] = FunctionStats()
+            caller = stats.callers.get(caller_key)
+            if caller is None:
+                caller = stats.callers[caller_key] = [0, 0, 0.0, 0.0]
+            stats.calls += 1
+            stats.self_time += self_time
+            caller[0] += 1
+            caller[2] += self_time
+            if not depth:
+                # Recursive calls are already part of the outermost call's time
+                stats.primitive_calls += 1
+                stats.total_time += elapsed
+                caller[1] += 1
+                caller[3] += elapsed
+            stack = frame[1]
+            self.stacks[stack] = self.stacks.get(stack, 0.0) + self_time
+
+    def program_key(self):
+        return (self.filename or PROGRAM, 0, PROGRAM)
+
+    # -----------------------------
+    #  Reports
+    # -----------------------------
+    def report(self, limit=20):
+        """Text tables of the functions and the ``limit`` slowest lines"""
+        out = [f"Soplang profile of {self.filename}: {self.total_time:.3f} s total", ""]
+
+        out.append("   calls     self s    total s   per call  function")
+        functions = sorted(
+            self.functions.items(), key=lambda item: item[1].total_time, reverse=True
+        )
+        for (filename, line, name), stats in functions:
+            per_call = stats.total_time / max(stats.primitive_calls, 1)
+            calls = str(stats.calls)
+            if stats.primitive_calls != stats.calls:
+                calls = f"{stats.calls}/{stats.primitive_calls}"
+            out.append(
+                f"{calls:>8} {stats.self_time:>10.4f} {stats.total_time:>10.4f} "
+                f"{format_duration(per_call):>10}  "
+                f"{name} ({os.path.basename(filename)}:{line})"
+            )
+        if not functions:
+            out.append("  (no functions called)")
+
+        out.extend(["", "    hits     time s  line"])
+        lines = sorted(self.lines.items(), key=lambda item: item[1][1], reverse=True)
+        for (filename, line), (hits, time, _) in lines[:limit]:
+            source = linecache.getline(filename, line).strip() if filename else ""
+            location = f"{os.path.basename(filename or PROGRAM)}:{line}"
+            out.append(f"{hits:>8} {time:>10.4f}  {location:<16} {source}")
+        return "\n".join(out)
+
+    def pstats(self):
+        """The profile as the dict that pstats.Stats loads"""
+        stats = {}
+        for key, function in self.functions.items():
+            callers = {
+                caller: tuple(values) for caller, values in function.callers.items()
+            }
+            stats[key] = (
+                function.primitive_calls,
+                function.calls,
+                function.self_time,
+                function.total_time,
+                callers,
+            )
+        stats[self.program_key()] = (
+            1,
+            1,
+            self.total_time - self.called_time,
+            self.total_time,
+            {},
+        )
+        return stats
+
+    def collapsed(self):
+        """Collapsed call stacks with their self time in microseconds"""
+        stacks = dict(self.stacks)
+        stacks[PROGRAM] = self.total_time - self.called_time
+        return "".join(
+            f"{stack} {round(time * 1e6)}\n"
+            for stack, time in sorted(stacks.items())
+            if round(time * 1e6) > 0
+        )
+
+    def write_pstats(self, path):
+        with open(path, "wb") as file:
+            marshal.dump(self.pstats(), file)
+
+    def write_collapsed(self, path):
+        with open(path, "w") as file:
+            file.write(self.collapsed())
+
+    def write(self, path):
+        """Write collapsed stacks to a .folded or .collapsed file, else pstats data"""
+        if path.endswith(COLLAPSED_SUFFIXES):
+            self.write_collapsed(path)
+        else:
+            self.write_pstats(path)
+
+
+def format_duration(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+class ProfilingCompiler(Compiler):
+    """A Compiler that times every statement it compiles"""
+
+    def __init__(self, profiler):
+        super().__init__()
+        self.profiler = profiler
+        self.filename = None  # File of the statements being compiled
+        # Timed closures are kept here instead of in node.code, so the same
+        # tree can still run without the timers
+        self.compiled = {}
+
+    def compile_statement(self, node):
+        code = self.compiled.get(node)
+        if code is None:
+            code = self.build_statement(node)
+            if node.line is not None:
+                code = self.profiler.time_line(code, (self.filename, node.line))
+            self.compiled[node] = code
+        return code
+
+
+class ProfilingInterpreter(Interpreter):
+    """An Interpreter reporting its statements and calls to a Profiler"""
+
+    def __init__(self, profiler, filename):
+        super().__init__()
+        self.profiler = profiler
+        self.compiler = ProfilingCompiler(profiler)
+        self.compiler.filename = filename
+
+    def define_function(self, node):
+        super().define_function(node)
+        self.functions[node.value]["profile_key"] = (
+            self.compiler.filename,
+            node.line,
+            node.value,
+        )
+
+    def call_user_function(self, user_func, args, line=None):
+        key = user_func.get("profile_key")
+        if key is None:
+            return super().call_user_function(user_func, args, line)
+        return self.profiler.call(
+            key, super().call_user_function, user_func, args, line
+        )
+
+    def execute_import_statement(self, node):
+        # Lines and functions of the module are reported under its file
+        try:
+            path = self.modules.find(node.value)[0]
+        except FileNotFoundError:
+            path = node.value  # Reported by execute_import_statement
+        previous = self.compiler.filename
+        self.compiler.filename = path
+        try:
+            return super().execute_import_statement(node)
+        finally:
+            self.compiler.filename = previous
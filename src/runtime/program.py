@@ -0,0 +1,126 @@
+"""
+Soplang Embedding API
+=====================
+
+Runs Soplang code from Python programs, parsing it only once::
+
+    import src as soplang
+
+    rule = soplang.compile('door qiimo = tiro * 2\\nqor("qiimo: " + qiimo)')
+    result = rule.run({"tiro": 21})
+    result.output              # "qiimo: 42\\n"
+    result.variables["qiimo"]  # 42
+
+    results = rule.run_many([{"tiro": 1}, {"tiro": 2}])
+
+``compile()`` lexes and parses the source into a Program. Each ``run()``
+defines its ``inputs`` as global variables of a new interpreter, runs the
+tree and returns a Result holding what the program printed and its global
+variables. ``run_many()`` runs the program once per record on a single
+interpreter, which is reset (see Interpreter.reset) between records instead
+of being created again. Output is collected in each interpreter's own Output
+(see output.py), not through sys.stdout.
+
+Runs share the parsed tree and the closures compiled on it, so only the first
+run pays for compiling, and the tree is only resolved again when a run
+defines different input names. Soplang errors are raised as SoplangError, by
+``compile()`` for invalid source and by ``run()`` for errors at run time.
+Inputs are Python values used as they are: ints, floats, strings, bools, lists
+and dicts are Soplang abn, jajab, qoraal, bool, teed and walax values.
+"""
+
+import io
+
+from src.runtime.cache import parse_source
+
+
+class Result:
+    """What one run of a Program printed and the globals it ended with"""
+
+    __slots__ = ("output", "variables")
+
+    def __init__(self, output, variables):
+        self.output = output  # Everything printed by qor
+        self.variables = variables  # Global variable name -> value
+
+    def __repr__(self):
+        return f"Result(output={self.output!r}, variables={self.variables!r})"
+
+
+class Program:
+    def __init__(self, ast, name="<program>", engine="interpreter", optimize=False):
+        self.ast = ast  # PROGRAM node, shared by every run
+        self.name = name
+        self.engine = engine
+        self.optimize = optimize
+        # Input names the tree was last resolved with, None before the first run
+        self.resolved_names = None
+
+    def interpreter(self):
+        """A new interpreter to run the program on"""
+        from src.runtime.main import engine_class
+
+        interpreter = engine_class(self.engine)()
+        interpreter.output.set_policy("exit")
+        return interpreter
+
+    def run(self, inputs=None):
+        """Run the program with the global variables in ``inputs``"""
+        return self.execute(self.interpreter(), inputs)
+
+    def run_many(self, records):
+        """Run the program once for each dict of inputs in ``records``
+
+        Returns the list of Results, in the order of the records.
+        """
+        interpreter = self.interpreter()
+        results = []
+        for inputs in records:
+            results.append(self.execute(interpreter, inputs))
+            interpreter.reset()
+        return results
+
+    def execute(self, interpreter, inputs):
+        """Run the program on a fresh (or reset) ``interpreter``"""
+        if inputs:
+            define = interpreter.globals.define
+            for name, value in inputs.items():
+                define(name, value)
+
+        # The Resolver's annotations only depend on which globals exist when
+        # the program starts, so the tree is resolved again (and optimized
+        # the first time) only when the input names change
+        names = frozenset(inputs) if inputs else frozenset()
+        if names != self.resolved_names:
+            interpreter.resolver.resolve(self.ast, interpreter.globals)
+            if self.optimize and self.resolved_names is None:
+                from src.runtime.optimizer import Optimizer
+
+                Optimizer().optimize(self.ast)
+            self.resolved_names = names
+
+        output = interpreter.output.stream = io.StringIO()
+        interpreter.run_program(self.ast)
+        return Result(output.getvalue(), dict(interpreter.globals.values))
+
+    def __repr__(self):
+        return f"<Program {self.name}>"
+
+
+def compile(source, name="<program>", engine="interpreter", optimize=False):
+    """
+    Parse Soplang source code into a Program that can be run many times
+
+    Args:
+        source (str): Soplang code
+        name (str): Name of the program, used in its repr
+        engine (str): Execution engine, "interpreter" or "vm" (bytecode VM)
+        optimize (bool): Run the Optimizer on the program (see optimizer.py)
+
+    Returns:
+        Program: The parsed program
+
+    Raises:
+        SoplangError: When the source cannot be lexed or parsed
+    """
+    return Program(parse_source(source), name, engine, optimize)
@@ -0,0 +1,242 @@
+"""
+Soplang Resolver
+================
+
+A static pass over the Parser output that runs before a program executes.
+Only function bodies introduce scopes in Soplang, so the resolver knows every
+name a function (or the program) can declare before looking at a single
+reference.
+
+Every IDENTIFIER, ASSIGNMENT and declaration (VARIABLE_DECLARATION, loop and
+``qabo`` variables) that refers to a variable is annotated with a
+``(depth, slot)`` pair: ``depth`` is the number of function scopes between
+the reference and the scope that declares the name, and ``slot`` is the index
+of the name in that function's local slots, or None for a global. Function
+definitions get their slot table in ``node.locals``, which the Interpreter
+uses to give each call a flat list of locals instead of a dict.
+
+The same pass reports undefined names and ``madoor`` reassignments before
+anything runs. Assignments it annotates are known not to target a constant,
+so they skip that check at run time. A few things can only be known once the
+program runs, and those nodes are left unannotated so they keep the full
+checks at run time:
+
+- ``ka_keen`` can declare any name, so a program that imports does not get
+  undefined-name errors or unchecked assignments.
+- Errors inside ``isku_day`` stay catchable by its ``qabo`` block.
+- A name declared with both ``madoor`` and ``door`` in one scope.
+
+A Resolver made with ``strict=False`` does not report undefined names either,
+and leaves them to be looked up when they run. Code run piece by piece
+against live globals, like shell input and ``-c`` code, uses it: a function
+may refer to a global that a later input defines.
+"""
+
+from src.core.ast import NodeType
+from src.utils.errors import RuntimeError
+
+# Nodes that declare the name in their value in the current scope
+DECLARING_NODES = (
+    NodeType.VARIABLE_DECLARATION,
+    NodeType.LOOP_STATEMENT,
+    NodeType.TRY_CATCH,
+)
+
+
+class Scope:
+    """The names declared by a function body or by the program"""
+
+    __slots__ = ("parent", "slots", "variables", "constants")
+
+    def __init__(self, parent=None, params=None):
+        self.parent = parent  # Enclosing scope (None for globals)
+        # Local name -> slot for function scopes, None for the global scope
+        self.slots = None if params is None else {}
+        self.variables = set()  # Names with a non-constant declaration
+        self.constants = set()  # Names with a madoor declaration
+        for param in params or ():
+            self.declare(param)
+
+    def declare(self, name, is_constant=False):
+        if self.slots is not None and name not in self.slots:
+            self.slots[name] = len(self.slots)
+        if is_constant:
+            self.constants.add(name)
+        else:
+            self.variables.add(name)
+
+    def declares(self, name):
+        return name in self.variables or name in self.constants
+
+
+class Resolver:
+    def __init__(self, strict=True):
+        self.strict = strict  # Whether undefined names are static errors
+
+    def resolve(self, root, globals_env=None):
+        """Annotate the variables of a program, raising on static errors
+
+        ``globals_env`` holds the globals that already exist when the program
+        runs, like the ones a shell session defined earlier.
+        """
+        self.dynamic = contains_import(root)
+
+        scope = Scope()
+        if globals_env is not None:
+            for name in globals_env.values:
+                scope.declare(name, is_constant=name in globals_env.constants)
+        self.declare_all(scope, root.children)
+        for node in root.children:
+            self.visit(node, scope, False)
+
+    def declare_all(self, scope, nodes):
+        """Declare the names of ``nodes`` outside of nested definitions"""
+        for node in nodes:
+            if node.type == NodeType.FUNCTION_DEFINITION:
+                continue
+            if node.type == NodeType.CLASS_DEFINITION:
+                # Fields are stored in the class, and methods are never run
+                self.declare_all(
+                    scope,
+                    [
+                        child
+                        for child in node.children
+                        if child.type != NodeType.VARIABLE_DECLARATION
+                    ],
+                )
+                continue
+            if node.type in DECLARING_NODES:
+                scope.declare(
+                    node.value,
+                    is_constant=node.type == NodeType.VARIABLE_DECLARATION
+                    and node.is_constant,
+                )
+            self.declare_all(scope, node.children)
+
+    # -----------------------------
+    #  Walking the tree
+    # -----------------------------
+    def visit(self, node, scope, in_try):
+        node_type = node.type
+
+        if node_type == NodeType.IDENTIFIER:
+            self.resolve_reference(node, scope, in_try)
+
+        elif node_type == NodeType.ASSIGNMENT:
+            target = node.children[0]
+            if target.type == NodeType.IDENTIFIER:
+                self.resolve_assignment(node, target, scope, in_try)
+            else:
+                self.visit(target, scope, in_try)
+            self.visit(node.children[1], scope, in_try)
+
+        elif node_type == NodeType.FUNCTION_DEFINITION:
+            self.resolve_function(node, scope)
+
+        elif node_type == NodeType.TRY_CATCH:
+            # Errors in the try block are reported when (and if) they happen
+            for child in node.children[0].children:
+                self.visit(child, scope, True)
+            self.bind(node, scope)
+            for child in node.children[1].children:
+                self.visit(child, scope, in_try)
+
+        elif node_type == NodeType.CLASS_DEFINITION:
+            for child in node.children:
+                if child.type == NodeType.VARIABLE_DECLARATION:
+                    # A field: only its value is evaluated
+                    self.visit(child.children[0], scope, in_try)
+                elif child.type != NodeType.FUNCTION_DEFINITION:
+                    self.visit(child, scope, in_try)
+
+        elif node_type == NodeType.METHOD_CALL and node.value == "shaandhee":
+            # An identifier argument may name a function instead of a variable
+            self.visit(node.children[0], scope, in_try)
+            for arg in node.children[1:]:
+                self.visit(arg, scope, in_try or arg.type == NodeType.IDENTIFIER)
+
+        else:
+            if node_type in DECLARING_NODES:
+                self.bind(node, scope)
+            for child in node.children:
+                self.visit(child, scope, in_try)
+
+    def resolve_function(self, node, scope):
+        params = [
+            child.value for child in node.children if child.type == NodeType.IDENTIFIER
+        ]
+        body = [
+            child for child in node.children if child.type != NodeType.IDENTIFIER
+        ]
+
+        function_scope = Scope(scope, params)
+        self.declare_all(function_scope, body)
+        node.locals = function_scope.slots
+        for child in body:
+            self.visit(child, function_scope, False)
+
+    # -----------------------------
+    #  Names
+    # -----------------------------
+    def lookup(self, name, scope):
+        """Return the scope declaring ``name`` and its distance, or (None, None)"""
+        depth = 0
+        while scope is not None:
+            if scope.declares(name):
+                return scope, depth
+            scope = scope.parent
+            depth += 1
+        return None, None
+
+    def bind(self, node, scope):
+        """Annotate a declaration, which always targets the current scope"""
+        node.depth = 0
+        node.slot = None if scope.slots is None else scope.slots[node.value]
+
+    def resolve_reference(self, node, scope, in_try):
+        name = node.value
+        node.depth = node.slot = None
+        target, depth = self.lookup(name, scope)
+        if target is None:
+            self.undefined(node, name, in_try)
+            return
+
+        node.depth = depth
+        node.slot = None if target.slots is None else target.slots[name]
+
+    def resolve_assignment(self, node, target_node, scope, in_try):
+        name = target_node.value
+        node.depth = node.slot = None
+        target, depth = self.lookup(name, scope)
+        if target is None:
+            self.undefined(node, name, in_try)
+            return
+
+        if name in target.constants:
+            if name not in target.variables and not in_try and not self.dynamic:
+                raise RuntimeError(
+                    "constant_reassignment",
+                    name=name,
+                    line=node.line,
+                    position=node.position,
+                )
+            # Left to the run time check
+            return
+
+        if not self.dynamic:
+            node.depth = depth
+            node.slot = None if target.slots is None else target.slots[name]
+
+    def undefined(self, node, name, in_try):
+        if in_try or self.dynamic or not self.strict:
+            return
+        raise RuntimeError(
+            "undefined_variable", name=name, line=node.line, position=node.position
+        )
+
+
+def contains_import(node):
+    """Whether ``node`` or any node below it is a ka_keen statement"""
+    if node.type == NodeType.IMPORT_STATEMENT:
+        return True
+    return any(contains_import(child) for child in node.children)
@@ -0,0 +1,138 @@
+"""
+Soplang Sampling Profiler
+=========================
+
+A statistical profiler for Soplang programs (``python main.py --sample
+out.folded FILE``). Unlike the deterministic Profiler (profiler.py), it does
+not change how a program is compiled: the program runs on a plain
+Interpreter, which keeps its Soplang call stack in ``Interpreter.call_stack``
+as (function name, line of the call) tuples. A background thread wakes up
+``rate`` times per second, copies that stack and counts it, so long-running
+jobs are profiled at close to their normal speed.
+
+Samples are written as collapsed stacks, one line per distinct stack with
+the number of samples that saw it::
+
+    <program>:10;twice:8;fib:5;fib 412
+
+Each frame but the last is followed by the line it was running a call on, so
+the innermost function is reported without a line. The file can be read by
+flamegraph.pl, speedscope or inferno.
+
+The sampler only sees calls made on the closure engine; programs sampled with
+``--engine=vm`` are rejected by main.py.
+"""
+
+import sys
+import threading
+from time import perf_counter, sleep
+
+from src.runtime.interpreter import Interpreter
+from src.runtime.profiler import PROGRAM
+
+# Samples taken per second unless --sample-rate says otherwise
+DEFAULT_RATE = 1000
+
+
+class Sampler:
+    def __init__(self, rate=DEFAULT_RATE):
+        if rate <= 0:
+            raise ValueError("sample rate must be positive")
+        self.interval = 1.0 / rate
+        self.filename = None  # File of the sampled program
+        self.samples = {}  # Tuple of call stack entries -> number of samples
+        self.sample_count = 0
+        self.total_time = 0.0
+        self.thread = None
+        self.stopped = threading.Event()
+
+    # -----------------------------
+    #  Running
+    # -----------------------------
+    def interpreter(self, filename):
+        """A new interpreter for the program in ``filename``"""
+        self.filename = filename
+        return Interpreter()
+
+    def run(self, interpreter, ast):
+        """Run ``ast`` on ``interpreter`` while sampling its call stack"""
+        self.start(interpreter)
+        start = perf_counter()
+        try:
+            interpreter.interpret(ast)
+        finally:
+            self.total_time += perf_counter() - start
+            self.stop()
+
+    def start(self, interpreter):
+        """Start sampling the call stack of ``interpreter`` in a thread"""
+        # A thread waiting for the GIL only gets it when the running thread
+        # switches, every 5 ms by default, so switch at the sampling rate
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.switch_interval, self.interval))
+        self.stopped.clear()
+        self.thread = threading.Thread(
+            target=self.sample, args=(interpreter.call_stack,), daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        """Stop the sampling thread started by start()"""
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+        sys.setswitchinterval(self.switch_interval)
+
+    def sample(self, call_stack):
+        samples = self.samples
+        interval = self.interval
+        stopped = self.stopped
+        count = 0
+        # Sample on a fixed schedule, so that slow wake-ups do not lower the rate
+        next_sample = perf_counter() + interval
+        while not stopped.is_set():
+            now = perf_counter()
+            delay = next_sample - now
+            if delay > 0:
+                sleep(delay)
+            elif delay < -interval:
+                # Too far behind (the GIL was held): skip the missed samples
+                next_sample = now
+            next_sample += interval
+            stack = tuple(call_stack)
+            samples[stack] = samples.get(stack, 0) + 1
+            count += 1
+        self.sample_count += count
+
+    # -----------------------------
+    #  Reports
+    # -----------------------------
+    def collapsed(self):
+        """Collapsed call stacks with their number of samples"""
+        counts = {}
+        for stack, count in self.samples.items():
+            name = collapse(stack)
+            counts[name] = counts.get(name, 0) + count
+        return "".join(f"{name} {count}\n" for name, count in sorted(counts.items()))
+
+    def write(self, path):
+        with open(path, "w") as file:
+            file.write(self.collapsed())
+
+    def summary(self):
+        rate = self.sample_count / self.total_time if self.total_time else 0.0
+        return (
+            f"Soplang samples of {self.filename}: {self.sample_count} samples in "
+            f"{self.total_time:.3f} s ({rate:.0f} per second)"
+        )
+
+
+def collapse(stack):
+    """The collapsed form of a call stack, ``<program>:10;twice:8;fib``"""
+    frames = []
+    name = PROGRAM
+    for callee, line in stack:
+        frames.append(name if line is None else f"{name}:{line}")
+        name = callee
+    frames.append(name)
+    return ";".join(frames)
@@ -0,0 +1,313 @@
+"""
+Soplang Execution Server
+========================
+
+Runs Soplang programs for other processes, so that short scripts run often
+do not pay for starting Python and importing the runtime every time::
+
+    python main.py --serve [--socket PATH] [--workers N]
+    python main.py --daemon file.sop
+    python main.py --daemon -c 'qor("salaan")'
+
+``--serve`` imports the lexer, parser, interpreters and optimizer, listens on
+a Unix domain socket and then forks a pool of worker processes, which all
+accept connections on that socket. The parent only restarts workers that
+die, and stops them on SIGINT or SIGTERM. Workers keep the process-wide
+caches warm between requests (the module registry of modules.py, and
+compiled closures on the ASTs it holds, kept apart for ``optimize``), but
+every request runs on a new Interpreter, so no variables, functions or
+classes leak from one to the next. The socket is only accessible to the
+user running the server.
+
+A connection carries one request, a line of JSON, answered by one line of
+JSON::
+
+    {"path": "/abs/file.sop", "cwd": "/abs", "stdin": "", "engine": "vm"}
+    {"stdout": "salaan\\n", "status": 0}
+
+A request has either a ``path`` or the ``source`` of a program, and may set
+``cwd`` (where the program runs and relative ``ka_keen`` names are looked
+up), ``search_path`` (its SOPLANG_PATH), ``stdin`` (the input read by
+gelin), ``engine``, ``use_cache`` and ``optimize``. The response holds
+everything the program printed, errors included, and its exit status.
+
+``--daemon`` sends the request of a file or ``-c`` code and prints the
+response. The program gets no input unless ``--stdin`` is given, which sends
+everything this process reads from its stdin (the whole stream is read before
+the request is sent, so it should end). Both sides use the socket named by
+``--socket``, the SOPLANG_SOCKET environment variable, or
+``$XDG_RUNTIME_DIR/soplang-<uid>.sock`` (``/tmp`` without XDG_RUNTIME_DIR).
+"""
+
+import io
+import json
+import os
+import signal
+import socket
+import sys
+
+from src.runtime.modules import SEARCH_PATH_VARIABLE
+
+SOCKET_VARIABLE = "SOPLANG_SOCKET"
+
+# Name of programs sent as source code, used in their error messages
+SOURCE_NAME = "<daemon>"
+
+
+def default_socket_path():
+    """Socket used when --socket is not given"""
+    path = os.environ.get(SOCKET_VARIABLE)
+    if path:
+        return path
+    directory = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return os.path.join(directory, f"soplang-{os.getuid()}.sock")
+
+
+# -----------------------------
+#  Protocol
+# -----------------------------
+def send_message(sock, message):
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def receive_message(sock):
+    """Read one line of JSON from ``sock``, raising ValueError if there is none"""
+    with sock.makefile("rb") as file:
+        line = file.readline()
+    if not line:
+        raise ValueError("connection closed before a message was received")
+    return json.loads(line)
+
+
+def run_request(request):
+    """Run the program of a request in this process, returning the response"""
+    from src.runtime.main import ENGINES, run_soplang_file
+
+    output = io.StringIO()
+    saved_streams = sys.stdin, sys.stdout
+    saved_cwd = os.getcwd()
+    saved_search_path = os.environ.get(SEARCH_PATH_VARIABLE)
+    sys.stdin = io.StringIO(request.get("stdin") or "")
+    sys.stdout = output
+    try:
+        engine = request.get("engine", "interpreter")
+        if engine not in ENGINES:
+            raise ValueError(f"unknown engine {engine!r}")
+        if request.get("path") is None and request.get("source") is None:
+            raise ValueError("a request needs a path or source")
+        if request.get("cwd"):
+            os.chdir(request["cwd"])
+        if request.get("search_path") is not None:
+            os.environ[SEARCH_PATH_VARIABLE] = request["search_path"]
+
+        status = run_soplang_file(
+            request.get("path") or SOURCE_NAME,
+            engine,
+            request.get("use_cache", True),
+            request.get("optimize", False),
+            source=request.get("source"),
+        )
+    except (OSError, ValueError) as e:
+        print(f"✗ Khalad: {e}")
+        status = 1
+    finally:
+        sys.stdin, sys.stdout = saved_streams
+        os.chdir(saved_cwd)
+        if saved_search_path is None:
+            os.environ.pop(SEARCH_PATH_VARIABLE, None)
+        else:
+            os.environ[SEARCH_PATH_VARIABLE] = saved_search_path
+    return {"stdout": output.getvalue(), "status": status}
+
+
+# -----------------------------
+#  Server
+# -----------------------------
+class Server:
+    def __init__(self, path=None, workers=None):
+        self.path = path or default_socket_path()
+        self.worker_count = workers or os.cpu_count() or 1
+        self.socket = None
+        self.workers = set()  # Process ids of the running workers
+        self.stopping = False
+
+    def serve(self):
+        """Listen on the socket and run the worker pool until stopped
+
+        Returns:
+            int: Exit status, 1 when the socket cannot be bound
+        """
+        # Import everything a request may need once, before forking, so that
+        # workers start warm and share these pages with the parent
+        import src.runtime.interpreter  # noqa: F401
+        import src.runtime.optimizer  # noqa: F401
+        import src.runtime.vm  # noqa: F401
+
+        try:
+            self.socket = self.listen()
+        except OSError as e:
+            # E.g. a stale socket file in /tmp that belongs to another user
+            print(f"✗ Khalad: cannot serve on {self.path} ({e})", file=sys.stderr)
+            return 1
+        signal.signal(signal.SIGTERM, self.terminate)
+        try:
+            for _ in range(self.worker_count):
+                self.spawn()
+            print(
+                f"Soplang: serving on {self.path} with {self.worker_count} workers",
+                file=sys.stderr,
+            )
+            while self.workers:
+                pid, _ = os.wait()
+                if pid in self.workers:
+                    self.workers.discard(pid)
+                    if not self.stopping:
+                        self.spawn()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+        return 0
+
+    def listen(self):
+        """Bind the Unix socket, replacing a socket file no server answers on"""
+        if os.path.exists(self.path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)
+            else:
+                raise OSError(f"a server is already running on {self.path}")
+            finally:
+                probe.close()
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.bind(self.path)
+        # Whoever can connect runs code as the server's user
+        os.chmod(self.path, 0o600)
+        sock.listen(128)
+        return sock
+
+    def spawn(self):
+        """Fork a worker process"""
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return
+
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            self.work()
+        except KeyboardInterrupt:
+            pass
+        except BaseException:
+            import traceback
+
+            traceback.print_exc()
+            status = 1
+        finally:
+            # Never return into the parent's code (or run its finally blocks)
+            os._exit(status)
+
+    def work(self):
+        """Answer requests until the process is stopped (in a worker)"""
+        while True:
+            connection, _ = self.socket.accept()
+            with connection:
+                self.handle(connection)
+
+    def handle(self, connection):
+        try:
+            request = receive_message(connection)
+        except (OSError, ValueError):
+            return
+        response = run_request(request)
+        try:
+            send_message(connection, response)
+        except OSError:
+            pass  # The client went away
+
+    def terminate(self, signum, frame):
+        raise KeyboardInterrupt
+
+    def close(self):
+        """Stop the workers and remove the socket"""
+        self.stopping = True
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in self.workers:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        self.workers.clear()
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+
+# -----------------------------
+#  Client
+# -----------------------------
+def send_request(request, path=None):
+    """Send a request to the server on ``path`` and return its response
+
+    Raises OSError when no server is listening.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path or default_socket_path())
+        send_message(sock, request)
+        return receive_message(sock)
+
+
+def run_on_daemon(
+    filename=None,
+    source=None,
+    path=None,
+    engine="interpreter",
+    use_cache=True,
+    optimize=False,
+    stdin="",
+):
+    """
+    Run a file or source code on a running server and print its output
+
+    Args:
+        filename (str): Soplang file to run, relative to the working directory
+        source (str): Code to run instead of a file
+        path (str): Socket of the server (default: default_socket_path())
+        stdin (str): Input of the program read by gelin (default: none)
+
+    Returns:
+        int: Exit status of the program, or 1 when no server is running
+    """
+    request = {
+        "cwd": os.getcwd(),
+        "search_path": os.environ.get(SEARCH_PATH_VARIABLE),
+        "stdin": stdin,
+        "engine": engine,
+        "use_cache": use_cache,
+        "optimize": optimize,
+    }
+    if source is not None:
+        request["source"] = source
+    else:
+        request["path"] = os.path.abspath(filename)
+
+    path = path or default_socket_path()
+    try:
+        response = send_request(request, path)
+    except (OSError, ValueError) as e:
+        print(f"✗ Khalad: no Soplang server on {path} ({e})", file=sys.stderr)
+        return 1
+    sys.stdout.write(response["stdout"])
+    return response["status"]
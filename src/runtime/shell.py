@@ -10,45 +10,52 @@ import cmd
 import glob
 import os
 import platform
-import re
 import sys
 import traceback
 from pathlib import Path
 
-from colorama import Fore, Style, init
-from prompt_toolkit.formatted_text import ANSI
-
-# Import readline conditionally - use it on Unix/Mac, but not on Windows
-if platform.system() != "Windows":
-    import readline
-else:
-    # On Windows, try to use prompt_toolkit as an alternative
-    try:
-        from prompt_toolkit import PromptSession
-        from prompt_toolkit.history import FileHistory
-
-        USE_PROMPT_TOOLKIT = True
-    except ImportError:
-        USE_PROMPT_TOOLKIT = False
-
-from src.core.lexer import Lexer, Token
+# readline, prompt_toolkit and colorama are only imported once an interactive
+# session starts (or, for colorama, on Windows), so that running files and -c
+# code through the shell's helpers stays fast to start
+from src.core.ast import NodeType, Program
+from src.core.lexer import Lexer
 from src.core.parser import Parser
 from src.core.tokens import TokenType
 from src.runtime.interpreter import Interpreter
-from src.utils.errors import (
-    ImportError,
-    LexerError,
-    ParserError,
-    RuntimeError,
-    SoplangError,
+from src.stdlib.builtins import SoplangBuiltins
+from src.utils.errors import LexerError, ParserError, SoplangError
+
+# Statements whose value the shell prints after running them (besides calls
+# of functions other than qor)
+ECHOED_NODE_TYPES = frozenset(
+    (
+        NodeType.IDENTIFIER,
+        NodeType.LITERAL,
+        NodeType.BINARY_OPERATION,
+        NodeType.LOGICAL_OPERATION,
+        NodeType.UNARY_OPERATION,
+        NodeType.LIST_LITERAL,
+        NodeType.OBJECT_LITERAL,
+        NodeType.PROPERTY_ACCESS,
+        NodeType.METHOD_CALL,
+        NodeType.INDEX_ACCESS,
+    )
+)
+
+# Tokens that open and close the blocks of a multi-line input
+OPENING_TOKENS = frozenset(
+    (TokenType.LEFT_BRACE, TokenType.LEFT_BRACKET, TokenType.LEFT_PAREN)
+)
+CLOSING_TOKENS = frozenset(
+    (TokenType.RIGHT_BRACE, TokenType.RIGHT_BRACKET, TokenType.RIGHT_PAREN)
 )
 
 
 class SoplangShell:
     def __init__(self):
-        self.interpreter = Interpreter()
+        self.interpreter = self.new_interpreter()
         self.history_file = os.path.expanduser("~/.soplang_history")
-        self.setup_history()
+        self.prompt_session = None  # prompt_toolkit session, on Windows
         self.multiline_input = []
         self.commands = {
             "help": self.show_help,
@@ -66,12 +73,12 @@ class SoplangShell:
         self.in_multiline_mode = False
         self.last_examples_list = []
 
-        # Initialize colorama for proper Windows console color support
-        init(autoreset=True)
+        # Initialize colorama for proper Windows console color support (other
+        # terminals understand the escape codes without it)
+        if platform.system() == "Windows":
+            from colorama import init
 
-        # Initialize prompt_toolkit if we're using it
-        if platform.system() == "Windows" and USE_PROMPT_TOOLKIT:
-            self.prompt_session = PromptSession(history=FileHistory(self.history_file))
+            init(autoreset=True)
 
     def setup_history(self):
         """Set up command history persistence"""
@@ -82,6 +89,8 @@ class SoplangShell:
 
         # Only use readline on non-Windows platforms
         if platform.system() != "Windows":
+            import readline
+
             # Read history file
             try:
                 readline.read_history_file(self.history_file)
@@ -93,39 +102,39 @@ class SoplangShell:
 
             # Save history on exit
             atexit.register(readline.write_history_file, self.history_file)
+        else:
+            # On Windows, try to use prompt_toolkit as an alternative
+            try:
+                from prompt_toolkit import PromptSession
+                from prompt_toolkit.history import FileHistory
+            except ImportError:
+                return
+            self.prompt_session = PromptSession(history=FileHistory(self.history_file))
 
     def run(self):
         """Start the interactive shell"""
+        self.setup_history()
         self.print_welcome()
 
         while True:
             try:
                 # Determine the appropriate prompt text
                 if self.in_multiline_mode:
-                    if platform.system() == "Windows" and not USE_PROMPT_TOOLKIT:
-                        # Simple prompt for Windows without prompt_toolkit
-                        prompt_text = "... "
-                    else:
-                        # Colorized prompt for other platforms or with prompt_toolkit
-                        prompt_text = "\033[1;33m... \033[0m"
+                    prompt_text = self.continuation_prompt()
                 else:
-                    if platform.system() == "Windows" and not USE_PROMPT_TOOLKIT:
+                    if platform.system() == "Windows" and self.prompt_session is None:
                         # Simple prompt for Windows without prompt_toolkit
                         prompt_text = "\nsoplang> "
                     else:
                         # Colorized prompt for other platforms or with prompt_toolkit
                         if platform.system() == "Windows":
+                            from prompt_toolkit.formatted_text import ANSI
+
                             prompt_text = ANSI("\n\x1b[36m\x1b[1msoplang>\x1b[0m ")
                         else:
                             prompt_text = "\n\033[1;36msoplang>\033[0m "
 
-                # Get user input with the appropriate input method
-                if platform.system() == "Windows" and USE_PROMPT_TOOLKIT:
-                    # Use prompt_toolkit on Windows
-                    user_input = self.prompt_session.prompt(prompt_text)
-                else:
-                    # Use standard input on other platforms
-                    user_input = input(prompt_text)
+                user_input = self.read_line(prompt_text)
 
                 # Skip empty lines
                 if not user_input.strip():
@@ -156,8 +165,12 @@ class SoplangShell:
                     self.process_command(command)
                     continue
 
-                # Process Soplang code
-                self.execute_code(user_input)
+                # Process Soplang code, reading more lines until every block
+                # opened on the first one is closed
+                code = user_input
+                while self.needs_more_input(code):
+                    code += "\n" + self.read_line(self.continuation_prompt())
+                self.execute_code(code)
 
             except KeyboardInterrupt:
                 print("\nUse :exit or :quit to exit the shell, or press Ctrl+D")
@@ -169,532 +182,106 @@ class SoplangShell:
                 print("\nExiting Soplang shell...")
                 break
 
+    def continuation_prompt(self):
+        """Prompt of the lines continuing a multi-line input"""
+        if platform.system() == "Windows" and self.prompt_session is None:
+            # Simple prompt for Windows without prompt_toolkit
+            return "... "
+        # Colorized prompt for other platforms or with prompt_toolkit
+        return "\033[1;33m... \033[0m"
+
+    def read_line(self, prompt_text):
+        """Read a line with the appropriate input method"""
+        if self.prompt_session is not None:
+            # Use prompt_toolkit on Windows
+            return self.prompt_session.prompt(prompt_text)
+        # Use standard input on other platforms
+        return input(prompt_text)
+
+    def new_interpreter(self):
+        """Interpreter for shell input
+
+        Its Resolver is not strict, so a function may refer to a global that
+        a later input defines (see resolver.py).
+        """
+        interpreter = Interpreter()
+        interpreter.resolver.strict = False
+        return interpreter
+
     def execute_code(self, code):
-        """Execute Soplang code snippet using special shell handling"""
-        original_code = code
-        code = code.strip()
+        """Lex, parse and run a snippet on the shell's interpreter
 
-        # Skip empty lines and comments
-        if not code or code.startswith("//"):
+        Variables, functions and classes defined by the snippet stay defined
+        for the next one. When the snippet is a single expression (other than
+        a qor call), its value is echoed.
+        """
+        if not code.strip():
             return
 
-        # Format the code first for better handling
-        code = self._format_code(code)
-
+        interpreter = self.interpreter
         try:
-            # DIRECT EXECUTION OF COMMON PATTERNS
-            # This bypasses the normal parser for better interactive experience
-
-            # Case 1: Print statements (qor)
-            if code.startswith("qor"):
-                # Extract the content to print (remove the trailing semicolon if present)
-                code_without_semicolon = code[:-1] if code.endswith(";") else code
-                match = re.search(
-                    r'qor\s*\(\s*["\'](.*?)[\'"]\s*\)', code_without_semicolon
-                )
-                if match:
-                    # Direct execution of print
-                    print(match.group(1))
-                    return
-
-                # Handle print with variable or expression
-                match = re.search(r"qor\s*\(\s*(.*?)\s*\)", code_without_semicolon)
-                if match:
-                    expr = match.group(1)
-
-                    # Handle simple arithmetic with + operator
-                    if "+" in expr and not any(c in expr for c in "\"'"):
-                        try:
-                            # Check if we're dealing with numeric variables
-                            parts = expr.split("+")
-                            total = 0
-                            for part in parts:
-                                part = part.strip()
-                                if part in self.interpreter.variables:
-                                    # Get the variable value
-                                    value = self.interpreter.variables[part]
-                                    if isinstance(value, (int, float)):
-                                        total += value
-                                    else:
-                                        # Not numeric, switch to string concatenation
-                                        raise ValueError("Non-numeric value")
-                                else:
-                                    # Try parsing as a number
-                                    try:
-                                        total += float(part)
-                                    except ValueError:
-                                        # Not a number, switch to string concatenation
-                                        raise ValueError("Not a number")
-
-                            # If we got here, all parts were numeric
-                            print(total)
-                            return
-                        except ValueError:
-                            # Fall back to string concatenation
-                            pass
-
-                    # Handle string concatenation with + operator
-                    if "+" in expr:
-                        parts = expr.split("+")
-                        result = ""
-                        for part in parts:
-                            part = part.strip()
-                            # Check if it's a variable
-                            if part in self.interpreter.variables:
-                                value = self.interpreter.variables[part]
-                                result += str(value)
-                            # Check if it's a string literal
-                            elif (part.startswith('"') and part.endswith('"')) or (
-                                part.startswith("'") and part.endswith("'")
-                            ):
-                                result += part[1:-1]
-                            # Check if it's a function call like qoraal()
-                            elif part.startswith("qoraal(") and part.endswith(")"):
-                                var_name = part[len("qoraal(") : -1].strip()
-                                if var_name in self.interpreter.variables:
-                                    value = str(self.interpreter.variables[var_name])
-                                    result += value
-                            else:
-                                # Try as a raw value
-                                result += part
-
-                        print(result)
-                        return
-
-                    # Handle direct variable access
-                    if expr in self.interpreter.variables:
-                        print(self.interpreter.variables[expr])
-                        return
-
-                    # Try evaluating as a simple numeric expression
-                    try:
-                        # Replace variable names with their values
-                        eval_expr = expr
-                        for var_name, var_value in self.interpreter.variables.items():
-                            if (
-                                isinstance(var_value, (int, float))
-                                and var_name in eval_expr
-                            ):
-                                eval_expr = eval_expr.replace(var_name, str(var_value))
-
-                        # Evaluate the expression if it looks safe
-                        if all(c in "0123456789+-*/() " for c in eval_expr):
-                            result = eval(eval_expr)
-                            print(result)
-                            return
-                    except:
-                        # If evaluation fails, continue with other methods
-                        pass
-
-            # Case 2: Variable declaration with door (dynamic typing)
-            if code.startswith("door "):
-                # Remove semicolon for regex processing if present
-                code_without_semicolon = code[:-1] if code.endswith(";") else code
-                # Match pattern: door name = value
-                match = re.search(r"door\s+(\w+)\s*=\s*(.+)", code_without_semicolon)
-                if match:
-                    var_name = match.group(1)
-                    var_value = match.group(2).strip()
-
-                    # Handle string values
-                    if (var_value.startswith('"') and var_value.endswith('"')) or (
-                        var_value.startswith("'") and var_value.endswith("'")
-                    ):
-                        try:
-                            # Extract the actual string value
-                            string_value = var_value[1:-1]
-                            # Assign it directly to the interpreter's variables
-                            self.interpreter.variables[var_name] = string_value
-                            print(f'\033[32m=> {var_name} = "{string_value}"\033[0m')
-                            return
-                        except Exception as e:
-                            # Create a proper Soplang error for any issues
-                            from src.utils.errors import RuntimeError
-
-                            error = RuntimeError(f"Khalad fulinta: {str(e)}")
-                            print(f"\033[31m{error.message}\033[0m")
-                            return
-
-                    # Handle numeric values
-                    try:
-                        if "." in var_value:
-                            self.interpreter.variables[var_name] = float(var_value)
-                        else:
-                            self.interpreter.variables[var_name] = int(var_value)
-                        print(
-                            f"\033[32m=> {var_name} = {self.interpreter.variables[var_name]}\033[0m"
-                        )
-                        return
-                    except ValueError:
-                        # Check if it's a variable reference
-                        if var_value in self.interpreter.variables:
-                            self.interpreter.variables[var_name] = (
-                                self.interpreter.variables[var_value]
-                            )
-                            print(
-                                f"\033[32m=> {var_name} = {self.interpreter.variables[var_name]}\033[0m"
-                            )
-                            return
-
-                        # Try evaluating as a simple numeric expression
-                        try:
-                            # Replace variable names with their values
-                            eval_expr = var_value
-                            for vname, vvalue in self.interpreter.variables.items():
-                                if (
-                                    isinstance(vvalue, (int, float))
-                                    and vname in eval_expr
-                                ):
-                                    eval_expr = eval_expr.replace(vname, str(vvalue))
-
-                            # Evaluate the expression if it looks safe
-                            if all(c in "0123456789+-*/() " for c in eval_expr):
-                                result = eval(eval_expr)
-                                self.interpreter.variables[var_name] = result
-                                print(f"\033[32m=> {var_name} = {result}\033[0m")
-                                return
-                        except:
-                            # If evaluation fails, continue with other methods
-                            pass
-
-            # Case 3: Static typing (abn, qoraal)
-            if code.startswith("abn ") or code.startswith("qoraal "):
-                # Remove semicolon for regex processing if present
-                code_without_semicolon = code[:-1] if code.endswith(";") else code
-                type_name = code_without_semicolon.split(" ")[0]  # abn or qoraal
-                # Match pattern: type name = value
-                match = re.search(
-                    rf"{type_name}\s+(\w+)\s*=\s*(.+)", code_without_semicolon
+            program = self.parse_input(code)
+            if not program.children:
+                return  # Only comments
+
+            last = program.children[-1]
+            if len(program.children) == 1 and self.is_echoed(last):
+                # Resolve and optimize like Interpreter.interpret, but keep the value
+                interpreter.resolver.resolve(program, interpreter.globals)
+                if interpreter.optimizer is not None:
+                    interpreter.optimizer.optimize(program)
+                value = interpreter.compiler.compile_expression(program.children[0])(
+                    interpreter
                 )
-                if match:
-                    var_name = match.group(1)
-                    var_value = match.group(2).strip()
-
-                    if type_name == "abn":
-                        try:
-                            # Try direct number conversion
-                            self.interpreter.variables[var_name] = int(var_value)
-                            self.interpreter.variable_types[var_name] = "abn"
-                            print(
-                                f"\033[32m=> {var_name} = {self.interpreter.variables[var_name]} (abn)\033[0m"
-                            )
-                            return
-                        except ValueError:
-                            # Try numeric expression
-                            try:
-                                # Replace variable names with their values
-                                eval_expr = var_value
-                                for vname, vvalue in self.interpreter.variables.items():
-                                    if (
-                                        isinstance(vvalue, (int, float))
-                                        and vname in eval_expr
-                                    ):
-                                        eval_expr = eval_expr.replace(
-                                            vname, str(vvalue)
-                                        )
-
-                                # Evaluate the expression if it looks safe
-                                if all(c in "0123456789+-*/() " for c in eval_expr):
-                                    result = int(eval(eval_expr))
-                                    self.interpreter.variables[var_name] = result
-                                    self.interpreter.variable_types[var_name] = "abn"
-                                    print(
-                                        f"\033[32m=> {var_name} = {result} (abn)\033[0m"
-                                    )
-                                    return
-                            except:
-                                pass
-
-                            # Use the exact error format from errors.py
-                            from src.utils.errors import TypeError
-
-                            error = TypeError(
-                                "type_mismatch",
-                                var_name=var_name,
-                                expected_type="abn",
-                                value=var_value,
-                            )
-                            print(f"\033[31m{error.message}\033[0m")
-                            return
-
-                    elif type_name == "qoraal":
-                        if (var_value.startswith('"') and var_value.endswith('"')) or (
-                            var_value.startswith("'") and var_value.endswith("'")
-                        ):
-                            self.interpreter.variables[var_name] = var_value[1:-1]
-                            self.interpreter.variable_types[var_name] = "qoraal"
-                            print(
-                                f'\033[32m=> {var_name} = "{self.interpreter.variables[var_name]}" (qoraal)\033[0m'
-                            )
-                            return
-                        else:
-                            # Use the exact error format from errors.py
-                            from src.utils.errors import TypeError
-
-                            error = TypeError(
-                                "type_mismatch",
-                                var_name=var_name,
-                                expected_type="qoraal",
-                                value=var_value,
-                            )
-                            print(f"\033[31m{error.message}\033[0m")
-                            return
-
-            # Case 4: Direct expression evaluation (calculator mode)
-            if all(c in "0123456789+-*/() " for c in code.rstrip(";")):
-                # Remove semicolon for eval if present
-                code_without_semicolon = code[:-1] if code.endswith(";") else code
-                try:
-                    result = eval(code_without_semicolon)
-                    print(f"\033[32m=> {result}\033[0m")
-                    return
-                except:
-                    pass
-
-            # If we got here, fall back to using the main.py to handle the input
-            print("\033[33m// Using main interpreter...\033[0m")
-
-            # Create a temporary file for the code
-            import tempfile
-
-            with tempfile.NamedTemporaryFile(suffix=".so", delete=False) as f:
-                temp_filename = f.name
-                f.write(original_code.encode("utf-8"))
-
-            try:
-                # Run the code with main.py
-                main_path = os.path.join(
-                    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
-                    "main.py",
-                )
-
-                # Check if main.py exists before trying to run it
-                if not os.path.exists(main_path):
-                    # Use Soplang's ParserError
-                    from src.utils.errors import ParserError
-
-                    # Create a proper Soplang parser error
-                    error = ParserError(
-                        "invalid_syntax", detail="Qoraalka syntax-kiisa waa khalad"
-                    )
-                    print(f"\033[31m{error.message}\033[0m")
-                    return
-
-                # Use subprocess instead of os.system to capture output and errors
-                import subprocess
-
-                try:
-                    # Use a modified Python PATH so main.py can find its imports
-                    env = os.environ.copy()
-                    env["PYTHONPATH"] = os.path.dirname(
-                        os.path.dirname(os.path.abspath(__file__))
-                    )
-
-                    # Run the command and capture output
-                    process = subprocess.run(
-                        ["python", main_path, temp_filename],
-                        env=env,
-                        capture_output=True,
-                        text=True,
-                        check=False,
-                    )
-
-                    # Print stdout if available
-                    if process.stdout:
-                        print(process.stdout)
-
-                    # Handle error gracefully using Soplang's error system
-                    if process.returncode != 0:
-                        from src.utils.errors import (
-                            ParserError,
-                            RuntimeError,
-                            SoplangError,
-                            TypeError,
-                        )
-
-                        stderr = process.stderr
-                        # Try to extract the actual Soplang error message if it exists
-                        if "Khalad" in stderr:
-                            # Find the error message which starts with "Khalad"
-                            for line in stderr.split("\n"):
-                                if line.strip().startswith("Khalad") or "❌" in line:
-                                    print(f"\033[31m{line.strip()}\033[0m")
-                                    return
-
-                        # If we couldn't find a Soplang error, create an appropriate one using the ErrorMessageManager
-                        if "ModuleNotFoundError" in stderr or "ImportError" in stderr:
-                            from src.utils.errors import (
-                                ErrorMessageManager,
-                                ImportError,
-                            )
-
-                            error_msg = ErrorMessageManager.get_import_error(
-                                "import_error",
-                                filename=temp_filename,
-                                error="Module not found",
-                            )
-                            print(f"\033[31m{error_msg}\033[0m")
-                        elif "FileNotFoundError" in stderr:
-                            from src.utils.errors import (
-                                ErrorMessageManager,
-                                ImportError,
-                            )
-
-                            error_msg = ErrorMessageManager.get_import_error(
-                                "file_not_found", module=temp_filename
-                            )
-                            print(f"\033[31m{error_msg}\033[0m")
-                        elif "SyntaxError" in stderr or "unexpected token" in stderr:
-                            from src.utils.errors import (
-                                ErrorMessageManager,
-                                ParserError,
-                            )
-
-                            error_msg = ErrorMessageManager.get_parser_error(
-                                "invalid_syntax",
-                                detail="Khalad syntax ah ama qeexis khalad ah",
-                            )
-                            print(f"\033[31m{error_msg}\033[0m")
-                        elif "TypeError" in stderr:
-                            from src.utils.errors import ErrorMessageManager, TypeError
-
-                            error_msg = ErrorMessageManager.get_type_error(
-                                "invalid_operand", operator="?", type_name="?"
-                            )
-                            print(f"\033[31m{error_msg}\033[0m")
-                        elif "NameError" in stderr:
-                            # Try to extract the variable name from the NameError message
-                            from src.utils.errors import (
-                                ErrorMessageManager,
-                                RuntimeError,
-                            )
-
-                            var_match = re.search(
-                                r"name '([^']+)' is not defined", stderr
-                            )
-                            var_name = var_match.group(1) if var_match else "?"
-                            error_msg = ErrorMessageManager.get_runtime_error(
-                                "undefined_variable", name=var_name
-                            )
-                            print(f"\033[31m{error_msg}\033[0m")
-                        else:
-                            from src.utils.errors import (
-                                ErrorMessageManager,
-                                RuntimeError,
-                            )
-
-                            error_msg = ErrorMessageManager.get_runtime_error(
-                                "Khalad fulinta: Qalad aan la aqoonsan"
-                            )
-                            print(f"\033[31m{error_msg}\033[0m")
-
-                except subprocess.SubprocessError:
-                    from src.utils.errors import ErrorMessageManager, RuntimeError
-
-                    error_msg = ErrorMessageManager.get_runtime_error(
-                        "Khalad fulinta: Ma awoodin inaan koodka fuliyo"
-                    )
-                    print(f"\033[31m{error_msg}\033[0m")
-
-            finally:
-                # Clean up the temporary file
-                try:
-                    os.unlink(temp_filename)
-                except:
-                    pass
-
-        except Exception as e:
-            # Convert Python exception to Soplang error using ErrorMessageManager
-            from src.utils.errors import ErrorMessageManager, RuntimeError, SoplangError
-
-            # If it's already a SoplangError, use its message
-            if isinstance(e, SoplangError):
-                print(f"\033[31m{e.message}\033[0m")
+                if value is not None:
+                    print(f"\033[32m=> {SoplangBuiltins.qoraal(value)}\033[0m")
             else:
-                # Try to determine the type of error
-                error_msg = str(e)
-                if "name" in error_msg and "is not defined" in error_msg:
-                    # Extract the variable name from error like "'x' is not defined"
-                    match = re.search(r"'([^']+)'", error_msg)
-                    var_name = match.group(1) if match else "?"
-                    error_msg = ErrorMessageManager.get_runtime_error(
-                        "undefined_variable", name=var_name
-                    )
-                    print(f"\033[31m{error_msg}\033[0m")
-                elif "division by zero" in error_msg:
-                    error_msg = ErrorMessageManager.get_runtime_error(
-                        "division_by_zero"
-                    )
-                    print(f"\033[31m{error_msg}\033[0m")
-                elif "index" in error_msg and "out of range" in error_msg:
-                    error_msg = ErrorMessageManager.get_runtime_error(
-                        "index_out_of_range", index="?"
-                    )
-                    print(f"\033[31m{error_msg}\033[0m")
-                elif (
-                    "local variable" in error_msg
-                    and "not associated with a value" in error_msg
-                ):
-                    # This indicates an issue with module scope/imports
-                    error_msg = ErrorMessageManager.get_runtime_error(
-                        "Khalad fulinta: Modul qeexis ayaa khaladan"
-                    )
-                    print(f"\033[31m{error_msg}\033[0m")
-                else:
-                    # Remove internal implementation details - sanitize the error message
-                    # Replace Python-specific parts with Soplang-friendly errors
-                    sanitized_error = error_msg
-
-                    # Replace Python module paths
-                    sanitized_error = re.sub(
-                        r'File ".*?", line \d+, in .*?\n', "", sanitized_error
-                    )
-
-                    # Replace Python class names
-                    sanitized_error = re.sub(r"<class \'.*?\'>", "", sanitized_error)
+                interpreter.interpret(program)
 
-                    # Replace memory addresses
-                    sanitized_error = re.sub(r"at 0x[0-9a-f]+", "", sanitized_error)
-
-                    # Use a simpler error message if it's excessively technical
-                    if len(sanitized_error) > 100 or "Traceback" in sanitized_error:
-                        sanitized_error = "Khalad fulinta oo aan la aqoonsan"
-
-                    # Generic runtime error with sanitized message using ErrorMessageManager
-                    error_msg = ErrorMessageManager.get_runtime_error(
-                        f"Khalad fulinta: {sanitized_error}"
-                    )
-                    print(f"\033[31m{error_msg}\033[0m")
-
-            # Provide helpful hint for using alternatives
-            print(
-                "\033[33m// Hint: Try :multiline mode for complex code or :run to run a file\033[0m"
-            )
-
-    def _format_code(self, code, silent=True):
-        """Format code for better interactive use"""
-        code = code.strip()
-
-        # Handle common Soplang syntax issues in interactive mode
-        if code.startswith("qor"):
-            # Fix qor with missing parentheses
-            if "(" not in code and ('"' in code or "'" in code):
-                match = re.search(r'qor\s*["\'](.+?)["\']', code)
-                if match:
-                    string_content = match.group(1)
-                    code = f'qor("{string_content}")'
+        except SoplangError as e:
+            print(f"\033[31m{e}\033[0m")
+        except Exception as e:
+            # Imported here to keep the shell's start-up light
+            from src.runtime.main import convert_python_error
 
-        # Fix variable declarations with bad spacing
-        if any(code.startswith(prefix) for prefix in ["door ", "abn ", "qoraal "]):
-            if "=" in code and " = " not in code:
-                code = re.sub(r"=", " = ", code, 1)
+            print(f"\033[31m{convert_python_error(e)}\033[0m")
 
-        # We no longer automatically add semicolons since we properly check for them
-        # and show Soplang errors if they're missing
+    def parse_input(self, code):
+        """Parse a snippet as statements, or else as a single expression"""
+        try:
+            return Parser(Lexer(code + "\n").iter_tokens()).parse()
+        except ParserError as error:
+            statement_error = error
 
-        if not silent:
-            print(f"\033[90m// Processing: {code}\033[0m")
-        return code
+        # Expressions such as ``2 + 3`` are not statements, but are worth
+        # evaluating in the shell
+        parser = Parser(Lexer(code + "\n").iter_tokens())
+        try:
+            expression = parser.parse_logical_expression()
+        except ParserError:
+            raise statement_error
+        if parser.current_token.type != TokenType.EOF:
+            raise statement_error
+        return Program(children=[expression])
+
+    def is_echoed(self, node):
+        """Whether the value of a statement is printed after it runs"""
+        if node.type == NodeType.FUNCTION_CALL:
+            return node.value != "qor"
+        return node.type in ECHOED_NODE_TYPES
+
+    def needs_more_input(self, code):
+        """Whether ``code`` has unclosed braces, brackets or parentheses"""
+        depth = 0
+        try:
+            for token in Lexer(code + "\n").iter_tokens():
+                if token.type in OPENING_TOKENS:
+                    depth += 1
+                elif token.type in CLOSING_TOKENS:
+                    depth -= 1
+        except LexerError:
+            return False  # Reported when the code is executed
+        return depth > 0
 
     def process_command(self, command):
         """Process shell commands"""
@@ -728,7 +315,8 @@ class SoplangShell:
         print("  :multiline        - Toggle multiline input mode (end with :end)")
         print("\n\033[1mInteractive Mode:\033[0m")
         print("  - Enter Soplang code directly for immediate execution")
-        print("  - Multi-line input is supported with :multiline")
+        print("  - Lines with an unclosed { [ or ( continue on the next line")
+        print("  - Multi-line input is also supported with :multiline")
         print("  - Use Up/Down arrows to navigate command history")
         print("  - Simple expressions are automatically evaluated")
         print("\n\033[1mKeyboard Shortcuts:\033[0m")
@@ -764,7 +352,14 @@ class SoplangShell:
         except Exception as e:
             print(f"\033[31mError loading file: {e}\033[0m")
 
-    def run_file(self, filename):
+    def run_file(
+        self,
+        filename,
+        engine="interpreter",
+        use_cache=True,
+        optimize=False,
+        profiler=None,
+    ):
         """Run a Soplang file"""
         if not filename:
             print("\033[31mFilename required. Usage: :run filename\033[0m")
@@ -776,7 +371,7 @@ class SoplangShell:
 
             # Call the function that properly tokenizes, parses, and interprets the file
             # The run_soplang_file function now handles all output formatting
-            run_soplang_file(filename)
+            run_soplang_file(filename, engine, use_cache, optimize, profiler)
 
         except FileNotFoundError:
             print(f"\033[31mFile not found: {filename}\033[0m")
@@ -847,6 +442,8 @@ class SoplangShell:
 
     def print_welcome(self):
         """Print welcome message"""
+        from colorama import Fore, Style
+
         # Use colorama constants for better Windows compatibility
         print("")
         print(f"{Fore.BLUE}{Style.BRIGHT}" + "=" * 50 + f"{Style.RESET_ALL}")
@@ -877,7 +474,7 @@ class SoplangShell:
 
     def reset_interpreter(self, args):
         """Reset the interpreter to clear all variables and state"""
-        self.interpreter = Interpreter()
+        self.interpreter = self.new_interpreter()
         print("\n\033[1mInterpreter reset.\033[0m All variables and state cleared.")
 
     def show_variables(self, args):
@@ -0,0 +1,57 @@
+"""
+Soplang Static Types
+====================
+
+Infers the static type (``abn``, ``qoraal`` or ``bool``) that an expression
+is expected to have while it is compiled, so the compilers can bind
+type-specialised operators (see operators.specialized_operator).
+
+The types come from literals and from the variables declared with ``abn``,
+``qoraal`` or ``bool``. A name is only given a type while every declaration
+of it that was compiled so far agrees on one; a ``door`` declaration, a
+parameter or an import leaves it untyped. The inferred types are hints and
+never change what a program does: the specialised operators check their
+operands and fall back to the generic implementation.
+"""
+
+from src.core.ast import NodeType
+from src.core.tokens import TokenType
+from src.runtime.operators import STATIC_TYPE_CLASSES, static_type_of
+
+BOOLEAN_OPERATORS = ("==", "!=", ">", "<", ">=", "<=", "&&", "||")
+ARITHMETIC_OPERATORS = ("+", "-", "*", "/", "%")
+
+
+class StaticTypes:
+    def __init__(self):
+        self.variables = {}  # Name -> static type, or None once it conflicts
+
+    def declare(self, name, var_type):
+        """Record a declaration of ``name`` (``var_type`` is None for door)"""
+        if var_type not in STATIC_TYPE_CLASSES:
+            var_type = None
+        if self.variables.get(name, var_type) != var_type:
+            var_type = None
+        self.variables[name] = var_type
+
+    def of(self, node):
+        """Static type of the expression ``node``, or None when unknown"""
+        node_type = node.type
+        if node_type == NodeType.LITERAL:
+            return None if node.children else static_type_of(node.value)
+        if node_type == NodeType.IDENTIFIER:
+            return self.variables.get(node.value)
+        if node_type == NodeType.BINARY_OPERATION:
+            op = node.value
+            if op in BOOLEAN_OPERATORS:
+                return TokenType.BOOL
+            left, right = self.of(node.left), self.of(node.right)
+            if op == "+" and TokenType.QORAAL in (left, right):
+                return TokenType.QORAAL
+            if op in ARITHMETIC_OPERATORS:
+                if left == right == TokenType.abn:
+                    return TokenType.abn
+            return None
+        if node_type in (NodeType.LOGICAL_OPERATION, NodeType.UNARY_OPERATION):
+            return TokenType.BOOL
+        return None
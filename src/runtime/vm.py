@@ -0,0 +1,728 @@
+"""
+Soplang Virtual Machine
+=======================
+
+A stack based virtual machine running the bytecode produced by the
+BytecodeCompiler (see bytecode.py). It is an alternative to the closure based
+tree-walking Interpreter and is selected with ``main.py --engine=vm``.
+
+Calling a user function pushes a new Frame and returning pops it, all inside
+the same dispatch loop: neither uses Python recursion nor exceptions. Loops
+and ``haddii`` are plain jumps, ``isku_day`` blocks register a handler on the
+frame, and a Python exception raised while running is delivered to the
+innermost handler of the nearest frame that has one.
+
+The VirtualMachine reuses the Interpreter for everything that is not about
+executing code: built-in functions and methods, type validation, classes and
+imports.
+"""
+
+import sys
+
+from src.core.ast import NodeType
+from src.runtime.bytecode import (
+    BINARY_OP,
+    BINARY_OP_CONST,
+    BUILD_LIST,
+    BUILD_OBJECT,
+    CALL_DOTTED,
+    CALL_FUNCTION,
+    CALL_METHOD,
+    CLASS_DEFINITION,
+    DECLARE,
+    DECLARE_FAST,
+    DEFINE_FUNCTION,
+    DUP_TOP,
+    FOR_END,
+    FOR_ITER,
+    FOR_PREP,
+    FOR_STEP,
+    IMPORT,
+    JUMP,
+    JUMP_IF_FALSE_OR_POP,
+    JUMP_IF_TRUE_OR_POP,
+    LOAD_CONST,
+    LOAD_FAST,
+    LOAD_FUNCTION_REF,
+    LOAD_INDEX,
+    LOAD_NAME,
+    LOAD_PROPERTY,
+    POP_JUMP_IF_FALSE,
+    POP_TOP,
+    POP_TRY,
+    RAISE,
+    RETURN_VALUE,
+    SET_FAST,
+    SET_NAME,
+    SETUP_TRY,
+    STORE_FAST,
+    STORE_INDEX,
+    STORE_NAME,
+    STORE_PROPERTY,
+    TO_BOOL,
+    UNARY_NOT,
+    BytecodeCompiler,
+)
+from src.runtime.compiler import check_index
+from src.runtime.environment import UNSET
+from src.runtime.interpreter import Interpreter
+from src.runtime.method_cache import UNRESOLVED
+from src.runtime.operators import STATIC_TYPE_CLASSES
+from src.stdlib.builtins import SoplangBuiltins
+from src.stdlib.containers import NumericList, StringBuilder
+from src.utils.errors import RuntimeError, TypeError
+
+
+class Frame:
+    """The execution state of a code object
+
+    A function frame is also the scope of the call: its parameters and locals
+    live in ``fast`` (indexed by slot) and any other name it declares in
+    ``values``. Names that are not found continue through ``parent``, the
+    scope the function was defined in. Module code runs in the scope given as
+    ``scope`` instead.
+    """
+
+    __slots__ = (
+        "code",
+        "fast",
+        "values",
+        "types",
+        "constants",
+        "parent",
+        "scope",
+        "stack",
+        "handlers",
+        "back",
+        "pc",
+        "depth",
+    )
+
+    def __init__(self, code, parent, back=None):
+        self.code = code
+        self.fast = [UNSET] * code.nlocals  # Local slots
+        self.values = None  # Declared names without a slot (created when needed)
+        self.types = None  # Variable name -> declared static type
+        self.constants = None  # Names declared with madoor
+        self.parent = parent  # Enclosing scope
+        self.scope = self  # Scope used by the *_NAME instructions
+        self.stack = []  # Operand stack
+        self.handlers = None  # Active isku_day handlers: (target, stack depth)
+        self.back = back  # Calling frame
+        self.pc = 0  # Next instruction, saved while calling another frame
+        self.depth = 0 if back is None else back.depth + 1
+
+    def define(self, name, value, var_type=None, is_constant=False):
+        """Declare a variable in this scope, shadowing any outer variable"""
+        self.set(name, value)
+
+        if var_type is not None:
+            if self.types is None:
+                self.types = {}
+            self.types[name] = var_type
+        elif self.types is not None:
+            self.types.pop(name, None)
+
+        if is_constant:
+            if self.constants is None:
+                self.constants = set()
+            self.constants.add(name)
+        elif self.constants is not None:
+            self.constants.discard(name)
+
+        return value
+
+    def set(self, name, value):
+        """Store a variable of this scope without any check"""
+        slot = self.code.slots.get(name)
+        if slot is not None:
+            self.fast[slot] = value
+        else:
+            if self.values is None:
+                self.values = {}
+            self.values[name] = value
+
+    def declares(self, name):
+        """Whether ``name`` is currently declared in this scope"""
+        slot = self.code.slots.get(name)
+        if slot is not None and self.fast[slot] is not UNSET:
+            return True
+        return self.values is not None and name in self.values
+
+    def find(self, name):
+        """Return the nearest scope that declares ``name``, or None"""
+        if self.declares(name):
+            return self
+        return self.parent.find(name) if self.parent is not None else None
+
+    def lookup(self, name):
+        """Return the value of ``name``, raising KeyError if it is undefined"""
+        slot = self.code.slots.get(name)
+        if slot is not None:
+            value = self.fast[slot]
+            if value is not UNSET:
+                return value
+        values = self.values
+        if values is not None and name in values:
+            return values[name]
+        if self.parent is None:
+            raise KeyError(name)
+        return self.parent.lookup(name)
+
+    def __contains__(self, name):
+        return self.find(name) is not None
+
+
+class VirtualMachine(Interpreter):
+    def __init__(self):
+        super().__init__()
+        self.bytecode_compiler = BytecodeCompiler()
+        # Soplang calls do not use the Python stack, so limit them separately
+        self.max_depth = sys.getrecursionlimit()
+
+    def interpret(self, root):
+        if root.type != NodeType.PROGRAM:
+            raise RuntimeError("invalid_syntax", detail="Root node must be PROGRAM")
+        # Report undefined names and madoor reassignments before running
+        self.resolver.resolve(root, self.globals)
+        if self.optimizer is not None:
+            self.optimizer.optimize(root)
+        self.run_program(root)
+
+    def run_program(self, root):
+        """Run a PROGRAM node that has already been resolved (and optimized)"""
+        code = self.bytecode_compiler.compile_module(root.children)
+        try:
+            self.run_code(code, self.globals)
+        finally:
+            self.output.flush()
+
+    def execute(self, node):
+        """Execute a statement node in the current scope"""
+        code = self.bytecode_compiler.compile_module([node])
+        return self.run_code(code, self.environment)
+
+    def evaluate(self, node):
+        """Evaluate an expression node in the current scope"""
+        code = self.bytecode_compiler.compile_expression_code(node)
+        return self.run_code(code, self.environment)
+
+    def run_code(self, code, scope):
+        """Run module code with ``scope`` as its scope"""
+        frame = Frame(code, None)
+        frame.scope = scope
+        return self.run_frame(frame)
+
+    def call_user_function(self, user_func, args, line=None):
+        """Call a user-defined (Soplang) function with already evaluated arguments"""
+        return self.run_frame(self.function_frame(user_func, args, None))
+
+    def function_frame(self, user_func, args, back):
+        """Create the frame of a call, binding arguments to parameters"""
+        frame = Frame(user_func["code"], user_func["closure"], back)
+        if frame.depth > self.max_depth:
+            raise RecursionError("maximum recursion depth exceeded")
+
+        # Missing arguments default to None
+        fast = frame.fast
+        nargs = len(args)
+        for i, slot in enumerate(frame.code.param_slots):
+            fast[slot] = args[i] if i < nargs else None
+        return frame
+
+    # -----------------------------
+    #  Dispatch loop
+    # -----------------------------
+    def run_frame(self, frame):
+        """Run ``frame`` (and the frames it calls) until it returns"""
+        entry = frame
+        functions = self.functions
+
+        while True:
+            # (Re)load the state of the current frame
+            code = frame.code
+            words = code.words
+            constants = code.constants
+            names = code.names
+            fast = frame.fast
+            scope = frame.scope
+            if scope.__class__ is Frame:
+                scope_values = None
+            else:
+                # Fast paths for names of a plain Environment (usually globals)
+                scope_values = scope.values
+                scope_types = scope.types
+                scope_constants = scope.constants
+            stack = frame.stack
+            push = stack.append
+            pop = stack.pop
+            pc = frame.pc
+
+            try:
+                while True:
+                    word = words[pc]
+                    pc += 1
+                    op = word & 0xFF
+                    arg = word >> 8
+
+                    # Most frequent instructions first
+                    if op == LOAD_FAST:
+                        value = fast[arg]
+                        if value is UNSET:
+                            value = self.load_outer(frame, arg, pc)
+                        push(value)
+
+                    elif op == LOAD_CONST:
+                        push(constants[arg])
+
+                    elif op == BINARY_OP_CONST:
+                        apply, right = constants[arg]
+                        stack[-1] = apply(stack[-1], right)
+
+                    elif op == BINARY_OP:
+                        right = pop()
+                        stack[-1] = constants[arg](stack[-1], right)
+
+                    elif op == LOAD_NAME:
+                        name = names[arg]
+                        if scope_values is not None and name in scope_values:
+                            push(scope_values[name])
+                        else:
+                            try:
+                                push(scope.lookup(name))
+                            except KeyError:
+                                raise self.undefined_variable(code, pc, name)
+
+                    elif op == POP_JUMP_IF_FALSE:
+                        if not pop():
+                            pc = arg
+
+                    elif op == STORE_FAST:
+                        if (
+                            fast[arg] is UNSET or
+                            frame.types is not None or
+                            frame.constants is not None
+                        ):
+                            self.store_fast(frame, arg, pop(), pc)
+                        else:
+                            fast[arg] = pop()
+
+                    elif op == STORE_NAME:
+                        name = names[arg]
+                        if (
+                            scope_values is not None and
+                            name in scope_values and
+                            name not in scope_constants and
+                            name not in scope_types
+                        ):
+                            scope_values[name] = pop()
+                        else:
+                            self.assign_name(scope, name, pop(), code, pc)
+
+                    elif op == JUMP:
+                        pc = arg
+
+                    elif op == FOR_ITER:
+                        # stack: counter, end, step
+                        i = stack[-3]
+                        if i <= stack[-2] if stack[-1] > 0 else i >= stack[-2]:
+                            push(i)
+                        else:
+                            pc = arg
+
+                    elif op == FOR_STEP:
+                        stack[-3] += stack[-1]
+
+                    elif op == SET_FAST:
+                        fast[arg] = pop()
+
+                    elif op == SET_NAME:
+                        if scope_values is not None:
+                            scope_values[names[arg]] = pop()
+                        else:
+                            scope.set(names[arg], pop())
+
+                    elif op == CALL_FUNCTION:
+                        func_name, argc = constants[arg]
+                        if argc:
+                            args = stack[-argc:]
+                            del stack[-argc:]
+                        else:
+                            args = []
+
+                        func = functions.get(func_name)
+                        if func is None:
+                            raise RuntimeError("undefined_function", name=func_name)
+                        if callable(func):
+                            # Built-in function (Python function)
+                            push(func(*args))
+                        else:
+                            # User-defined function: continue in a new frame
+                            frame.pc = pc
+                            frame = self.function_frame(func, args, frame)
+                            break
+
+                    elif op == RETURN_VALUE:
+                        value = pop()
+                        if frame is entry:
+                            return value
+                        # Continue in the calling frame
+                        frame = frame.back
+                        frame.stack.append(value)
+                        break
+
+                    elif op == POP_TOP:
+                        pop()
+
+                    elif op == DUP_TOP:
+                        push(stack[-1])
+
+                    elif op == DECLARE_FAST:
+                        if frame.types is not None or frame.constants is not None:
+                            frame.define(code.varnames[arg], pop())
+                        else:
+                            fast[arg] = pop()
+
+                    elif op == DECLARE:
+                        var_name, var_type, is_constant, node = constants[arg]
+                        value = pop()
+                        if (
+                            var_type is not None and
+                            value.__class__ not in STATIC_TYPE_CLASSES.get(var_type, ())
+                        ):
+                            # Validate the value against the declared static type
+                            self.validate_type(var_name, value, var_type, node)
+                        scope.define(
+                            var_name, value, var_type=var_type, is_constant=is_constant
+                        )
+
+                    elif op == LOAD_INDEX:
+                        idx = pop()
+                        arr = stack[-1]
+                        line, position = code.positions[pc - 1]
+                        if (
+                            not isinstance(arr, list)
+                            and arr.__class__ is not NumericList
+                        ):
+                            raise TypeError(
+                                "index_access", line=line, position=position
+                            )
+                        stack[-1] = arr[check_index(idx, arr, line, position)]
+
+                    elif op == LOAD_PROPERTY:
+                        stack[-1] = self.load_property(stack[-1], names[arg], code, pc)
+
+                    elif op == CALL_METHOD:
+                        cache, argc = constants[arg]
+                        if argc:
+                            args = stack[-argc:]
+                            del stack[-argc:]
+                        else:
+                            args = []
+                        obj = stack[-1]
+                        # Inline cache of the call site, by receiver class
+                        method = cache.entries.get(obj.__class__, UNRESOLVED)
+                        if method is UNRESOLVED:
+                            method = cache.resolve(self, obj)
+                        if method is None:
+                            stack[-1] = self.call_method(obj, cache.method_name, args)
+                        else:
+                            stack[-1] = method(obj, *args)
+
+                    elif op == UNARY_NOT:
+                        stack[-1] = not stack[-1]
+
+                    elif op == TO_BOOL:
+                        stack[-1] = bool(stack[-1])
+
+                    elif op == JUMP_IF_FALSE_OR_POP:
+                        if stack[-1]:
+                            pop()
+                        else:
+                            pc = arg
+
+                    elif op == JUMP_IF_TRUE_OR_POP:
+                        if stack[-1]:
+                            pc = arg
+                        else:
+                            pop()
+
+                    elif op == BUILD_LIST:
+                        if arg:
+                            values = stack[-arg:]
+                            del stack[-arg:]
+                            push(values)
+                        else:
+                            push([])
+
+                    elif op == BUILD_OBJECT:
+                        keys = constants[arg]
+                        if keys:
+                            values = stack[-len(keys):]
+                            del stack[-len(keys):]
+                            push(dict(zip(keys, values)))
+                        else:
+                            push({})
+
+                    elif op == STORE_INDEX:
+                        # stack: value, list, index
+                        idx = pop()
+                        arr = pop()
+                        line, position = code.positions[pc - 1]
+                        if (
+                            not isinstance(arr, list)
+                            and arr.__class__ is not NumericList
+                        ):
+                            raise TypeError(
+                                "index_access", line=line, position=position
+                            )
+                        arr[check_index(idx, arr, line, position)] = pop()
+
+                    elif op == STORE_PROPERTY:
+                        # stack: value, object
+                        obj = pop()
+                        if not isinstance(obj, dict):
+                            line, position = code.positions[pc - 1]
+                            raise TypeError(
+                                "property_access",
+                                prop=names[arg],
+                                line=line,
+                                position=position,
+                            )
+                        obj[names[arg]] = pop()
+
+                    elif op == FOR_PREP:
+                        # Ensure all values are numbers
+                        for value in stack[-3:]:
+                            if not isinstance(value, (int, float)):
+                                raise TypeError("invalid_for_loop")
+
+                    elif op == FOR_END:
+                        del stack[-3:]
+
+                    elif op == SETUP_TRY:
+                        if frame.handlers is None:
+                            frame.handlers = []
+                        frame.handlers.append((arg, len(stack)))
+
+                    elif op == POP_TRY:
+                        frame.handlers.pop()
+
+                    elif op == LOAD_FUNCTION_REF:
+                        # A function name passes through as-is, else it is a variable
+                        func_name = names[arg]
+                        if func_name in functions:
+                            push(func_name)
+                        else:
+                            try:
+                                push(scope.lookup(func_name))
+                            except KeyError:
+                                raise self.undefined_variable(code, pc, func_name)
+
+                    elif op == CALL_DOTTED:
+                        func_name, argc, obj_name, method_name = constants[arg]
+                        if argc:
+                            args = stack[-argc:]
+                            del stack[-argc:]
+                        else:
+                            args = []
+
+                        func = functions.get(func_name)
+                        if func is None:
+                            # Method call on an object or list stored in a variable
+                            push(self.call_dotted(scope, obj_name, method_name, args))
+                        elif callable(func):
+                            push(func(*args))
+                        else:
+                            frame.pc = pc
+                            frame = self.function_frame(func, args, frame)
+                            break
+
+                    elif op == DEFINE_FUNCTION:
+                        func_name, params, body, func_code = constants[arg]
+                        # Store the function along with the scope it was defined in
+                        functions[func_name] = {
+                            "name": func_name,
+                            "params": list(params),
+                            "body": list(body),
+                            "code": func_code,
+                            "closure": scope,
+                        }
+
+                    elif op == CLASS_DEFINITION:
+                        class_def = self.run_in_scope(
+                            scope, self.execute_class_definition, constants[arg]
+                        )
+                        push(class_def)
+
+                    elif op == IMPORT:
+                        self.run_in_scope(
+                            scope, self.execute_import_statement, constants[arg]
+                        )
+
+                    elif op == RAISE:
+                        error_class, error_code, kwargs = constants[arg]
+                        raise error_class(error_code, **kwargs)
+
+                    else:
+                        raise RuntimeError(
+                            "invalid_syntax", detail=f"Unknown opcode: {op}"
+                        )
+
+            except Exception as error:
+                frame = self.handle_exception(frame, entry, error)
+
+    def handle_exception(self, frame, entry, error):
+        """Return the frame whose isku_day handler catches ``error``
+
+        The handler's frame is set up to continue in the catch block with the
+        error message on its stack. The error is raised again when no frame
+        up to ``entry`` handles it.
+        """
+        while True:
+            if frame.handlers:
+                target, depth = frame.handlers.pop()
+                del frame.stack[depth:]
+                frame.stack.append(str(error))
+                frame.pc = target
+                return frame
+            if frame is entry:
+                raise error
+            frame = frame.back
+
+    # -----------------------------
+    #  Variables
+    # -----------------------------
+    def undefined_variable(self, code, pc, name):
+        line, position = code.positions[pc - 1]
+        return RuntimeError(
+            "undefined_variable", name=name, line=line, position=position
+        )
+
+    def load_outer(self, frame, slot, pc):
+        """Read a local that is not declared yet from the enclosing scopes"""
+        name = frame.code.varnames[slot]
+        try:
+            return frame.parent.lookup(name)
+        except KeyError:
+            raise self.undefined_variable(frame.code, pc, name)
+
+    def store_fast(self, frame, slot, value, pc):
+        """Assign a local slot, checking constants and static types"""
+        code = frame.code
+        name = code.varnames[slot]
+        if frame.fast[slot] is UNSET:
+            # Not declared here yet, so assign the variable of an enclosing scope
+            return self.assign_name(frame.parent, name, value, code, pc)
+        return self.assign_name(frame, name, value, code, pc)
+
+    def assign_name(self, scope, var_name, value, code, pc):
+        """Assign a value to a variable, with type checking if it's statically typed"""
+        line, position = code.positions[pc - 1]
+
+        # Find the scope that declared the variable
+        env = scope.find(var_name)
+        if env is None:
+            raise RuntimeError(
+                "undefined_variable", name=var_name, line=line, position=position
+            )
+
+        # Check if trying to reassign a constant
+        if env.constants and var_name in env.constants:
+            raise RuntimeError(
+                "constant_reassignment", name=var_name, line=line, position=position
+            )
+
+        # If it's a statically typed variable, validate the type
+        if env.types and var_name in env.types:
+            self.check_type(var_name, value, env.types[var_name], line, position)
+
+        env.set(var_name, value)
+        return value
+
+    def run_in_scope(self, scope, method, node):
+        """Run an Interpreter helper with ``scope`` as the current scope"""
+        previous = self.environment
+        self.environment = scope
+        try:
+            return method(node)
+        finally:
+            self.environment = previous
+
+    # -----------------------------
+    #  Properties and methods
+    # -----------------------------
+    def load_property(self, obj, prop_name, code, pc):
+        if not isinstance(obj, dict):
+            line, position = code.positions[pc - 1]
+            raise TypeError(
+                "property_access", prop=prop_name, line=line, position=position
+            )
+        if prop_name not in obj:
+            line, position = code.positions[pc - 1]
+            raise RuntimeError(
+                "property_not_found", prop_name=prop_name, line=line, position=position
+            )
+        return obj[prop_name]
+
+    def call_method(self, obj, method_name, args):
+        # For built-in list methods
+        if isinstance(obj, list) and method_name in self.list_methods:
+            return self.execute_list_method(method_name, obj, args)
+
+        # For numeric list methods, and the list methods that copy it
+        elif isinstance(obj, NumericList):
+            if method_name in self.numeric_list_methods:
+                return self.numeric_list_methods[method_name](obj, *args)
+            if method_name in self.list_methods:
+                return self.execute_list_method(method_name, obj.tolist(), args)
+
+        # For built-in object methods
+        elif isinstance(obj, dict) and method_name in self.object_methods:
+            return self.execute_object_method(method_name, obj, args)
+
+        # For built-in string methods
+        elif isinstance(obj, str) and method_name in self.string_methods:
+            return self.execute_string_method(method_name, obj, args)
+
+        # For string builder methods
+        elif isinstance(obj, StringBuilder) and method_name in self.builder_methods:
+            return self.builder_methods[method_name](obj, *args)
+
+        # For user-defined object methods
+        elif isinstance(obj, dict) and method_name in obj:
+            if callable(obj[method_name]):
+                return obj[method_name](*args)
+
+        raise RuntimeError(
+            "method_not_found",
+            method_name=method_name,
+            type_name=SoplangBuiltins.nooc(obj),
+        )
+
+    def call_dotted(self, scope, obj_name, method_name, args):
+        try:
+            obj = scope.lookup(obj_name)
+        except KeyError:
+            obj = None
+        if obj is None:
+            raise RuntimeError("undefined_variable", name=obj_name)
+
+        if isinstance(obj, list) and method_name in self.list_methods:
+            return self.list_methods[method_name](obj, *args)
+        elif isinstance(obj, NumericList):
+            if method_name in self.numeric_list_methods:
+                return self.numeric_list_methods[method_name](obj, *args)
+            if method_name in self.list_methods:
+                return self.list_methods[method_name](obj.tolist(), *args)
+        elif isinstance(obj, dict) and method_name in self.object_methods:
+            return self.object_methods[method_name](obj, *args)
+        elif isinstance(obj, str) and method_name in self.string_methods:
+            return self.string_methods[method_name](obj, *args)
+        elif isinstance(obj, StringBuilder) and method_name in self.builder_methods:
+            return self.builder_methods[method_name](obj, *args)
+        raise RuntimeError(
+            "method_not_found",
+            method_name=method_name,
+            type_name=SoplangBuiltins.nooc(obj),
+        )
@@ -1,7 +1,14 @@
-from src.utils.errors import TypeError, ValueError
 import math
 import random
 
+from src.stdlib.containers import (
+    NUMERIC_CLASSES,
+    NumericList,
+    StringBuilder,
+    to_text,
+)
+from src.utils.errors import TypeError, ValueError
+
 
 class SoplangBuiltins:
     @staticmethod
@@ -30,6 +37,8 @@ class SoplangBuiltins:
         """
         if isinstance(value, str):
             return "qoraal"
+        elif isinstance(value, StringBuilder):
+            return "qoraal_dhis"
         elif isinstance(value, bool):
             return "bool"
         elif isinstance(value, (int, float)):
@@ -38,7 +47,7 @@ class SoplangBuiltins:
                 return "abn"
             else:
                 return "jajab"
-        elif isinstance(value, list):
+        elif isinstance(value, (list, NumericList)):
             return "teed"
         elif isinstance(value, dict):
             return "walax"
@@ -67,41 +76,8 @@ class SoplangBuiltins:
         except (ValueError, TypeError) as err:
             raise TypeError(f"{value!r} ma badali karo jajab") from err
 
-    @staticmethod
-    def qoraal(value):
-        """
-        Convert a value to a string
-        """
-        # Convert boolean values to Soplang equivalents
-        if isinstance(value, bool):
-            return "run" if value else "been"
-
-        # Handle numeric values
-        if isinstance(value, (int, float)):
-            if isinstance(value, int):
-                return str(value)  # Integer without decimal point
-            else:
-                return str(value)  # Float (always with decimal point)
-
-        if isinstance(value, dict):
-            try:
-                # Simple JSON-like stringification for dictionaries
-                pairs = []
-                for k, v in value.items():
-                    pairs.append(f"{k!r}: {SoplangBuiltins.qoraal(v)}")
-                return "{" + ", ".join(pairs) + "}"
-            except Exception:
-                # Fallback for circular references
-                return "{...}"
-        elif isinstance(value, list):
-            try:
-                # Simple JSON-like stringification for lists
-                items = [SoplangBuiltins.qoraal(item) for item in value]
-                return "[" + ", ".join(items) + "]"
-            except Exception:
-                # Fallback for circular references
-                return "[...]"
-        return str(value)
+    # Convert a value to a string (see containers.py)
+    qoraal = staticmethod(to_text)
 
     @staticmethod
     def bool(value):
@@ -119,6 +95,33 @@ class SoplangBuiltins:
         """
         return list(args)
 
+    @staticmethod
+    def teed_abn(*args):
+        """
+        Create a list of abn packed in an array, from the arguments or from
+        one list (e.g. teed_abn(baaxad(1000)))
+        """
+        return SoplangBuiltins.numeric_list("q", args)
+
+    @staticmethod
+    def teed_jajab(*args):
+        """
+        Create a list of jajab packed in an array, like teed_abn
+        """
+        return SoplangBuiltins.numeric_list("d", args)
+
+    @staticmethod
+    def numeric_list(typecode, args):
+        if len(args) == 1 and isinstance(args[0], (list, NumericList)):
+            args = args[0]
+        values = list(args)
+        if not set(map(type, values)) <= NUMERIC_CLASSES[typecode]:
+            raise TypeError(
+                "Dhammaan qiimayaasha waa inay noqdaan abn ama jajab "
+                "(all values must be numbers)"
+            )
+        return NumericList.pack(typecode, values)
+
     @staticmethod
     def walax(**kwargs):
         """
@@ -820,12 +823,14 @@ class SoplangBuiltins:
         Raises:
             TypeError: If the value is not a list, string, or object
         """
-        if isinstance(value, list):
+        if isinstance(value, (list, NumericList)):
             return len(value)  # Number of items in the list
         elif isinstance(value, str):
             return len(value)  # Number of characters in the string
         elif isinstance(value, dict):
             return len(value)  # Number of key-value pairs in the object
+        elif isinstance(value, StringBuilder):
+            return value.length  # Number of characters built so far
         else:
             raise TypeError(
                 "Qiimaha ma ahan teed, qoraal, ama walax (Value is not a list, string, or object)"
@@ -927,6 +932,9 @@ def get_builtin_functions():
         "dherer": SoplangBuiltins.dherer,
         "xul": SoplangBuiltins.xul,
         "baaxad": SoplangBuiltins.baaxad,
+        "qoraal_dhis": StringBuilder,
+        "teed_abn": SoplangBuiltins.teed_abn,
+        "teed_jajab": SoplangBuiltins.teed_jajab,
     }
 
     return builtins
@@ -991,3 +999,40 @@ def get_string_methods():
         "raadi": SoplangBuiltins.string_find,
     }
     return methods
+
+
+def get_builder_methods():
+    """
+    Returns a dictionary of string builder (qoraal_dhis) methods
+    """
+    methods = {
+        "ku_dar": StringBuilder.ku_dar,
+        "dhammee": StringBuilder.dhammee,
+        "dherer": StringBuilder.dherer,
+        "nadiifi": StringBuilder.nadiifi,
+    }
+    return methods
+
+
+def get_numeric_list_methods():
+    """
+    Returns a dictionary of the methods of numeric lists (teed_abn, teed_jajab)
+    """
+    methods = {
+        "kasaar": NumericList.kasaar,
+        "dherer": NumericList.dherer,
+        "kudar": NumericList.kudar,
+        "leeyahay": NumericList.leeyahay,
+        "nuqul": NumericList.nuqul,
+        "nadiifi": NumericList.nadiifi,
+        "rog": NumericList.rog,
+        "habee": NumericList.habee,
+        "jar": NumericList.jar,
+        "muuji": NumericList.muuji,
+        "wadar": NumericList.wadar,
+        "ugu_yar": NumericList.ugu_yar,
+        "ugu_weyn": NumericList.ugu_weyn,
+        "celcelis": NumericList.celcelis,
+        "sifee": NumericList.sifee,
+    }
+    return methods
@@ -0,0 +1,462 @@
+"""
+Soplang Containers
+==================
+
+The value types the built-ins add to Soplang's plain lists, objects and
+strings, and how every value is written as text:
+
+- StringBuilder, the ``qoraal_dhis`` type, builds a string from pieces.
+- NumericList, made by ``teed_abn`` and ``teed_jajab``, is a ``teed`` of
+  numbers packed in an array.
+- to_text() is ``qoraal``, and serialize() writes lists and objects in
+  chunks for it and for Output.qor.
+"""
+
+import operator
+from array import array
+from itertools import compress, repeat
+
+from src.utils.errors import RuntimeError, TypeError, ValueError
+
+# Pieces serialize() collects before it writes them as one chunk
+CHUNK_PIECES = 4096
+
+
+def to_text(value):
+    """
+    Convert a value to a string, as qoraal() does
+    """
+    # Convert boolean values to Soplang equivalents
+    if isinstance(value, bool):
+        return "run" if value else "been"
+
+    # Handle numeric values
+    if isinstance(value, (int, float)):
+        if isinstance(value, int):
+            return str(value)  # Integer without decimal point
+        else:
+            return str(value)  # Float (always with decimal point)
+
+    if isinstance(value, (dict, list, NumericList)):
+        # JSON-like stringification, see serialize()
+        parts = []
+        serialize(value, parts.append)
+        return "".join(parts)
+    elif isinstance(value, StringBuilder):
+        return value.dhammee()
+    return str(value)
+
+
+def serialize(value, write):
+    """
+    Write ``value`` as qoraal() shows it, in chunks, to ``write``
+
+    Lists and objects are walked with an explicit stack instead of recursion,
+    so deep nesting cannot hit the recursion limit, and a list or object that
+    contains itself is written as ``[...]`` or ``{...}``. A large value is
+    never built as one string: ``write`` gets a chunk every CHUNK_PIECES
+    pieces (Output.qor streams lists and objects this way).
+    """
+    pieces = []
+    append = pieces.append
+    qoraal = to_text
+    active = set()  # ids of the lists and objects being written
+    stack = []  # (iterator, closing bracket, id, is object) of each open one
+
+    while True:
+        # value is a list or object to open, or the first value of one
+        if isinstance(value, list) or value.__class__ is NumericList:
+            ident = id(value)
+            if ident in active:
+                append("[...]")
+            elif value:
+                active.add(ident)
+                items = iter(value)
+                stack.append((items, "]", ident, False))
+                append("[")
+                value = next(items)
+                continue
+            else:
+                append("[]")
+        elif isinstance(value, dict):
+            ident = id(value)
+            if ident in active:
+                append("{...}")
+            elif value:
+                active.add(ident)
+                items = iter(value.items())
+                stack.append((items, "}", ident, True))
+                key, value = next(items)
+                append("{" + repr(key) + ": ")
+                continue
+            else:
+                append("{}")
+        else:
+            append(value if value.__class__ is str else qoraal(value))
+
+        # Write the rest of the innermost open list or object, up to the next
+        # list or object in it, and close the ones that have nothing left
+        while stack:
+            items, closing, ident, is_object = stack[-1]
+            for value in items:
+                if len(pieces) >= CHUNK_PIECES:
+                    write("".join(pieces))
+                    pieces.clear()
+                if is_object:
+                    key, value = value
+                    append(", " + repr(key) + ": ")
+                else:
+                    append(", ")
+                if isinstance(value, (list, dict, NumericList)):
+                    break
+                cls = value.__class__
+                if cls is str:
+                    append(value)
+                elif cls is int or cls is float:
+                    append(str(value))
+                else:
+                    append(qoraal(value))
+            else:
+                stack.pop()
+                active.discard(ident)
+                append(closing)
+                continue
+            break
+        else:
+            break
+
+    write("".join(pieces))
+
+
+class StringBuilder:
+    """
+    A string built piece by piece (the qoraal_dhis type)
+
+    ``s = s + x`` copies s every time, so building a long string in a loop
+    takes quadratic time. A builder keeps the pieces in a list instead, and
+    joins them once when the string is needed.
+    """
+
+    __slots__ = ("parts", "length")
+
+    def __init__(self, *values):
+        self.parts = []
+        self.length = 0  # Characters in parts
+        self.ku_dar(*values)
+
+    def __repr__(self):
+        return f"<StringBuilder {self.length} characters>"
+
+    def ku_dar(self, *values):
+        """Append the values, as qoraal() shows them, and return the builder"""
+        for value in values:
+            text = to_text(value)
+            self.parts.append(text)
+            self.length += len(text)
+        return self
+
+    def dhammee(self):
+        """Return the string built so far"""
+        parts = self.parts
+        if len(parts) > 1:
+            # Keep the joined string so the next call does not join again
+            parts[:] = ["".join(parts)]
+        return parts[0] if parts else ""
+
+    def dherer(self):
+        return self.length
+
+    def nadiifi(self):
+        self.parts.clear()
+        self.length = 0
+        return self
+
+
+# Classes of the values each array typecode of a NumericList holds
+NUMERIC_CLASSES = {"q": frozenset((int,)), "d": frozenset((int, float))}
+
+
+class NumericList:
+    """
+    A teed of numbers packed in an array (made by teed_abn and teed_jajab)
+
+    The numbers are stored unboxed in an ``array('q')`` (abn) or
+    ``array('d')`` (jajab). Arithmetic with a number or a list of the same
+    length, the ordering comparisons and the reductions (wadar, ugu_yar,
+    ugu_weyn, celcelis) run over the whole array in C, without calling into
+    the interpreter once per element. ``==`` compares whole lists, like teed.
+
+    Storing a value the array cannot hold (a string, a bool, a jajab in an
+    abn list) turns the storage into a plain list, and the list keeps working
+    as a teed.
+    """
+
+    __slots__ = ("data",)
+    __hash__ = None
+
+    def __init__(self, data):
+        self.data = data  # An array, or a list once a non-number was stored
+
+    @classmethod
+    def pack(cls, typecode, values):
+        """A NumericList of ``values``, as a plain list if they do not fit"""
+        values = list(values)
+        if set(map(type, values)) <= NUMERIC_CLASSES[typecode]:
+            try:
+                return cls(array(typecode, values))
+            except OverflowError:
+                pass
+        return cls(values)
+
+    @property
+    def typecode(self):
+        """'q' or 'd', or None once the storage is a plain list"""
+        return self.data.typecode if self.data.__class__ is array else None
+
+    def tolist(self):
+        return self.data.tolist() if self.data.__class__ is array else self.data[:]
+
+    def __repr__(self):
+        return f"<NumericList {self.typecode} {len(self.data)} items>"
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __contains__(self, value):
+        return value in self.data
+
+    def __getitem__(self, index):
+        if index.__class__ is slice:
+            return NumericList(self.data[index])
+        return self.data[index]
+
+    def __setitem__(self, index, value):
+        if self.fits(value):
+            try:
+                self.data[index] = value
+                return
+            except OverflowError:
+                pass
+        self.unpack()
+        self.data[index] = value
+
+    def append(self, value):
+        if self.fits(value):
+            try:
+                self.data.append(value)
+                return
+            except OverflowError:
+                pass
+        self.unpack()
+        self.data.append(value)
+
+    def fits(self, value):
+        """Whether the array can hold ``value`` (False once unpacked)"""
+        data = self.data
+        if data.__class__ is not array:
+            return False
+        return value.__class__ in NUMERIC_CLASSES[data.typecode]
+
+    def unpack(self):
+        """Store the items in a plain list, which holds any value"""
+        if self.data.__class__ is array:
+            self.data = self.data.tolist()
+
+    def __eq__(self, other):
+        if other.__class__ is NumericList:
+            if self.typecode and other.typecode:
+                return self.data == other.data
+            return list(self.data) == list(other.data)
+        if isinstance(other, list):
+            return list(self.data) == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    # -----------------------------
+    #  Elementwise operators
+    # -----------------------------
+    def operands(self, other):
+        """The items of ``other`` to pair with ours, and their typecode"""
+        cls = other.__class__
+        if cls is int:
+            return repeat(other), "q"
+        if cls is float:
+            return repeat(other), "d"
+        if cls is NumericList or isinstance(other, list):
+            if len(other) != len(self.data):
+                raise ValueError(
+                    "Teedadu isku dherer ma aha (Lists have different lengths)"
+                )
+            if cls is NumericList:
+                return other.data, other.typecode
+            return other, None
+        return None, None
+
+    def elementwise(self, other, function, reflected=False):
+        items, typecode = self.operands(other)
+        if items is None:
+            return NotImplemented
+        if reflected:
+            values = map(function, items, self.data)
+        else:
+            values = map(function, self.data, items)
+        try:
+            values = list(values)
+        except ZeroDivisionError:
+            if function is operator.mod:
+                raise RuntimeError("modulo_by_zero")
+            raise RuntimeError("division_by_zero")
+        if function is operator.truediv or "d" in (self.typecode, typecode):
+            return NumericList.pack("d", values)
+        if typecode is None and float in set(map(type, values)):
+            # The items of a plain list were jajab
+            return NumericList.pack("d", values)
+        return NumericList.pack("q", values)
+
+    def __add__(self, other):
+        return self.elementwise(other, operator.add)
+
+    def __radd__(self, other):
+        return self.elementwise(other, operator.add, reflected=True)
+
+    def __sub__(self, other):
+        return self.elementwise(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self.elementwise(other, operator.sub, reflected=True)
+
+    def __mul__(self, other):
+        return self.elementwise(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self.elementwise(other, operator.mul, reflected=True)
+
+    def __truediv__(self, other):
+        return self.elementwise(other, operator.truediv)
+
+    def __rtruediv__(self, other):
+        return self.elementwise(other, operator.truediv, reflected=True)
+
+    def __mod__(self, other):
+        return self.elementwise(other, operator.mod)
+
+    def __rmod__(self, other):
+        return self.elementwise(other, operator.mod, reflected=True)
+
+    def compare(self, other, function):
+        """A teed of the bools of comparing each item with ``other``"""
+        items, _ = self.operands(other)
+        if items is None:
+            return NotImplemented
+        return list(map(function, self.data, items))
+
+    def __lt__(self, other):
+        return self.compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self.compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self.compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self.compare(other, operator.ge)
+
+    # -----------------------------
+    #  Methods
+    # -----------------------------
+    def wadar(self):
+        """Sum of the items"""
+        return sum(self.data)
+
+    def ugu_yar(self):
+        """Smallest item"""
+        self.check_not_empty()
+        return min(self.data)
+
+    def ugu_weyn(self):
+        """Largest item"""
+        self.check_not_empty()
+        return max(self.data)
+
+    def celcelis(self):
+        """Mean of the items"""
+        self.check_not_empty()
+        return sum(self.data) / len(self.data)
+
+    def sifee(self, mask):
+        """The items whose entry in ``mask`` (e.g. ``a > 0``) is run"""
+        if not isinstance(mask, (list, NumericList)) or len(mask) != len(self.data):
+            raise ValueError(
+                "Sifeeyuhu waa teed isku dherer ah (The mask must be a list of "
+                "the same length)"
+            )
+        values = list(compress(self.data, mask))
+        if self.typecode is None:
+            return NumericList(values)
+        return NumericList(array(self.typecode, values))
+
+    def check_not_empty(self):
+        if not self.data:
+            raise ValueError("teedka waa madhan (List is empty)")
+
+    def dherer(self):
+        return len(self.data)
+
+    def kudar(self, other):
+        """Concatenate a list into a new list, or append one item in place"""
+        if isinstance(other, (list, NumericList)):
+            if self.typecode is None:
+                return NumericList(self.data + list(other))
+            return NumericList.pack(self.typecode, [*self.data, *other])
+        self.append(other)
+        return self
+
+    def kasaar(self):
+        if not self.data:
+            raise ValueError(
+                "Ma saari kartid teed madhan (Cannot pop from an empty list)"
+            )
+        return self.data.pop()
+
+    def leeyahay(self, item):
+        return item in self.data
+
+    def nuqul(self):
+        return NumericList(self.data[:])
+
+    def nadiifi(self):
+        del self.data[:]
+        return self
+
+    def rog(self):
+        self.data.reverse()
+        return self
+
+    def habee(self):
+        if self.typecode is None:
+            self.data.sort()
+        else:
+            self.data = array(self.typecode, sorted(self.data))
+        return self
+
+    def jar(self, start, end):
+        """The items from ``start`` up to ``end``, as in list_jar"""
+        if not isinstance(start, (int, float)) or not isinstance(end, (int, float)):
+            raise TypeError(
+                "Bilowga iyo dhamaadka waa inay noqdaan abn (Start and end must be "
+                "numbers)"
+            )
+        return NumericList(self.data[int(start):int(end)])
+
+    def muuji(self, item):
+        """Index of the first ``item``, or maran"""
+        if item in self.data:
+            return self.data.index(item)
+        return None
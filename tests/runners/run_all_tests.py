@@ -10,6 +10,20 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../.
 from tests.test_lexer import TestLexer
 from tests.test_parser import TestParser
 from tests.test_interpreter import TestInterpreter
+from tests.test_compiler import TestCompiler
+from tests.test_vm import TestVirtualMachine
+from tests.test_resolver import TestResolver
+from tests.test_cache import TestCache
+from tests.test_modules import TestModules
+from tests.test_optimizer import TestOptimizer
+from tests.test_profiler import TestProfiler
+from tests.test_benchmarks import TestBenchmarks
+from tests.test_shell import TestShell
+from tests.test_server import TestServer
+from tests.test_program import TestProgram
+from tests.test_batch import TestBatch
+from tests.test_output import TestOutput
+from tests.test_numeric_list import TestNumericList
 
 if __name__ == "__main__":
     # Create test loader
@@ -22,6 +36,20 @@ if __name__ == "__main__":
     test_suite.addTests(loader.loadTestsFromTestCase(TestLexer))
     test_suite.addTests(loader.loadTestsFromTestCase(TestParser))
     test_suite.addTests(loader.loadTestsFromTestCase(TestInterpreter))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCompiler))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestVirtualMachine))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestResolver))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestCache))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestModules))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestOptimizer))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestProfiler))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBenchmarks))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestShell))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestServer))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestProgram))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestBatch))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestOutput))
+    test_suite.addTests(loader.loadTestsFromTestCase(TestNumericList))
     
     # Run tests with verbose output
     runner = unittest.TextTestRunner(verbosity=2)
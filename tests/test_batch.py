@@ -0,0 +1,65 @@
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from src.runtime.batch import main, run_batch
+
+PROGRAMS = {
+    "a_ok.sop": 'qor("haa")\n',
+    "b_error.sop": "qor(x)\n",
+    "c_loop.sop": "door i = 0\nintay (run) {\n    i = i + 1\n}\n",
+    "d_input.sop": "qor(gelin())\n",
+}
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        """Write the batch programs and capture print statements."""
+        self.directory = tempfile.mkdtemp()
+        for name, source in PROGRAMS.items():
+            with open(os.path.join(self.directory, name), "w") as file:
+                file.write(source)
+
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        sys.stdout = self.stdout_backup
+        shutil.rmtree(self.directory)
+
+    def test_results_in_order(self):
+        """Test that each file gets its status, output and timeout flag."""
+        paths = [os.path.join(self.directory, name) for name in sorted(PROGRAMS)]
+        results = run_batch(paths, jobs=2, timeout=0.5, use_cache=False)
+        self.assertEqual([result["path"] for result in results], paths)
+        ok, error, loop, read = results
+        self.assertEqual((ok["status"], ok["stdout"]), (0, "haa\n"))
+        self.assertEqual(error["status"], 1)
+        self.assertIn("Khalad", error["stdout"])
+        self.assertTrue(loop["timed_out"])
+        self.assertFalse(ok["timed_out"] or error["timed_out"])
+        self.assertEqual(read["status"], 1)  # stdin is empty
+        self.assertEqual(self.captured_output.getvalue(), "")
+
+    def test_main_writes_results(self):
+        """Test that --batch reports the files under a directory as JSON."""
+        os.remove(os.path.join(self.directory, "c_loop.sop"))
+        output = os.path.join(self.directory, "results.json")
+        self.assertEqual(main([self.directory], jobs=1, output=output), 1)
+        with open(output) as file:
+            results = json.load(file)["results"]
+        self.assertEqual(
+            [os.path.basename(result["path"]) for result in results],
+            ["a_ok.sop", "b_error.sop", "d_input.sop"],
+        )
+        self.assertIn("1 passed, 2 failed", self.captured_output.getvalue())
+        self.assertEqual(main([os.path.join(self.directory, "a_ok.sop")]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
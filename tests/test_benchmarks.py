@@ -0,0 +1,86 @@
+import importlib.util
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.runtime.interpreter import Interpreter
+from src.runtime.main import run_soplang_file
+from src.runtime.modules import SEARCH_PATH_VARIABLE
+
+BENCHMARK_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "scripts", "benchmark"
+)
+PROGRAMS_DIR = os.path.join(BENCHMARK_DIR, "programs")
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(BENCHMARK_DIR, name + ".py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestBenchmarks(unittest.TestCase):
+    def setUp(self):
+        """Redirect stdout to capture print statements."""
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def test_programs_match_on_both_engines(self):
+        """Test that every benchmark program runs without errors on both engines."""
+        with mock.patch.dict(os.environ, {SEARCH_PATH_VARIABLE: PROGRAMS_DIR}):
+            for filename in sorted(os.listdir(PROGRAMS_DIR)):
+                if not filename.endswith(".sop"):
+                    continue
+                path = os.path.join(PROGRAMS_DIR, filename)
+                with self.subTest(benchmark=filename):
+                    outputs = []
+                    for engine in ("interpreter", "vm"):
+                        sys.stdout = io.StringIO()
+                        try:
+                            run_soplang_file(path, engine, use_cache=False)
+                            outputs.append(sys.stdout.getvalue())
+                        finally:
+                            sys.stdout = self.captured_output
+                    self.assertNotIn("Khalad", outputs[0])
+                    self.assertEqual(outputs[0], outputs[1])
+
+    def test_generated_programs_run(self):
+        """Test that synthetic programs are valid and grow with their size."""
+        generate_program = load_script("generate_program").generate_program
+        small, large = generate_program(8), generate_program(16)
+        self.assertEqual(small, generate_program(8))
+        self.assertGreater(large.count("\n"), small.count("\n"))
+        Interpreter().interpret(Parser(Lexer(large).iter_tokens()).parse())
+        self.assertEqual(self.captured_output.getvalue(), "")
+
+    def test_runs_do_not_import_the_shell(self):
+        """Test that running a file or -c code imports none of the shell modules."""
+        startup = load_script("startup")
+        # A copy, so that the run writes its AST cache outside the checkout
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = shutil.copy(os.path.join(PROGRAMS_DIR, "fib.sop"), directory)
+        baseline = startup.import_times(["-c", "pass"])
+        for args in ([startup.MAIN, path], [startup.MAIN, "-c", startup.SCRIPT]):
+            with self.subTest(args=args[1:]):
+                results, _ = startup.check("run", args, baseline, 1, 0, runs=1)
+                self.assertEqual(results["shell_modules"], [])
+                self.assertGreater(results["modules"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.runtime import cache
+from src.runtime.cache import cache_path, compile_tree, load_program
+
+
+class TestCache(unittest.TestCase):
+    def setUp(self):
+        """Create a temporary directory with a Soplang file."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "program.sop")
+        self._write('door x = 1\nqor(x + 2)\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write(self, source):
+        with open(self.filename, "w") as file:
+            file.write(source)
+
+    def test_unchanged_source_is_loaded_from_cache(self):
+        """Test that the second load does not parse the source again."""
+        first = load_program(self.filename)
+        self.assertTrue(os.path.exists(cache_path(self.filename)))
+
+        with mock.patch.object(cache, "parse_source") as parse_source:
+            second = load_program(self.filename)
+        parse_source.assert_not_called()
+        self.assertEqual(repr(second), repr(first))
+
+    def test_changed_source_is_parsed_again(self):
+        """Test that editing the file invalidates its cached AST."""
+        load_program(self.filename)
+        self._write('door y = 5\n')
+        ast = load_program(self.filename)
+        self.assertEqual(ast.children[0].value, "y")
+
+    def test_no_cache(self):
+        """Test that use_cache=False neither reads nor writes the cache."""
+        load_program(self.filename, use_cache=False)
+        self.assertFalse(os.path.exists(cache_path(self.filename)))
+
+    def test_corrupt_cache_is_ignored(self):
+        """Test that an unreadable cache file falls back to parsing."""
+        load_program(self.filename)
+        with open(cache_path(self.filename), "r+b") as file:
+            data = file.read()
+            file.seek(0)
+            file.write(data[: data.index(b"\n") + 1] + b"garbage")
+            file.truncate()
+        ast = load_program(self.filename)
+        self.assertEqual(ast.children[0].value, "x")
+
+    def test_compile_tree(self):
+        """Test that every Soplang file below a directory is precompiled."""
+        nested = os.path.join(self.directory, "lib", "util.sop")
+        os.makedirs(os.path.dirname(nested))
+        with open(nested, "w") as file:
+            file.write('qor("lib")\n')
+
+        compiled, failed = compile_tree(self.directory)
+        self.assertEqual(sorted(compiled), sorted([self.filename, nested]))
+        self.assertEqual(failed, [])
+        self.assertTrue(os.path.exists(cache_path(nested)))
+
+
+if __name__ == '__main__':
+    unittest.main()
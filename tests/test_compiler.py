@@ -0,0 +1,154 @@
+import io
+import sys
+import unittest
+
+from src.core.ast import NodeType
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.core.tokens import TokenType
+from src.runtime.compiler import BREAK, RETURN, Compiler
+from src.runtime.interpreter import Interpreter
+from src.utils.errors import RuntimeError
+
+
+class TestCompiler(unittest.TestCase):
+    def setUp(self):
+        """Redirect stdout to capture print statements."""
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def _parse(self, source_code):
+        return Parser(Lexer(source_code + "\n").tokenize()).parse()
+
+    def test_statement_closures_are_cached(self):
+        """Test that each statement node is only compiled once."""
+        ast = self._parse('door x = 1 + 2')
+        compiler = Compiler()
+        code = compiler.compile_statement(ast.children[0])
+        self.assertIs(ast.children[0].code, code)
+        self.assertIs(compiler.compile_statement(ast.children[0]), code)
+
+    def test_compiled_program_runs_on_any_interpreter(self):
+        """Test that compiled closures do not capture an interpreter."""
+        ast = self._parse('''
+        door total = 0
+        kuceli (i 1 ilaa 4) {
+            total = total + i
+        }
+        ''')
+        first, second = Interpreter(), Interpreter()
+        first.interpret(ast)
+        second.interpret(ast)
+        self.assertEqual(first.variables['total'], 10)
+        self.assertEqual(second.variables['total'], 10)
+
+    def test_elif_and_else_branches(self):
+        """Test that the compiled if statement picks the right branch."""
+        ast = self._parse('''
+        kuceli (n 1 ilaa 3) {
+            haddii (n == 1) {
+                qor("hal")
+            } haddii_kale (n == 2) {
+                qor("laba")
+            } ugudambeyn {
+                qor("saddex")
+            }
+        }
+        ''')
+        Interpreter().interpret(ast)
+        self.assertEqual(
+            self.captured_output.getvalue().split(), ["hal", "laba", "saddex"]
+        )
+
+    def test_errors_are_raised_when_executed(self):
+        """Test that unsupported nodes only fail once they are executed."""
+        ast = self._parse('hawl never() { celi [1, 2] > been }')
+        self.assertEqual(ast.children[0].type, NodeType.FUNCTION_DEFINITION)
+        Interpreter().interpret(ast)
+
+    def test_control_flow_returns_completion_status(self):
+        """Test that jooji and celi are returned as statuses, not raised."""
+        ast = self._parse('jooji\nceli 5')
+        compiler = Compiler()
+        interpreter = Interpreter()
+        self.assertIs(compiler.compile_statement(ast.children[0])(interpreter), BREAK)
+        self.assertIs(compiler.compile_statement(ast.children[1])(interpreter), RETURN)
+        self.assertEqual(interpreter.return_value, 5)
+
+    def test_control_flow_inside_try(self):
+        """Test that isku_day does not intercept jooji, soco or celi."""
+        ast = self._parse('''
+        hawl first_even(items) {
+            kuceli (i 0 ilaa 5) {
+                isku_day {
+                    haddii (items[i] % 2 == 1) {
+                        soco
+                    }
+                    celi items[i]
+                } qabo (err) {
+                    qor("not reached")
+                }
+            }
+        }
+        door found = first_even([1, 3, 8, 5])
+        ''')
+        interpreter = Interpreter()
+        interpreter.interpret(ast)
+        self.assertEqual(interpreter.variables['found'], 8)
+        self.assertEqual(self.captured_output.getvalue(), "")
+
+    def test_return_outside_function(self):
+        """Test that celi at the top level is reported as an error."""
+        with self.assertRaises(RuntimeError):
+            Interpreter().interpret(self._parse('celi 1'))
+
+    def test_static_types(self):
+        """Test the types inferred from declarations and literals."""
+        ast = self._parse('''
+        abn n = 1
+        qoraal s = "a"
+        door d = 1
+        door a = n + 2 * n
+        door b = s + n
+        door c = d + 1
+        door e = n < d
+        ''')
+        compiler = Compiler()
+        compiler.compile_statements(ast.children)
+        expressions = [node.initializer for node in ast.children[3:]]
+        types = [compiler.static_types.of(node) for node in expressions]
+        self.assertEqual(types, [TokenType.abn, TokenType.QORAAL, None, TokenType.BOOL])
+
+        # A conflicting declaration leaves the name untyped
+        compiler.static_types.declare("n", TokenType.QORAAL)
+        self.assertIsNone(compiler.static_types.of(expressions[0]))
+
+    def test_specialised_operators_fall_back(self):
+        """Test that a value not matching its static type uses the generic +."""
+        interpreter = Interpreter()
+        interpreter.globals.define("x", "a")
+        compiler = interpreter.compiler
+        compiler.static_types.declare("x", TokenType.abn)
+        for source, expected in (("x + 1", "a1"), ("1 + x", "1a"), ("x + x", "aa")):
+            node = self._parse(f"door r = {source}").children[0].initializer
+            code = compiler.compile_expression(node)
+            self.assertEqual(code(interpreter), expected)
+
+        interpreter.interpret(self._parse('''
+        abn total = 0
+        kuceli (i 1 ilaa 4) {
+            total = total + i * 2
+        }
+        qoraal s = "n" + total
+        qor(s + 1 / 2)
+        '''))
+        self.assertEqual(self.captured_output.getvalue().split(), ["n200.5"])
+
+
+if __name__ == '__main__':
+    unittest.main()
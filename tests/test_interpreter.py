@@ -139,6 +139,55 @@ class TestInterpreter(unittest.TestCase):
         self.assertEqual(output, expected)
         self.assertEqual(len(self.interpreter.variables['numbers']), 4)
 
+    def test_function_scope(self):
+        """Test that function locals stay local while globals remain visible."""
+        source = '''
+        door counter = 0
+        hawl increment(step) {
+            door previous = counter
+            counter = counter + step
+            celi previous
+        }
+        increment(2)
+        increment(3)
+        qor(counter)
+        '''
+        output = self._execute_code(source)
+        self.assertEqual(output, "5")
+        self.assertNotIn('previous', self.interpreter.variables)
+        self.assertNotIn('step', self.interpreter.variables)
+
+    def test_recursive_function(self):
+        """Test that recursive calls each get their own scope."""
+        source = '''
+        hawl fib(n) {
+            haddii (n < 2) {
+                celi n
+            }
+            celi fib(n - 1) + fib(n - 2)
+        }
+        qor(fib(10))
+        '''
+        output = self._execute_code(source)
+        self.assertEqual(output, "55")
+        self.assertIs(self.interpreter.environment, self.interpreter.globals)
+
+    def test_string_builder(self):
+        """Test that qoraal_dhis appends pieces and builds the string once."""
+        source = '''
+        door b = qoraal_dhis("Liis: ")
+        kuceli (i 1 ilaa 3) {
+            b.ku_dar(i, ", ")
+        }
+        b.ku_dar(run).ku_dar("!")
+        qor(b)
+        qor(nooc(b) + " " + qoraal(dherer(b)))
+        qor(b.dhammee() == b + "")
+        '''
+        output = self._execute_code(source)
+        self.assertEqual(output, "Liis: 1, 2, 3, run!\nqoraal_dhis 19\nrun")
+        self.assertEqual(self.interpreter.variables['b'].parts, ["Liis: 1, 2, 3, run!"])
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
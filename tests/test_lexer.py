@@ -1,6 +1,11 @@
+import glob
+import os
 import unittest
 from src.core.lexer import Lexer
 from src.core.tokens import TokenType
+from src.utils.errors import LexerError
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "examples")
 
 
 class TestLexer(unittest.TestCase):
@@ -86,6 +91,54 @@ class TestLexer(unittest.TestCase):
         self.assertEqual(identifier_tokens[0].value, "x")
         self.assertEqual(identifier_tokens[1].value, "y")
 
+    def _scan(self, source, method):
+        tokens = getattr(Lexer(source), method)()
+        return [
+            (token.type, token.value, token.line, token.position) for token in tokens
+        ]
+
+    def _assert_same_tokens(self, source):
+        self.assertEqual(
+            self._scan(source, "tokenize"),
+            self._scan(source, "tokenize_chars"),
+            repr(source),
+        )
+
+    def test_fast_scanner_matches_examples(self):
+        """Test that tokenize() and tokenize_chars() agree on the examples."""
+        filenames = glob.glob(os.path.join(EXAMPLES_DIR, "**", "*.sop"), recursive=True)
+        self.assertTrue(filenames)
+        for filename in filenames:
+            with open(filename, encoding="utf-8") as file:
+                self._assert_same_tokens(file.read())
+
+    def test_fast_scanner_matches_edge_cases(self):
+        """Test line and position tracking across whitespace, comments and strings."""
+        sources = [
+            "",
+            "x",
+            "door x = 3.5  ",
+            "a//comment\nb",
+            "a /* one\ntwo */ b // end",
+            "a\r\n\tb",
+            "qor('multi\nline') x",
+            "a/b/c >= 1 && !(b != 2) || c <= 3",
+            "x.y(1.2, [3])",
+            "é = ١٢",
+            "n = 12٣",
+        ]
+        for source in sources:
+            self._assert_same_tokens(source)
+
+    def test_fast_scanner_errors(self):
+        """Test that invalid source raises the same errors as the character scanner."""
+        for source in ['qor("open', "/* open", "a & b", "a | b", "x = #"]:
+            with self.assertRaises(LexerError) as fast:
+                Lexer(source).tokenize()
+            with self.assertRaises(LexerError) as slow:
+                Lexer(source).tokenize_chars()
+            self.assertEqual(str(fast.exception), str(slow.exception))
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
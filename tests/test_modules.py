@@ -0,0 +1,142 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.runtime import cache
+from src.runtime.interpreter import Interpreter
+from src.runtime.modules import ModuleRegistry
+from src.utils.errors import ImportError
+
+
+class TestModules(unittest.TestCase):
+    def setUp(self):
+        """Create a module directory and capture print statements."""
+        self.directory = tempfile.mkdtemp()
+        self.module = os.path.join(self.directory, "greet.sop")
+        self._write(self.module, 'qor("loaded")\ndoor greeting = "salaan"\n')
+
+        self.interpreter = Interpreter()
+        self.interpreter.modules = ModuleRegistry()
+        self.interpreter.use_cache = False
+
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        sys.stdout = self.stdout_backup
+        shutil.rmtree(self.directory)
+
+    def _write(self, filename, source):
+        with open(filename, "w") as file:
+            file.write(source)
+
+    def _execute_code(self, source_code):
+        ast = Parser(Lexer(source_code + "\n").tokenize()).parse()
+        self.interpreter.interpret(ast)
+        return self.captured_output.getvalue().split()
+
+    def test_repeat_imports_run_once(self):
+        """Test that importing a module again, even in a loop, is a no-op."""
+        output = self._execute_code(f'''
+        kuceli (i 1 ilaa 3) {{
+            ka_keen "{self.module}"
+        }}
+        ka_keen "{self.module}"
+        qor(greeting)
+        ''')
+        self.assertEqual(output, ["loaded", "salaan"])
+
+    def test_import_inside_function_defines_globals(self):
+        """Test that a module imported in a function keeps its names global."""
+        from src.runtime.vm import VirtualMachine
+
+        source = f'''
+        hawl f() {{
+            ka_keen "{self.module}"
+            qor(greeting)
+        }}
+        f()
+        f()
+        '''
+        for interpreter_class in (Interpreter, VirtualMachine):
+            with self.subTest(engine=interpreter_class.__name__):
+                self.captured_output.seek(0)
+                self.captured_output.truncate()
+                self.interpreter = interpreter_class()
+                self.interpreter.modules = ModuleRegistry()
+                self.interpreter.use_cache = False
+                output = self._execute_code(source)
+                self.assertEqual(output, ["loaded", "salaan", "salaan"])
+
+    def test_modules_are_parsed_once(self):
+        """Test that interpreters sharing a registry parse a module once."""
+        registry = self.interpreter.modules
+        parse_source = cache.parse_source
+        with mock.patch.object(cache, "parse_source", wraps=parse_source) as parse:
+            for _ in range(3):
+                interpreter = Interpreter()
+                interpreter.modules = registry
+                interpreter.use_cache = False
+                interpreter.execute_import_statement(
+                    Parser(Lexer(f'ka_keen "{self.module}"\n').tokenize())
+                    .parse()
+                    .children[0]
+                )
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(self.captured_output.getvalue().split(), ["loaded"] * 3)
+
+    def test_optimized_and_plain_imports_are_kept_apart(self):
+        """Test that -O on one interpreter does not change another's modules."""
+        from src.runtime.optimizer import Optimizer
+
+        # Without -O, && evaluates both operands and side() prints
+        self._write(
+            self.module, 'hawl side() {\n    qor("side")\n}\ndoor x = been && side()\n'
+        )
+        registry = self.interpreter.modules
+        for optimize in (True, False, True):
+            interpreter = Interpreter()
+            interpreter.modules = registry
+            interpreter.use_cache = False
+            interpreter.optimizer = Optimizer() if optimize else None
+            interpreter.interpret(
+                Parser(Lexer(f'ka_keen "{self.module}"\n').tokenize()).parse()
+            )
+        self.assertEqual(self.captured_output.getvalue().split(), ["side"])
+        self.assertEqual(len(registry.modules), 2)
+
+    def test_changed_module_is_imported_again(self):
+        """Test that a module whose file changed is parsed and run again."""
+        self._execute_code(f'ka_keen "{self.module}"')
+        self._write(self.module, 'qor("reloaded")\n')
+        os.utime(self.module, ns=(0, os.stat(self.module).st_mtime_ns + 10**9))
+        output = self._execute_code(f'ka_keen "{self.module}"')
+        self.assertEqual(output, ["loaded", "reloaded"])
+
+    def test_search_path(self):
+        """Test that modules are found through SOPLANG_PATH."""
+        with mock.patch.dict(os.environ, {"SOPLANG_PATH": self.directory}):
+            output = self._execute_code('ka_keen "greet.sop"\nqor(greeting)')
+        self.assertEqual(output, ["loaded", "salaan"])
+
+    def test_missing_module(self):
+        """Test that a module that is not found raises an ImportError."""
+        with mock.patch.dict(os.environ, {"SOPLANG_PATH": self.directory}):
+            with self.assertRaises(ImportError):
+                self._execute_code('ka_keen "missing.sop"')
+
+    def test_circular_import(self):
+        """Test that a module importing itself only runs once."""
+        self._write(self.module, f'qor("loaded")\nka_keen "{self.module}"\n')
+        self.assertEqual(self._execute_code(f'ka_keen "{self.module}"'), ["loaded"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import sys
+import unittest
+from array import array
+
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.runtime.interpreter import Interpreter
+from src.runtime.vm import VirtualMachine
+from src.stdlib.builtins import SoplangBuiltins
+from src.stdlib.containers import NumericList
+from src.utils.errors import RuntimeError, TypeError, ValueError
+
+
+class TestNumericList(unittest.TestCase):
+    def setUp(self):
+        """Redirect stdout to capture print statements."""
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def test_packed_storage_and_fallback(self):
+        """Test that numbers are packed and other values unpack the list."""
+        numbers = SoplangBuiltins.teed_abn(SoplangBuiltins.baaxad(4))
+        self.assertEqual(numbers.data, array("q", [0, 1, 2, 3]))
+        self.assertEqual(SoplangBuiltins.teed_jajab(1, 2).data, array("d", [1, 2]))
+        with self.assertRaises(TypeError):
+            SoplangBuiltins.teed_abn(1, "2")
+
+        numbers[0] = 10
+        numbers.append(2**70)  # Does not fit in 64 bits
+        self.assertIsNone(numbers.typecode)
+        numbers[1] = True
+        self.assertEqual(numbers, [10, True, 2, 3, 2**70])
+        self.assertEqual(SoplangBuiltins.qoraal(numbers), f"[10, run, 2, 3, {2**70}]")
+        self.assertEqual(SoplangBuiltins.nooc(numbers), "teed")
+
+    def test_elementwise_operations(self):
+        """Test arithmetic, comparisons and their errors over whole lists."""
+        a = NumericList(array("q", [1, 2, 3]))
+        self.assertEqual((a * 2 + 1).data, array("q", [3, 5, 7]))
+        self.assertEqual((10 - a).data, array("q", [9, 8, 7]))
+        self.assertEqual((a / 2).typecode, "d")
+        self.assertEqual((a + [0.5, 0, 0]).data, array("d", [1.5, 2, 3]))
+        self.assertEqual(a > 1, [False, True, True])
+        self.assertEqual(a.sifee(a >= 2).data, array("q", [2, 3]))
+        self.assertEqual((a.wadar(), a.ugu_yar(), a.ugu_weyn()), (6, 1, 3))
+        self.assertEqual(a.celcelis(), 2.0)
+
+        with self.assertRaises(RuntimeError):
+            a / NumericList(array("q", [1, 0, 1]))
+        with self.assertRaises(ValueError):
+            a + NumericList(array("q", [1]))
+        with self.assertRaises(ValueError):
+            NumericList(array("d")).ugu_weyn()
+
+    def test_engines(self):
+        """Test numeric lists in programs, with their methods and list methods."""
+        source = '''
+        hawl weyn(x) {
+            celi x > 2
+        }
+        teed xs = teed_abn(3, 1, 2)
+        xs[0] = xs[0] * 10
+        qor(xs.habee())
+        qor((xs * 2).jar(1, 3))
+        qor(xs.shaandhee(weyn))
+        qor(dherer(xs) + xs.wadar())
+        '''
+        ast = Parser(Lexer(source).tokenize()).parse()
+        for engine in (Interpreter, VirtualMachine):
+            with self.subTest(engine=engine.__name__):
+                interpreter = engine()
+                interpreter.output.stream = stream = io.StringIO()
+                interpreter.interpret(ast)
+                self.assertEqual(stream.getvalue(), "[1, 2, 30]\n[4, 60]\n[30]\n36\n")
+                self.assertIsInstance(interpreter.variables["xs"], NumericList)
+
+
+if __name__ == '__main__':
+    unittest.main()
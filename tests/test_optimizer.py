@@ -0,0 +1,102 @@
+import io
+import sys
+import unittest
+
+from src.core.ast import NodeType, dump
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.runtime.interpreter import Interpreter
+from src.runtime.optimizer import Optimizer
+from src.runtime.vm import VirtualMachine
+
+
+class TestOptimizer(unittest.TestCase):
+    def setUp(self):
+        """Redirect stdout to capture print statements."""
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def _optimize(self, source_code):
+        ast = Parser(Lexer(source_code + "\n").tokenize()).parse()
+        return Optimizer().optimize(ast)
+
+    def _run(self, engine, source_code):
+        interpreter = engine()
+        interpreter.optimizer = Optimizer()
+        interpreter.interpret(Parser(Lexer(source_code + "\n").tokenize()).parse())
+        output = self.captured_output.getvalue().split()
+        self.captured_output.truncate(0)
+        self.captured_output.seek(0)
+        return output
+
+    def test_constant_folding(self):
+        """Test that arithmetic, comparisons and concatenation are folded."""
+        ast = self._optimize('door x = 2 * 3 + 1\ndoor s = "n" + 1\ndoor b = !(1 > 2)')
+        values = [declaration.initializer for declaration in ast.children]
+        self.assertTrue(all(value.type == NodeType.LITERAL for value in values))
+        self.assertEqual([value.value for value in values], [7, "n1", True])
+
+    def test_failing_operation_is_not_folded(self):
+        """Test that a division by zero still fails when it runs."""
+        ast = self._optimize('door x = 1 / 0')
+        self.assertEqual(ast.children[0].initializer.type, NodeType.BINARY_OPERATION)
+
+    def test_constant_branches_are_pruned(self):
+        """Test that haddii branches with a constant condition are removed."""
+        ast = self._optimize('''
+        haddii (been) {
+            qor("a")
+        } haddii_kale (x > 1) {
+            qor("b")
+        } haddii_kale (run) {
+            qor("c")
+        } ugudambeyn {
+            qor("d")
+        }
+        ''')
+        statement = ast.children[0]
+        self.assertEqual(statement.type, NodeType.IF_STATEMENT)
+        self.assertEqual(statement.condition.value, ">")
+        self.assertEqual(
+            [child.type for child in statement.children[1:]],
+            [NodeType.FUNCTION_CALL, NodeType.BLOCK],
+        )
+        self.assertEqual(statement.children[2].children[0].children[0].value, "c")
+
+        ast = self._optimize('haddii (1 == 2) {\n qor("a")\n}')
+        self.assertEqual(ast.children[0].type, NodeType.BLOCK)
+        self.assertEqual(ast.children[0].children, [])
+
+    def test_short_circuit(self):
+        """Test that && and || skip their right operand on both engines."""
+        source = '''
+        hawl f() {
+            qor("called")
+            celi run
+        }
+        door no = been
+        qor(no && f())
+        qor(!no || f())
+        qor(!no && f())
+        '''
+        for engine in (Interpreter, VirtualMachine):
+            self.assertEqual(
+                self._run(engine, source), ["been", "run", "called", "run"]
+            )
+
+    def test_dump(self):
+        """Test the outline printed by --dump-ast."""
+        ast = self._optimize('door x = 1 + 2')
+        self.assertEqual(
+            dump(ast),
+            "PROGRAM\n  VARIABLE_DECLARATION 'x' (line 1)\n    LITERAL 3 (line 1)",
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import io
+import sys
+import unittest
+from unittest import mock
+
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.runtime.interpreter import Interpreter
+from src.runtime.output import Output
+from src.runtime.vm import VirtualMachine
+from src.stdlib.builtins import SoplangBuiltins
+from src.utils.errors import RuntimeError
+
+
+def parse(source):
+    return Parser(Lexer(source).tokenize()).parse()
+
+
+class TestOutput(unittest.TestCase):
+    def setUp(self):
+        """Redirect stdout to capture print statements."""
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def test_flush_policies(self):
+        """Test that each policy writes lines when it should."""
+        stream = io.StringIO()
+        output = Output(stream, "size", buffer_size=8)
+        self.assertEqual(output.qor("abc"), "abc")
+        self.assertEqual(stream.getvalue(), "")
+        output.qor(True)
+        self.assertEqual(stream.getvalue(), "abc\nrun\n")
+
+        output.set_policy("exit")
+        output.qor("x" * 100)
+        self.assertEqual(stream.getvalue(), "abc\nrun\n")
+        output.set_policy("line")
+        self.assertEqual(stream.getvalue(), "abc\nrun\n" + "x" * 100 + "\n")
+        output.qor(1)
+        self.assertTrue(stream.getvalue().endswith("\n1\n"))
+        with self.assertRaises(ValueError):
+            output.set_policy("never")
+
+    def test_program_flushes_on_errors_and_input(self):
+        """Test that buffered output is written before gelin and on errors."""
+        for engine in (Interpreter, VirtualMachine):
+            with self.subTest(engine=engine.__name__):
+                interpreter = engine()
+                interpreter.output.stream = stream = io.StringIO()
+                interpreter.output.set_policy("exit")
+                seen = []
+
+                def read(prompt):
+                    seen.append(stream.getvalue())
+                    return "Cali"
+
+                with mock.patch("builtins.input", read):
+                    interpreter.interpret(parse('qor("a")\nqor(gelin())\n'))
+                self.assertEqual(seen, ["a\n"])
+                self.assertEqual(stream.getvalue(), "a\nCali\n")
+
+                with self.assertRaises(RuntimeError):
+                    interpreter.interpret(parse('qor("b")\nqor(1 / 0)\n'))
+                self.assertEqual(stream.getvalue(), "a\nCali\nb\n")
+        self.assertEqual(self.captured_output.getvalue(), "")
+
+    def test_qor_streams_lists_and_objects(self):
+        """Test that large values are written in chunks as they are serialized."""
+        stream = mock.Mock()
+        output = Output(stream, "line", buffer_size=100)
+        value = {"a": list(range(2000)), "b": [[True, None], "x", {}]}
+        with mock.patch("src.stdlib.containers.CHUNK_PIECES", 50):
+            self.assertIsNone(output.qor(value))
+        chunks = [call.args[0] for call in stream.write.call_args_list]
+        self.assertGreater(len(chunks), 10)
+        self.assertTrue(all(len(chunk) < 1000 for chunk in chunks))
+        self.assertEqual("".join(chunks), SoplangBuiltins.qoraal(value) + "\n")
+        self.assertTrue("".join(chunks).endswith("'b': [[run, None], x, {}]}\n"))
+
+    def test_qoraal_cycles_and_deep_nesting(self):
+        """Test that values containing themselves and deep lists are written."""
+        items = [1, {"k": "v"}]
+        items.append(items)
+        items[1]["self"] = items[1]
+        shared = [2]
+        self.assertEqual(
+            SoplangBuiltins.qoraal([items, shared, shared]),
+            "[[1, {'k': v, 'self': {...}}, [...]], [2], [2]]",
+        )
+
+        depth = sys.getrecursionlimit() * 2
+        deep = []
+        for _ in range(depth):
+            deep = [deep]
+        brackets = depth + 1
+        self.assertEqual(SoplangBuiltins.qoraal(deep), "[" * brackets + "]" * brackets)
+
+    def test_default_stream_follows_stdout(self):
+        """Test that interpreters write to the sys.stdout of the moment."""
+        interpreter = Interpreter()
+        interpreter.interpret(parse('qor("hal")\n'))
+        sys.stdout = io.StringIO()
+        interpreter.interpret(parse('qor("labo")\n'))
+        self.assertEqual(sys.stdout.getvalue(), "labo\n")
+        self.assertEqual(self.captured_output.getvalue(), "hal\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 from src.core.lexer import Lexer
 from src.core.parser import Parser
-from src.core.ast import NodeType
+from src.core.ast import BinaryOperation, Identifier, NodeType, VariableDeclaration
 from src.core.tokens import TokenType
 
 
@@ -138,6 +138,73 @@ class TestParser(unittest.TestCase):
         self.assertIn(0.0, number_values)
         self.assertIn(5.0, number_values)
 
+    def test_parser_pulls_tokens_on_demand(self):
+        """Test that the parser only takes the tokens it has parsed so far."""
+        consumed = []
+
+        def stream(source):
+            for token in Lexer(source).iter_tokens():
+                consumed.append(token)
+                yield token
+
+        parser = Parser(stream('door x = 1\ndoor y = 2\n'))
+        self.assertEqual(len(consumed), 1)
+        parser.parse_statement()
+        self.assertEqual(
+            [token.value for token in consumed], ['door', 'x', '=', 1, 'door']
+        )
+
+        self.assertEqual(parser.peek(2).type, TokenType.EQUAL)
+        self.assertEqual(parser.current_token.type, TokenType.DOOR)
+        self.assertEqual(len(parser.parse().children), 1)
+
+    def test_exhausted_stream_ends_with_eof(self):
+        """Test that a stream without an EOF token still parses."""
+        ast = Parser(Lexer('qor(1)').iter_tokens()).parse()
+        self.assertEqual(len(ast.children), 1)
+        self.assertEqual(len(Parser([]).parse().children), 0)
+
+    def test_nodes_have_typed_fields(self):
+        """Test that each node type has its own slotted class with named fields."""
+        ast = Parser(Lexer('door total = price * 2\n').tokenize()).parse()
+        declaration = ast.children[0]
+        self.assertIsInstance(declaration, VariableDeclaration)
+        self.assertEqual(declaration.name, 'total')
+
+        operation = declaration.initializer
+        self.assertIsInstance(operation, BinaryOperation)
+        self.assertEqual(operation.type, NodeType.BINARY_OPERATION)
+        self.assertEqual(operation.operator, '*')
+        self.assertIsInstance(operation.left, Identifier)
+        self.assertEqual(operation.right.value, 2)
+        self.assertFalse(hasattr(operation, '__dict__'))
+        self.assertFalse(hasattr(operation, 'is_constant'))
+
+    def test_every_node_has_a_line(self):
+        """Test that expressions and nested statements record their position."""
+        source = (
+            'hawl f(a) {\n'
+            '    kuceli (i 1 ilaa 3) {\n'
+            '        haddii (a > i && !been) {\n'
+            '            qor([a, -a, {"k": a.b[0]}].dherer())\n'
+            '        }\n'
+            '    }\n'
+            '}\n'
+        )
+        ast = Parser(Lexer(source).tokenize()).parse()
+
+        def walk(node):
+            yield node
+            for child in node.children:
+                yield from walk(child)
+
+        nodes = list(walk(ast))[1:]
+        self.assertEqual([node for node in nodes if node.line is None], [])
+        comparison = ast.children[0].children[1].children[2].condition.left
+        self.assertEqual((comparison.operator, comparison.line), ('>', 3))
+        self.assertEqual(comparison.left.position + 2, comparison.position)
+        self.assertEqual(comparison.right.position, comparison.position + 2)
+
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
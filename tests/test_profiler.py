@@ -0,0 +1,145 @@
+import io
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import unittest
+
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.runtime.interpreter import Interpreter
+from src.runtime.main import run_soplang_file
+from src.runtime.profiler import PROGRAM, Profiler, ProfilingInterpreter
+from src.runtime.sampler import Sampler, collapse
+
+SOURCE = '''hawl fib(n) {
+    haddii (n < 2) {
+        celi n
+    }
+    celi fib(n - 1) + fib(n - 2)
+}
+hawl twice(n) {
+    celi fib(n) + fib(n)
+}
+qor(twice(5))
+'''
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        """Write the profiled program and capture print statements."""
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "program.sop")
+        with open(self.filename, "w") as file:
+            file.write(SOURCE)
+
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        sys.stdout = self.stdout_backup
+        shutil.rmtree(self.directory)
+
+    def _profile(self):
+        profiler = Profiler()
+        self.assertEqual(
+            run_soplang_file(self.filename, use_cache=False, profiler=profiler), 0
+        )
+        self.assertEqual(self.captured_output.getvalue(), "10\n")
+        return profiler
+
+    def test_functions_and_lines(self):
+        """Test that calls and line hits are counted per Soplang function."""
+        profiler = self._profile()
+        fib = profiler.functions[(self.filename, 1, "fib")]
+        twice = profiler.functions[(self.filename, 7, "twice")]
+        self.assertEqual((fib.calls, fib.primitive_calls), (30, 2))
+        self.assertEqual((twice.calls, twice.primitive_calls), (1, 1))
+        self.assertLessEqual(twice.self_time, twice.total_time)
+        self.assertLessEqual(fib.total_time, twice.total_time)
+        self.assertEqual(
+            set(fib.callers), {(self.filename, 1, "fib"), (self.filename, 7, "twice")}
+        )
+        self.assertEqual(fib.callers[(self.filename, 7, "twice")][:2], [2, 2])
+
+        self.assertEqual(profiler.lines[(self.filename, 2)][0], 30)
+        self.assertEqual(profiler.lines[(self.filename, 5)][0], 14)
+        report = profiler.report()
+        self.assertIn("30/2", report)
+        self.assertIn("celi fib(n - 1) + fib(n - 2)", report)
+
+    def test_pstats_and_collapsed_output(self):
+        """Test that profiles load in pstats and produce collapsed stacks."""
+        profiler = self._profile()
+        path = os.path.join(self.directory, "out.prof")
+        profiler.write(path)
+        stats = pstats.Stats(path).stats
+        self.assertEqual(stats[(self.filename, 1, "fib")][:2], (2, 30))
+        self.assertIn((self.filename, 0, PROGRAM), stats)
+
+        path = os.path.join(self.directory, "out.folded")
+        profiler.write(path)
+        with open(path) as file:
+            stacks = [line.rsplit(" ", 1)[0] for line in file]
+        self.assertIn(f"{PROGRAM};twice;fib;fib", stacks)
+
+    def test_tree_still_runs_without_profiling(self):
+        """Test that profiled closures are not cached on the shared AST."""
+        from src.runtime.cache import load_program
+
+        ast = load_program(self.filename, use_cache=False)
+        profiler = Profiler()
+        profiler.run(profiler.interpreter(self.filename), ast)
+        self.assertTrue(all(node.code is None for node in ast.children))
+
+        Interpreter().interpret(ast)
+        self.assertNotIn("timed_statement", ast.children[-1].code.__qualname__)
+        self.assertEqual(self.captured_output.getvalue(), "10\n10\n")
+        self.assertIsInstance(profiler.interpreter(self.filename), ProfilingInterpreter)
+
+    def test_call_stack(self):
+        """Test that calls push (name, line of the call) on the call stack."""
+        stacks = []
+        interpreter = Interpreter()
+        interpreter.functions["peek"] = lambda: stacks.append(
+            list(interpreter.call_stack)
+        )
+        interpreter.interpret(Parser(Lexer(SOURCE + """hawl inner() {
+    peek()
+}
+hawl outer() {
+    inner()
+}
+outer()
+""").tokenize()).parse())
+        self.assertEqual(stacks, [[("outer", 17), ("inner", 15)]])
+        self.assertEqual(interpreter.call_stack, [])
+        self.assertEqual(collapse(tuple(stacks[0])), f"{PROGRAM}:17;outer:15;inner")
+
+    def test_sampler(self):
+        """Test that the sampler writes collapsed stacks of the running calls."""
+        with open(self.filename, "w") as file:
+            file.write(SOURCE.replace("twice(5)", "twice(18)"))
+        sampler = Sampler(rate=2000)
+        self.assertEqual(
+            run_soplang_file(self.filename, use_cache=False, profiler=sampler), 0
+        )
+        self.assertGreater(sampler.sample_count, 0)
+        self.assertEqual(sum(sampler.samples.values()), sampler.sample_count)
+        self.assertIsNone(sampler.thread)
+
+        path = os.path.join(self.directory, "out.folded")
+        sampler.write(path)
+        with open(path) as file:
+            stacks = [line.rsplit(" ", 1)[0] for line in file]
+        self.assertTrue(
+            any(stack.startswith(f"{PROGRAM}:10;twice:8;fib") for stack in stacks)
+        )
+        with self.assertRaises(ValueError):
+            Sampler(rate=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
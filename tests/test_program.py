@@ -0,0 +1,77 @@
+import io
+import sys
+import unittest
+
+import src as soplang
+from src.runtime.interpreter import Interpreter
+from src.utils.errors import ParserError, SoplangError
+
+RULE = '''hawl qiime(x) {
+    haddii (x > 100) {
+        celi x * 0.9
+    }
+    celi x
+}
+door natiijo = qiime(lacag)
+haddii (natiijo > 500) {
+    qor("weyn " + magac)
+}
+'''
+
+
+class TestProgram(unittest.TestCase):
+    def setUp(self):
+        """Redirect stdout to check that runs capture their output."""
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def test_run_with_inputs(self):
+        """Test that inputs become globals and output and variables are returned."""
+        program = soplang.compile(RULE)
+        result = program.run({"lacag": 1000, "magac": "Cali"})
+        self.assertEqual(result.output, "weyn Cali\n")
+        self.assertEqual(result.variables["natiijo"], 900.0)
+        self.assertEqual(program.run({"lacag": 50, "magac": "Cali"}).output, "")
+        self.assertEqual(self.captured_output.getvalue(), "")
+
+    def test_run_many_resets_state(self):
+        """Test that records do not see what earlier records defined."""
+        program = soplang.compile(RULE)
+        records = [{"lacag": n, "magac": str(n)} for n in (10, 600, 2000)]
+        results = program.run_many(records)
+        self.assertEqual([r.output for r in results], ["", "weyn 600\n", "weyn 2000\n"])
+        self.assertEqual([r.variables["natiijo"] for r in results], [10, 540.0, 1800.0])
+
+        counter = soplang.compile("door tiro = 1\nqor(tiro)")
+        self.assertEqual([r.output for r in counter.run_many([{}, {}])], ["1\n"] * 2)
+
+    def test_errors_and_changing_inputs(self):
+        """Test that errors are raised and new input names are resolved again."""
+        with self.assertRaises(ParserError):
+            soplang.compile("qor(")
+
+        program = soplang.compile("qor(a + 1)", engine="vm", optimize=True)
+        self.assertEqual(program.run({"a": 1}).output, "2\n")
+        with self.assertRaises(SoplangError):
+            program.run({"b": 1})
+        self.assertEqual(program.run({"a": 2}).output, "3\n")
+
+    def test_interpreter_reset(self):
+        """Test that reset forgets globals, functions and classes."""
+        interpreter = Interpreter()
+        interpreter.interpret(
+            soplang.compile("door x = 1\nhawl f() {\n    celi 1\n}").ast
+        )
+        interpreter.reset()
+        self.assertEqual(interpreter.variables, {})
+        self.assertNotIn("f", interpreter.functions)
+        self.assertIn("qor", interpreter.functions)
+
+
+if __name__ == '__main__':
+    unittest.main()
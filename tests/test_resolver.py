@@ -0,0 +1,130 @@
+import io
+import sys
+import unittest
+
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.runtime.interpreter import Interpreter
+from src.runtime.resolver import Resolver
+from src.utils.errors import RuntimeError
+
+
+class TestResolver(unittest.TestCase):
+    def setUp(self):
+        """Redirect stdout to capture print statements."""
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def _parse(self, source_code):
+        return Parser(Lexer(source_code + "\n").tokenize()).parse()
+
+    def test_function_locals_get_slots(self):
+        """Test that parameters and locals get slots, and globals do not."""
+        ast = self._parse('''
+        door offset = 1
+        hawl area(w, h) {
+            door result = w * h
+            celi result + offset
+        }
+        ''')
+        Resolver().resolve(ast)
+        declaration, function = ast.children
+        self.assertEqual((declaration.depth, declaration.slot), (0, None))
+        self.assertEqual(function.locals, {"w": 0, "h": 1, "result": 2})
+
+        result, ret = function.children[2:]
+        self.assertEqual((result.depth, result.slot), (0, 2))
+        total = ret.children[0]
+        self.assertEqual((total.children[0].depth, total.children[0].slot), (0, 2))
+        self.assertEqual((total.children[1].depth, total.children[1].slot), (1, None))
+
+    def test_enclosing_function_depth(self):
+        """Test that a nested function reaches its parent's locals by depth."""
+        ast = self._parse('''
+        hawl outer(a) {
+            hawl inner(b) {
+                a = a + b
+            }
+        }
+        ''')
+        Resolver().resolve(ast)
+        inner = ast.children[0].children[1]
+        assignment = inner.children[1]
+        self.assertEqual((assignment.depth, assignment.slot), (1, 0))
+
+    def test_undefined_name_is_reported_before_running(self):
+        """Test that an undefined name fails before any statement runs."""
+        ast = self._parse('qor("start")\nqor(missing)')
+        with self.assertRaises(RuntimeError):
+            Interpreter().interpret(ast)
+        self.assertEqual(self.captured_output.getvalue(), "")
+
+    def test_lenient_resolver_leaves_undefined_names_to_run_time(self):
+        """Test that strict=False only reports undefined names when they run."""
+        interpreter = Interpreter()
+        interpreter.resolver = Resolver(strict=False)
+        interpreter.interpret(self._parse('hawl f() {\n    celi later\n}'))
+        interpreter.interpret(self._parse('door later = 3\nqor(f())'))
+        self.assertEqual(self.captured_output.getvalue(), "3\n")
+        with self.assertRaises(RuntimeError):
+            interpreter.interpret(self._parse('qor(missing)'))
+
+    def test_constant_reassignment_is_reported_before_running(self):
+        """Test that assigning a madoor fails before any statement runs."""
+        ast = self._parse('''
+        madoor PI = 3.14
+        hawl change() {
+            PI = 3
+        }
+        qor("start")
+        ''')
+        with self.assertRaises(RuntimeError):
+            Interpreter().interpret(ast)
+        self.assertEqual(self.captured_output.getvalue(), "")
+
+    def test_existing_globals_are_known(self):
+        """Test that globals of earlier programs (like shell input) are used."""
+        interpreter = Interpreter()
+        interpreter.interpret(self._parse('madoor limit = 3\ndoor count = 0'))
+        interpreter.interpret(self._parse('count = limit'))
+        self.assertEqual(interpreter.variables['count'], 3)
+        with self.assertRaises(RuntimeError):
+            interpreter.interpret(self._parse('limit = 4'))
+
+    def test_errors_in_try_block_stay_catchable(self):
+        """Test that isku_day still catches undefined names at run time."""
+        ast = self._parse('''
+        isku_day {
+            qor(missing)
+        } qabo (err) {
+            qor("caught")
+        }
+        ''')
+        Interpreter().interpret(ast)
+        self.assertEqual(self.captured_output.getvalue().strip(), "caught")
+
+    def test_local_falls_back_until_declared(self):
+        """Test that a local reads the outer variable until it is declared."""
+        ast = self._parse('''
+        door x = "global"
+        hawl f() {
+            qor(x)
+            door x = "local"
+            qor(x)
+        }
+        f()
+        qor(x)
+        ''')
+        Interpreter().interpret(ast)
+        self.assertEqual(
+            self.captured_output.getvalue().split(), ["global", "local", "global"]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.runtime.server import run_request, send_request
+
+MAIN = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py"
+)
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Start a server with two workers on a temporary socket."""
+        cls.directory = tempfile.mkdtemp()
+        cls.socket = os.path.join(cls.directory, "soplang.sock")
+        cls.server = subprocess.Popen(
+            [sys.executable, MAIN, "--serve", "--socket", cls.socket, "--workers=2"],
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 10
+        while not os.path.exists(cls.socket) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        cls.server.wait(10)
+        shutil.rmtree(cls.directory)
+
+    def request(self, **request):
+        return send_request(request, self.socket)
+
+    def test_runs_files_and_source(self):
+        """Test that files and source run with their stdin, cwd and engine."""
+        with open(os.path.join(self.directory, "greet.sop"), "w") as file:
+            file.write('qoraal magac = gelin("")\nqor("salaan " + magac)\n')
+        response = self.request(path="greet.sop", cwd=self.directory, stdin="Cali\n")
+        self.assertEqual(response, {"stdout": "salaan Cali\n", "status": 0})
+
+        response = self.request(source="qor(2 * 21)", engine="vm", optimize=True)
+        self.assertEqual(response, {"stdout": "42\n", "status": 0})
+
+        response = self.request(source="qor(", engine="interpreter")
+        self.assertEqual(response["status"], 1)
+        self.assertIn("✗", response["stdout"])
+
+    def test_requests_do_not_share_state(self):
+        """Test that concurrent requests each run on a fresh interpreter."""
+        define = "door x = 1\nhawl f() {\n    celi 2\n}\nqor(x + f())"
+        with ThreadPoolExecutor(8) as pool:
+            responses = list(pool.map(lambda _: self.request(source=define), range(16)))
+        self.assertEqual({response["stdout"] for response in responses}, {"3\n"})
+
+        response = self.request(source="qor(x)")
+        self.assertEqual(response["status"], 1)
+        self.assertNotEqual(response["stdout"], "1\n")
+
+    def test_run_request_restores_the_process(self):
+        """Test that running a request in-process restores stdio and cwd."""
+        cwd, stdout = os.getcwd(), sys.stdout
+        request = {"source": "qor(gelin())", "stdin": "haa\n", "cwd": "/"}
+        response = run_request(request)
+        self.assertEqual(response, {"stdout": "haa\n", "status": 0})
+        self.assertEqual((os.getcwd(), sys.stdout), (cwd, stdout))
+
+        response = run_request({"source": "qor(1)", "engine": "jit"})
+        self.assertEqual(response["status"], 1)
+
+    def test_optimize_does_not_leak_into_imports(self):
+        """Test that an -O request does not change modules for later requests."""
+        with open(os.path.join(self.directory, "side.sop"), "w") as file:
+            file.write('hawl side() {\n    qor("side")\n}\ndoor x = been && side()\n')
+        request = {"source": 'ka_keen "side.sop"', "cwd": self.directory}
+        outputs = [
+            run_request(dict(request, optimize=optimize))["stdout"]
+            for optimize in (True, False, True, False)
+        ]
+        self.assertEqual(outputs, ["", "side\n", "", "side\n"])
+
+    def test_daemon_reads_stdin_only_when_asked(self):
+        """Test that --daemon leaves an open stdin alone unless --stdin is given."""
+        command = [sys.executable, MAIN, "--daemon", "--socket", self.socket]
+        read_end, write_end = os.pipe()
+        try:
+            result = subprocess.run(
+                command + ["-c", "qor(1)"],
+                stdin=read_end,
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+        finally:
+            os.close(read_end)
+            os.close(write_end)
+        self.assertEqual((result.stdout, result.returncode), ("1\n", 0))
+
+        result = subprocess.run(
+            command + ["--stdin", "-c", "qor(gelin())"],
+            input="haa\n",
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        self.assertEqual((result.stdout, result.returncode), ("haa\n", 0))
+
+    def test_unusable_socket_path_is_reported(self):
+        """Test that a socket that cannot be bound fails without a traceback."""
+        path = os.path.join(self.directory, "missing", "soplang.sock")
+        result = subprocess.run(
+            [sys.executable, MAIN, "--serve", "--socket", path],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        self.assertEqual(result.returncode, 1)
+        self.assertIn(f"cannot serve on {path}", result.stderr)
+        self.assertNotIn("Traceback", result.stderr)
+
+    def test_socket_is_private(self):
+        """Test that only the server's user can connect to the socket."""
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket).st_mode), 0o600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import sys
+import unittest
+
+from src.runtime.shell import SoplangShell
+
+
+class TestShell(unittest.TestCase):
+    def setUp(self):
+        """Create a shell (history is only set up by run()), capturing output."""
+        self.shell = SoplangShell()
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def _execute(self, *inputs):
+        for code in inputs:
+            self.shell.execute_code(code)
+        return self.captured_output.getvalue().splitlines()
+
+    def test_state_persists_between_inputs(self):
+        """Test that variables and functions survive across shell inputs."""
+        output = self._execute(
+            "door a = 5",
+            "hawl f(n) {\n    celi n + a\n}",
+            "qor(f(2))",
+            "a = a * 2",
+            "f(2)",
+        )
+        self.assertEqual(output, ["7", "\033[32m=> 12\033[0m"])
+        self.assertEqual(self.shell.interpreter.variables["a"], 10)
+
+    def test_forward_references_across_inputs(self):
+        """Test that a function may use a global defined by a later input."""
+        output = self._execute(
+            "hawl f() {\n    celi y\n}",
+            "door y = 3",
+            "qor(f())",
+            "hawl g() {\n    celi missing\n}",
+            "g()",
+        )
+        self.assertEqual(output[0], "3")
+        self.assertEqual(len(output), 2)
+        self.assertIn("missing", output[1])
+
+    def test_expressions_are_echoed(self):
+        """Test that single expressions print their value, and statements do not."""
+        output = self._execute("2 * (3 + 4)", "door s = [1]", "s", "1 < 2", "qor(3)")
+        echoed = [f"\033[32m=> {value}\033[0m" for value in ("14", "[1]", "run")]
+        self.assertEqual(output, echoed + ["3"])
+
+    def test_errors_are_reported(self):
+        """Test that errors are printed and leave the session usable."""
+        output = self._execute("qor(missing)", "1 / 0", "door = 3", "qor(1)")
+        self.assertEqual(len(output), 4)
+        self.assertIn("missing", output[0])
+        self.assertTrue(all(line.startswith("\033[31mKhalad") for line in output[:3]))
+        self.assertEqual(output[3], "1")
+
+    def test_needs_more_input(self):
+        """Test that unclosed blocks continue on the next line."""
+        self.assertTrue(self.shell.needs_more_input("hawl f() {"))
+        self.assertTrue(self.shell.needs_more_input("teed l = [1,"))
+        self.assertFalse(self.shell.needs_more_input('qor("{")'))
+        self.assertFalse(self.shell.needs_more_input("hawl f() {\n}"))
+
+
+if __name__ == '__main__':
+    unittest.main()
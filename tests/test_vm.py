@@ -0,0 +1,210 @@
+import io
+import os
+import random
+import sys
+import unittest
+
+from src.core.lexer import Lexer
+from src.core.parser import Parser
+from src.runtime.bytecode import BytecodeCompiler, disassemble
+from src.runtime.main import run_soplang_file
+from src.runtime.method_cache import MAX_ENTRIES
+from src.runtime.vm import VirtualMachine
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "examples")
+
+
+class TestVirtualMachine(unittest.TestCase):
+    def setUp(self):
+        """Set up the VM for each test."""
+        self.vm = VirtualMachine()
+        # Redirect stdout to capture print statements
+        self.stdout_backup = sys.stdout
+        self.captured_output = io.StringIO()
+        sys.stdout = self.captured_output
+
+    def tearDown(self):
+        """Restore stdout after each test."""
+        sys.stdout = self.stdout_backup
+
+    def _parse(self, source_code):
+        return Parser(Lexer(source_code + "\n").tokenize()).parse()
+
+    def _execute_code(self, source_code):
+        """Helper method to execute code and return output."""
+        self.vm.interpret(self._parse(source_code))
+        return self.captured_output.getvalue().strip()
+
+    def test_code_object(self):
+        """Test that programs compile to 32-bit instruction words in bytes."""
+        code = BytecodeCompiler().compile_module(self._parse('door x = 1 + 2').children)
+        self.assertIsInstance(code.code, bytes)
+        self.assertEqual(len(code.code), 4 * len(code.words))
+        self.assertIn(1, code.constants)
+        self.assertEqual(code.varnames, ())
+
+    def test_function_locals_use_slots(self):
+        """Test that parameters and declared locals are stored in slots."""
+        ast = self._parse('''
+        hawl area(w, h) {
+            door result = w * h
+            celi result + offset
+        }
+        ''')
+        module = BytecodeCompiler().compile_module(ast.children)
+        function = module.constants[0][3]
+        self.assertEqual(function.varnames, ("w", "h", "result"))
+        listing = disassemble(function)
+        self.assertIn("LOAD_FAST          2 (result)", listing)
+        self.assertIn("LOAD_NAME          0 (offset)", listing)
+
+    def test_variables_and_functions(self):
+        """Test declarations, calls and the implicit return value."""
+        source = '''
+        door counter = 0
+        hawl increment(step) {
+            door previous = counter
+            counter = counter + step
+            celi previous
+        }
+        hawl last(value) {
+            counter = value
+        }
+        increment(2)
+        qor(increment(3))
+        qor(last(7))
+        '''
+        output = self._execute_code(source)
+        self.assertEqual(output, "2\n7")
+        self.assertEqual(self.vm.variables['counter'], 7)
+        self.assertNotIn('previous', self.vm.variables)
+        self.assertNotIn('step', self.vm.variables)
+
+    def test_loops_and_branches(self):
+        """Test jumps for haddii, kuceli, intay, jooji and soco."""
+        source = '''
+        door total = 0
+        kuceli (i 1 ilaa 10) {
+            haddii (i == 3) {
+                soco
+            } haddii_kale (i == 6) {
+                jooji
+            }
+            total = total + i
+        }
+        door n = 0
+        intay (run) {
+            n = n + 1
+            haddii (n > 4) {
+                jooji
+            }
+        }
+        qor(total)
+        qor(n)
+        '''
+        output = self._execute_code(source)
+        self.assertEqual(output, "12\n5")
+
+    def test_deep_recursion(self):
+        """Test that Soplang calls do not consume the Python stack."""
+        source = '''
+        hawl depth(k) {
+            haddii (k == 0) {
+                celi 0
+            }
+            celi depth(k - 1) + 1
+        }
+        qor(depth(800))
+        '''
+        self.assertEqual(self._execute_code(source), "800")
+        self.assertIs(self.vm.environment, self.vm.globals)
+
+    def test_try_catch(self):
+        """Test that errors raised in called functions reach the handler."""
+        source = '''
+        hawl fail(x) {
+            celi x / 0
+        }
+        isku_day {
+            fail(1)
+            qor("not reached")
+        } qabo (err) {
+            qor("caught")
+        }
+        '''
+        self.assertEqual(self._execute_code(source), "caught")
+        self.assertIn("err", self.vm.variables)
+
+    def test_errors_are_raised_when_executed(self):
+        """Test that unsupported nodes only fail once they are executed."""
+        self.assertEqual(self._execute_code('hawl never() { celi [1, 2] > been }'), "")
+
+    def test_string_builder_methods(self):
+        """Test that qoraal_dhis methods are called through the method cache."""
+        source = '''
+        door b = qoraal_dhis()
+        kuceli (i 1 ilaa 3) {
+            b.ku_dar(i).ku_dar(";")
+        }
+        qor(b.dhammee() + qoraal(b.dherer()))
+        '''
+        self.assertEqual(self._execute_code(source), "1;2;3;6")
+
+    def test_method_call_inline_cache(self):
+        """Test that a method call site caches one method per receiver type."""
+        source = '''
+        hawl has(x) {
+            celi x.leeyahay("a")
+        }
+        kuceli (i 1 ilaa 2) {
+            qor(has(["a"]))
+            qor(has("bca"))
+            qor(has({"b": 1}))
+        }
+        isku_day {
+            has(5)
+        } qabo (err) {
+            qor("caught")
+        }
+        '''
+        output = self._execute_code(source).split()
+        self.assertEqual(output, ["run", "run", "been"] * 2 + ["caught"])
+
+        code = self.vm.functions["has"]["code"]
+        cache = next(c[0] for c in code.constants if isinstance(c, tuple))
+        self.assertEqual(cache.method_name, "leeyahay")
+        self.assertEqual(set(cache.entries), {list, str, dict, int})
+        self.assertIsNone(cache.entries[int])
+
+        # A full cache still resolves new receiver types, without keeping them
+        class Items(list):
+            pass
+
+        self.assertEqual(len(cache.entries), MAX_ENTRIES)
+        self.assertIsNotNone(cache.resolve(self.vm, Items()))
+        self.assertNotIn(Items, cache.entries)
+
+    def test_examples_match_interpreter(self):
+        """Test that every example prints the same output on both engines."""
+        for filename in sorted(os.listdir(EXAMPLES_DIR)):
+            if not filename.endswith(".sop"):
+                continue
+            path = os.path.join(EXAMPLES_DIR, filename)
+            with self.subTest(example=filename):
+                outputs = []
+                for engine in ("interpreter", "vm"):
+                    random.seed(0)
+                    stdin_backup = sys.stdin
+                    sys.stdout = io.StringIO()
+                    sys.stdin = io.StringIO("abc\n" * 10)
+                    try:
+                        run_soplang_file(path, engine, use_cache=False)
+                        outputs.append(sys.stdout.getvalue())
+                    finally:
+                        sys.stdin = stdin_backup
+                        sys.stdout = self.captured_output
+                self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == '__main__':
+    unittest.main()